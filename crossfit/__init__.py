@@ -0,0 +1 @@
+"""Módulos de apoyo del generador de entrenamientos CrossFit."""
@@ -0,0 +1,206 @@
+"""Control de admisión para la generación de PDFs.
+
+Limita los PDFs que se generan a la vez en el proceso, la frecuencia con la que
+cada sesión puede pedirlos y el tiempo que un alumno espera a su PDF, para que
+una avalancha de descargas (o entradas patológicas) no monopolice el servidor.
+Los límites se pueden ajustar con variables de entorno ``CROSSFIT_PDF_*``.
+
+El tiempo máximo es blando: pasado ``timeout`` se deja de esperar y se avisa al
+alumno, pero un hilo no se puede interrumpir, así que la generación sigue hasta
+terminar y mientras tanto ocupa su hueco.
+"""
+
+import os
+import threading
+import time
+from collections import Counter, deque
+from concurrent.futures import ThreadPoolExecutor, TimeoutError as FuturoTimeout
+from typing import Callable, Dict, Hashable, Optional
+
+from streamlit.runtime.scriptrunner import get_script_run_ctx
+
+from crossfit.catalogo import con_catalogo
+
+MOTIVO_LIMITE_SESION = "limite_sesion"
+MOTIVO_COLA_LLENA = "cola_llena"
+MOTIVO_ESPERA_AGOTADA = "espera_agotada"
+MOTIVO_TIEMPO_AGOTADO = "tiempo_agotado"
+# PDFs distintos que se recuerdan por sesión para no cobrar dos veces el mismo
+CLAVES_RECORDADAS = 8
+
+MENSAJES_RECHAZO = {
+    MOTIVO_LIMITE_SESION: "Estás generando PDFs muy rápido. Espera {segundos} s y vuelve a intentarlo.",
+    MOTIVO_COLA_LLENA: "Ahora mismo hay demasiadas descargas en marcha. Inténtalo de nuevo en unos segundos.",
+    MOTIVO_ESPERA_AGOTADA: "El servidor está muy ocupado y tu PDF no ha podido empezar a tiempo. Inténtalo de nuevo.",
+    MOTIVO_TIEMPO_AGOTADO: "La generación del PDF ha tardado demasiado. Reduce el número de ejercicios o inténtalo de nuevo.",
+}
+
+
+class RechazoAdmision(Exception):
+    def __init__(self, motivo: str, segundos: float = 0.0):
+        self.motivo = motivo
+        self.segundos = segundos
+        self.mensaje = MENSAJES_RECHAZO[motivo].format(segundos=max(1, round(segundos)))
+        super().__init__(self.mensaje)
+
+
+class _CuboFichas:
+    """Cubo de fichas por sesión: permite ráfagas cortas y limita el ritmo sostenido.
+
+    ``claves`` son los últimos PDFs por los que ya se pagó una ficha: los reruns
+    que vuelven a pedir el mismo PDF no gastan otra.
+    """
+
+    __slots__ = ("fichas", "instante", "claves")
+
+    def __init__(self, capacidad: float, instante: float):
+        self.fichas = capacidad
+        self.instante = instante
+        self.claves = deque(maxlen=CLAVES_RECORDADAS)
+
+
+class ControlAdmision:
+    def __init__(
+        self,
+        max_simultaneos: int = 4,
+        max_en_cola: int = 16,
+        espera_maxima: float = 10.0,
+        timeout: float = 20.0,
+        rafaga_por_sesion: int = 20,
+        ritmo_por_sesion: float = 1.0,
+    ):
+        self.max_simultaneos = max_simultaneos
+        self.max_en_cola = max_en_cola
+        self.espera_maxima = espera_maxima
+        self.timeout = timeout
+        self.rafaga_por_sesion = rafaga_por_sesion
+        self.ritmo_por_sesion = ritmo_por_sesion
+        self._huecos = threading.BoundedSemaphore(max_simultaneos)
+        self._ejecutor = ThreadPoolExecutor(max_workers=max_simultaneos, thread_name_prefix="crossfit-pdf")
+        self._bloqueo = threading.Lock()
+        self._cubos: Dict[str, _CuboFichas] = {}
+        self._en_curso = 0
+        self._en_cola = 0
+        self._contadores = Counter()
+
+    @classmethod
+    def desde_entorno(cls) -> "ControlAdmision":
+        def leer(nombre, tipo, defecto):
+            try:
+                return tipo(os.environ.get(f"CROSSFIT_PDF_{nombre}", defecto))
+            except ValueError:
+                return defecto
+
+        return cls(
+            max_simultaneos=max(1, leer("MAX_SIMULTANEOS", int, 4)),
+            max_en_cola=max(0, leer("MAX_COLA", int, 16)),
+            espera_maxima=leer("ESPERA_MAXIMA", float, 10.0),
+            timeout=leer("TIMEOUT", float, 20.0),
+            rafaga_por_sesion=max(1, leer("RAFAGA_SESION", int, 20)),
+            ritmo_por_sesion=leer("RITMO_SESION", float, 1.0),
+        )
+
+    def _consumir_ficha(self, sesion: str, clave: Optional[Hashable] = None):
+        ahora = time.monotonic()
+        with self._bloqueo:
+            cubo = self._cubos.get(sesion)
+            if cubo is None:
+                cubo = self._cubos[sesion] = _CuboFichas(self.rafaga_por_sesion, ahora)
+            if clave is not None and clave in cubo.claves:
+                return
+            cubo.fichas = min(self.rafaga_por_sesion, cubo.fichas + (ahora - cubo.instante) * self.ritmo_por_sesion)
+            cubo.instante = ahora
+            if cubo.fichas < 1:
+                self._contadores[MOTIVO_LIMITE_SESION] += 1
+                espera = (1 - cubo.fichas) / self.ritmo_por_sesion if self.ritmo_por_sesion > 0 else self.timeout
+                raise RechazoAdmision(MOTIVO_LIMITE_SESION, espera)
+            cubo.fichas -= 1
+            if clave is not None:
+                cubo.claves.append(clave)
+            if len(self._cubos) > 1024:
+                # Olvida las sesiones que ya han recuperado todas sus fichas.
+                lleno = self.rafaga_por_sesion / self.ritmo_por_sesion if self.ritmo_por_sesion > 0 else 0
+                self._cubos = {
+                    clave: valor for clave, valor in self._cubos.items() if ahora - valor.instante < lleno
+                }
+
+    def _liberar(self, _futuro):
+        with self._bloqueo:
+            self._en_curso -= 1
+        self._huecos.release()
+
+    def ejecutar(self, sesion: str, funcion: Callable, *args, clave: Optional[Hashable] = None,
+                 al_encolar: Optional[Callable[[], None]] = None, **kwargs):
+        """Ejecuta ``funcion`` respetando los límites o lanza :class:`RechazoAdmision`.
+
+        ``clave`` identifica el PDF: si la sesión ya pagó una ficha por él (un rerun
+        que lo vuelve a pedir), no gasta otra. Pasado ``timeout`` se deja de esperar,
+        pero la generación sigue en su hilo hasta terminar.
+        """
+        self._consumir_ficha(sesion, clave)
+        if not self._huecos.acquire(blocking=False):
+            with self._bloqueo:
+                if self._en_cola >= self.max_en_cola:
+                    self._contadores[MOTIVO_COLA_LLENA] += 1
+                    raise RechazoAdmision(MOTIVO_COLA_LLENA)
+                self._en_cola += 1
+                self._contadores["encoladas"] += 1
+            try:
+                if al_encolar is not None:
+                    al_encolar()
+                admitida = self._huecos.acquire(timeout=self.espera_maxima)
+            finally:
+                with self._bloqueo:
+                    self._en_cola -= 1
+            if not admitida:
+                with self._bloqueo:
+                    self._contadores[MOTIVO_ESPERA_AGOTADA] += 1
+                raise RechazoAdmision(MOTIVO_ESPERA_AGOTADA)
+
+        with self._bloqueo:
+            self._en_curso += 1
+            self._contadores["admitidas"] += 1
+        try:
+            # En el hilo del ejecutor, el PDF usa el catálogo fijado por el rerun que lo pide
+            futuro = self._ejecutor.submit(con_catalogo(funcion), *args, **kwargs)
+        except BaseException:
+            self._liberar(None)
+            raise
+        # El hueco se libera cuando la generación termina de verdad, aunque se haya
+        # abandonado por tiempo: así una construcción desbocada sigue contando.
+        futuro.add_done_callback(self._liberar)
+        try:
+            resultado = futuro.result(timeout=self.timeout)
+        except FuturoTimeout:
+            with self._bloqueo:
+                self._contadores[MOTIVO_TIEMPO_AGOTADO] += 1
+            raise RechazoAdmision(MOTIVO_TIEMPO_AGOTADO) from None
+        with self._bloqueo:
+            self._contadores["completadas"] += 1
+        return resultado
+
+    def estadisticas(self) -> dict:
+        with self._bloqueo:
+            rechazadas = {
+                motivo: self._contadores[motivo]
+                for motivo in (MOTIVO_LIMITE_SESION, MOTIVO_COLA_LLENA, MOTIVO_ESPERA_AGOTADA, MOTIVO_TIEMPO_AGOTADO)
+            }
+            return {
+                "en_curso": self._en_curso,
+                "en_cola": self._en_cola,
+                "max_simultaneos": self.max_simultaneos,
+                "admitidas": self._contadores["admitidas"],
+                "completadas": self._contadores["completadas"],
+                "encoladas": self._contadores["encoladas"],
+                "rechazadas": rechazadas,
+                "rechazadas_total": sum(rechazadas.values()),
+            }
+
+
+def id_sesion_actual() -> str:
+    ctx = get_script_run_ctx()
+    return ctx.session_id if ctx is not None else "sin-sesion"
+
+
+# Compartido por todas las sesiones del proceso.
+control_pdf = ControlAdmision.desde_entorno()
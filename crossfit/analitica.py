@@ -0,0 +1,129 @@
+"""Analítica de carga por grupo muscular sobre lotes de entrenamientos.
+
+La matriz de incidencia ejercicio × músculo es la de la instantánea del
+catálogo (:attr:`crossfit.catalogo.Catalogo.matriz`: filas por id de ejercicio,
+los mismos de los enlaces, y columnas en el orden de ``catalogo.musculos``).
+El volumen de cada spec se obtiene de su cronograma: cada intervalo de trabajo aporta sus repeticiones (las de todas las
+rondas) o, si es por tiempo, los segundos de trabajo convertidos a repeticiones
+equivalentes. Con ``np.bincount`` se pasa a una matriz spec × ejercicio y un
+producto matricial da el volumen por músculo, que luego se agrega por alumno o
+grupo sin bucles de Python por entrenamiento.
+"""
+
+from functools import lru_cache
+from typing import Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from crossfit.catalogo import Catalogo, catalogo_actual
+from crossfit.cronograma import SEGUNDOS_POR_REP, compilar_lote
+from crossfit.historial import historial
+from crossfit.spec import WorkoutSpec
+
+MAX_CONTENIDOS_CACHE = 50_000
+# Volumen por músculo de cada WOD ya calculado, por huella de contenido (de la
+# versión del catálogo ``_version_cache``).
+_volumen_contenido: Dict[str, np.ndarray] = {}
+_version_cache = 0
+
+
+def volumen_por_ejercicio(specs: Sequence[WorkoutSpec], catalogo: Optional[Catalogo] = None) -> np.ndarray:
+    """Matriz spec × ejercicio del catálogo con las repeticiones (equivalentes) de cada spec."""
+    catalogo = catalogo or catalogo_actual()
+    n_specs, n_catalogo = len(specs), catalogo.matriz.shape[0]
+    if not n_specs:
+        return np.zeros((0, n_catalogo))
+    # Los ejercicios que ya no existen cuentan en la fila de ejercicio desconocido.
+    id_de, desconocido = catalogo.id_de, catalogo.id_desconocido
+    ids = np.fromiter(
+        (id_de.get((ej.categoria, ej.nombre), desconocido) for spec in specs for ej in spec.ejercicios),
+        dtype=np.int64,
+    )
+    n_ej = np.fromiter((len(spec.ejercicios) for spec in specs), dtype=np.int64, count=n_specs)
+    primer_ej = np.cumsum(n_ej) - n_ej
+
+    cronograma = compilar_lote(specs)
+    cronograma = cronograma[cronograma["ejercicio"] >= 0]
+    spec = cronograma["spec"].astype(np.int64)
+    reps = cronograma["reps"].astype(np.float64)
+    segundos = (cronograma["fin"] - cronograma["inicio"]).astype(np.float64)
+    volumen = np.where(reps > 0, reps, segundos / SEGUNDOS_POR_REP)
+
+    catalogo = ids[primer_ej[spec] + cronograma["ejercicio"]]
+    plano = np.bincount(spec * n_catalogo + catalogo, weights=volumen, minlength=n_specs * n_catalogo)
+    return plano.reshape(n_specs, n_catalogo)
+
+
+def volumen_por_musculo(specs: Sequence[WorkoutSpec], catalogo: Optional[Catalogo] = None) -> np.ndarray:
+    """Matriz spec × músculo (columnas en el orden de ``catalogo.musculos``)."""
+    catalogo = catalogo or catalogo_actual()
+    return volumen_por_ejercicio(specs, catalogo) @ catalogo.matriz
+
+
+def _factorizar(etiquetas: Sequence[str]) -> Tuple[List[str], np.ndarray]:
+    """Etiquetas distintas (ordenadas) y el índice de cada elemento entre ellas."""
+    claves = sorted(set(etiquetas))
+    posicion = {clave: indice for indice, clave in enumerate(claves)}
+    return claves, np.fromiter((posicion[etiqueta] for etiqueta in etiquetas), dtype=np.int64, count=len(etiquetas))
+
+
+def agregar(volumen: np.ndarray, etiquetas: Sequence[str]) -> Tuple[List[str], np.ndarray, np.ndarray]:
+    """Suma las filas de ``volumen`` por etiqueta (alumno, grupo…).
+
+    Devuelve las etiquetas ordenadas, la suma de cada una y cuántas filas tenía.
+    """
+    claves, inversa = _factorizar(etiquetas)
+    n_columnas = volumen.shape[1]
+    indices = (inversa[:, None] * n_columnas + np.arange(n_columnas)).ravel()
+    total = np.bincount(indices, weights=volumen.ravel(), minlength=len(claves) * n_columnas)
+    return claves, total.reshape(len(claves), n_columnas), np.bincount(inversa, minlength=len(claves))
+
+
+def reparto(volumen: np.ndarray) -> np.ndarray:
+    """Fracción del volumen de cada fila que recae en cada músculo (filas que suman 1)."""
+    suma = volumen.sum(axis=1, keepdims=True)
+    return np.divide(volumen, suma, out=np.zeros_like(volumen, dtype=np.float64), where=suma > 0)
+
+
+def informe_cargas(alumnos: Sequence[str], grupos: Sequence[str], volumen: np.ndarray) -> dict:
+    """Volumen por músculo del lote completo y, con :func:`agregar`, por alumno (``grupo · nombre``) y por grupo."""
+    return {
+        "total": volumen.sum(axis=0),
+        "alumnos": agregar(volumen, [f"{grupo} · {alumno}" for alumno, grupo in zip(alumnos, grupos)]),
+        "grupos": agregar(volumen, grupos),
+        "entrenamientos": len(volumen),
+    }
+
+
+def informe_historial(**filtros) -> dict:
+    """Informe de cargas de los registros del historial que cumplen los filtros.
+
+    Solo se compila un cronograma por WOD distinto (huella de contenido), y una
+    sola vez por proceso: los alumnos de una clase que hacen el mismo
+    entrenamiento comparten el cálculo. El informe se cachea hasta que se
+    registra una descarga nueva o cambia el catálogo. ``informe["musculos"]``
+    son las etiquetas de las columnas.
+    """
+    return _informe_historial(historial.ultimo_id(), catalogo_actual(), tuple(sorted(filtros.items())))
+
+
+@lru_cache(maxsize=32)
+def _informe_historial(ultimo_id: int, catalogo: Catalogo, filtros: tuple) -> dict:
+    global _version_cache
+    alumnos, grupos, contenidos = historial.contenidos(**dict(filtros))
+    claves, inversa = _factorizar(contenidos)
+    if _version_cache != catalogo.version:
+        _volumen_contenido.clear()
+        _version_cache = catalogo.version
+    nuevos = [clave for clave in claves if clave not in _volumen_contenido]
+    if nuevos:
+        if len(_volumen_contenido) + len(nuevos) > MAX_CONTENIDOS_CACHE:
+            _volumen_contenido.clear()
+        specs = historial.specs_por_contenido(nuevos)
+        nuevos = [clave for clave in nuevos if clave in specs]
+        # Los WOD que faltan se compilan en un único lote.
+        _volumen_contenido.update(zip(nuevos, volumen_por_musculo([specs[clave] for clave in nuevos], catalogo)))
+    n_musculos = len(catalogo.musculos)
+    vacio = np.zeros(n_musculos)
+    unicos = np.array([_volumen_contenido.get(clave, vacio) for clave in claves]).reshape(-1, n_musculos)
+    return dict(informe_cargas(alumnos, grupos, unicos[inversa]), musculos=catalogo.musculos)
@@ -0,0 +1,383 @@
+"""Caché de artefactos (PDFs, iconos e imágenes procesadas) compartible entre réplicas.
+
+``CROSSFIT_CACHE`` elige dónde se guardan:
+
+vacío o ``memoria``
+    En el proceso (cada réplica tiene la suya), como hasta ahora.
+una ruta
+    Una carpeta compartida por todas las réplicas (volumen común). Cada
+    artefacto se escribe en un temporal y se renombra, así que nadie lee uno a
+    medias; cuando la carpeta pasa de ``CROSSFIT_CACHE_MAX_MB`` se borran los
+    menos usados.
+``redis://[:clave@]host[:puerto][/bd]``
+    Cualquier servidor que hable el protocolo de Redis (Redis, Valkey, KeyDB o
+    un sustituto local). Los artefactos caducan a los ``CROSSFIT_CACHE_TTL``
+    segundos y el servidor se encarga de expulsar lo que no quepa. Si el
+    servidor no responde, la caché se salta durante unos segundos y los
+    artefactos se generan sin ella.
+
+Las claves salen de :func:`clave`: un espacio (``pdf``, ``icono``, ``imagen``…)
+y la huella de lo que determina el contenido, de modo que dos réplicas que
+generarían el mismo artefacto comparten la entrada.
+"""
+
+import hashlib
+import json
+import logging
+import os
+import socket
+import tempfile
+import threading
+import time
+from collections import Counter, OrderedDict
+from pathlib import Path
+from typing import Callable, Optional, Sequence
+from urllib.parse import unquote, urlparse
+
+VARIABLE_CACHE = "CROSSFIT_CACHE"
+VARIABLE_MAX_MB = "CROSSFIT_CACHE_MAX_MB"
+VARIABLE_TTL = "CROSSFIT_CACHE_TTL"
+MAX_MB_POR_DEFECTO = 256
+TTL_POR_DEFECTO = 7 * 24 * 3600
+# Cambiarlo invalida todo lo guardado (p. ej. si cambia el dibujo de los iconos)
+VERSION_CACHE = 1
+
+logger = logging.getLogger(__name__)
+
+
+def clave(espacio: str, *partes) -> str:
+    """Clave ``espacio/huella`` de un artefacto determinado por ``partes`` (valores JSON)."""
+    texto = json.dumps([VERSION_CACHE, *partes], ensure_ascii=False, separators=(",", ":"), default=str)
+    return f"{espacio}/{hashlib.blake2b(texto.encode('utf-8'), digest_size=20).hexdigest()}"
+
+
+def escribir_atomico(destino: Path, datos: bytes):
+    """Escritura atómica: otro proceso nunca ve un archivo a medias."""
+    destino.parent.mkdir(parents=True, exist_ok=True)
+    descriptor, temporal = tempfile.mkstemp(dir=destino.parent, suffix=".tmp")
+    try:
+        with os.fdopen(descriptor, "wb") as archivo:
+            archivo.write(datos)
+        os.replace(temporal, destino)
+    except BaseException:
+        os.unlink(temporal)
+        raise
+
+
+class Almacen:
+    """Interfaz de los almacenes: ``obtener`` devuelve None si la clave no está (o el almacén falla)."""
+
+    tipo = ""
+
+    def __init__(self):
+        self._bloqueo = threading.Lock()
+        self._contadores = Counter()
+
+    def obtener(self, clave: str) -> Optional[bytes]:
+        raise NotImplementedError
+
+    def guardar(self, clave: str, datos: bytes):
+        raise NotImplementedError
+
+    def _contar(self, evento: str, cantidad: int = 1):
+        with self._bloqueo:
+            self._contadores[evento] += cantidad
+
+    def estadisticas(self) -> dict:
+        with self._bloqueo:
+            return {
+                "tipo": self.tipo,
+                "aciertos": self._contadores["aciertos"],
+                "fallos": self._contadores["fallos"],
+                "guardados": self._contadores["guardados"],
+                "errores": self._contadores["errores"],
+                "expulsados": self._contadores["expulsados"],
+            }
+
+
+class AlmacenMemoria(Almacen):
+    """LRU en el proceso limitado por bytes."""
+
+    tipo = "memoria"
+
+    def __init__(self, max_bytes: int):
+        super().__init__()
+        self.max_bytes = max_bytes
+        self._datos: "OrderedDict[str, bytes]" = OrderedDict()
+        self._bytes = 0
+
+    def obtener(self, clave: str) -> Optional[bytes]:
+        with self._bloqueo:
+            datos = self._datos.get(clave)
+            if datos is None:
+                self._contadores["fallos"] += 1
+                return None
+            self._datos.move_to_end(clave)
+            self._contadores["aciertos"] += 1
+            return datos
+
+    def guardar(self, clave: str, datos: bytes):
+        if len(datos) > self.max_bytes:
+            return
+        with self._bloqueo:
+            anterior = self._datos.pop(clave, None)
+            self._bytes += len(datos) - (len(anterior) if anterior is not None else 0)
+            self._datos[clave] = datos
+            self._contadores["guardados"] += 1
+            while self._bytes > self.max_bytes:
+                _, expulsado = self._datos.popitem(last=False)
+                self._bytes -= len(expulsado)
+                self._contadores["expulsados"] += 1
+
+
+class AlmacenDirectorio(Almacen):
+    """Carpeta compartida: ``<raiz>/<espacio>/<h[:2]>/<huella>``.
+
+    Leer un artefacto renueva su fecha de modificación (como mucho una vez por
+    ``INTERVALO_USO``), que es lo que se usa para expulsar los menos usados.
+    """
+
+    tipo = "directorio"
+    INTERVALO_USO = 60.0
+    # Además de al pasarse del tamaño, se revisa la carpeta cada tanto (otras réplicas también escriben)
+    INTERVALO_REVISION = 300.0
+    # Tras recortar queda este porcentaje del máximo, para no recortar en cada escritura
+    OBJETIVO_RECORTE = 0.9
+    # Temporales que una réplica caída dejó a medias
+    EDAD_TEMPORALES = 3600.0
+
+    def __init__(self, raiz: Path, max_bytes: int):
+        super().__init__()
+        self.raiz = raiz
+        self.max_bytes = max_bytes
+        self._bytes: Optional[int] = None
+        self._revisado = 0.0
+        self._recortando = threading.Lock()
+
+    def _ruta(self, clave: str) -> Path:
+        espacio, _, huella = clave.rpartition("/")
+        return self.raiz / espacio / huella[:2] / huella
+
+    def obtener(self, clave: str) -> Optional[bytes]:
+        ruta = self._ruta(clave)
+        try:
+            datos = ruta.read_bytes()
+        except FileNotFoundError:
+            self._contar("fallos")
+            return None
+        except OSError as exc:
+            logger.warning("No se ha podido leer %s de la caché: %s", ruta, exc)
+            self._contar("errores")
+            return None
+        try:
+            if time.time() - ruta.stat().st_mtime > self.INTERVALO_USO:
+                os.utime(ruta)
+        except OSError:
+            # Otra réplica acaba de expulsarlo; los datos ya están leídos.
+            pass
+        self._contar("aciertos")
+        return datos
+
+    def guardar(self, clave: str, datos: bytes):
+        if len(datos) > self.max_bytes:
+            return
+        try:
+            escribir_atomico(self._ruta(clave), datos)
+        except OSError as exc:
+            logger.warning("No se ha podido guardar %s en la caché: %s", clave, exc)
+            self._contar("errores")
+            return
+        with self._bloqueo:
+            self._contadores["guardados"] += 1
+            if self._bytes is not None:
+                self._bytes += len(datos)
+            revisar = (
+                self._bytes is None or self._bytes > self.max_bytes
+                or time.monotonic() - self._revisado > self.INTERVALO_REVISION
+            )
+        if revisar:
+            self.recortar()
+
+    def recortar(self):
+        """Mide la carpeta y, si pasa del máximo, borra los artefactos usados hace más tiempo."""
+        if not self._recortando.acquire(blocking=False):
+            return
+        try:
+            ahora = time.time()
+            archivos = []
+            for carpeta, _, nombres in os.walk(self.raiz):
+                for nombre in nombres:
+                    ruta = os.path.join(carpeta, nombre)
+                    try:
+                        estado = os.stat(ruta)
+                    except FileNotFoundError:
+                        continue
+                    if nombre.endswith(".tmp"):
+                        if ahora - estado.st_mtime > self.EDAD_TEMPORALES:
+                            self._borrar(ruta)
+                        continue
+                    archivos.append((estado.st_mtime, estado.st_size, ruta))
+            total = sum(tamano for _, tamano, _ in archivos)
+            expulsados = 0
+            if total > self.max_bytes:
+                archivos.sort()
+                objetivo = self.max_bytes * self.OBJETIVO_RECORTE
+                for _, tamano, ruta in archivos:
+                    if total <= objetivo:
+                        break
+                    self._borrar(ruta)
+                    total -= tamano
+                    expulsados += 1
+            with self._bloqueo:
+                self._bytes = total
+                self._revisado = time.monotonic()
+                self._contadores["expulsados"] += expulsados
+        finally:
+            self._recortando.release()
+
+    @staticmethod
+    def _borrar(ruta: str):
+        try:
+            os.unlink(ruta)
+        except FileNotFoundError:
+            # Otra réplica lo ha borrado antes
+            pass
+
+
+class ErrorRedis(Exception):
+    pass
+
+
+class AlmacenRedis(Almacen):
+    """Cliente mínimo del protocolo de Redis (RESP2), con una conexión por hilo."""
+
+    tipo = "redis"
+    TIMEOUT = 2.0
+    # Tras un fallo de conexión la caché se salta durante este tiempo
+    PAUSA_TRAS_FALLO = 5.0
+    PREFIJO = "crossfit:"
+
+    def __init__(self, url: str, ttl: int):
+        super().__init__()
+        partes = urlparse(url)
+        self.host = partes.hostname or "localhost"
+        self.puerto = partes.port or 6379
+        self.clave_servidor = unquote(partes.password) if partes.password else None
+        self.usuario = unquote(partes.username) if partes.username else None
+        ruta = partes.path.strip("/")
+        self.bd = int(ruta) if ruta.isdigit() else 0
+        self.ttl = ttl
+        self._hilo = threading.local()
+        self._pausa_hasta = 0.0
+
+    def _conectar(self):
+        conexion = socket.create_connection((self.host, self.puerto), timeout=self.TIMEOUT)
+        conexion.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+        self._hilo.conexion = conexion
+        self._hilo.lector = conexion.makefile("rb")
+        if self.clave_servidor is not None:
+            self._orden(b"AUTH", *([self.usuario.encode("utf-8")] if self.usuario else []), self.clave_servidor.encode("utf-8"))
+        if self.bd:
+            self._orden(b"SELECT", str(self.bd).encode("ascii"))
+
+    def _cerrar(self):
+        conexion = getattr(self._hilo, "conexion", None)
+        self._hilo.conexion = self._hilo.lector = None
+        if conexion is not None:
+            try:
+                conexion.close()
+            except OSError:
+                pass
+
+    def _leer(self):
+        lector = self._hilo.lector
+        linea = lector.readline()
+        if not linea.endswith(b"\r\n"):
+            raise ConnectionError("Conexión cerrada por el servidor")
+        tipo, valor = linea[:1], linea[1:-2]
+        if tipo == b"+":
+            return valor
+        if tipo == b"-":
+            raise ErrorRedis(valor.decode("utf-8", "replace"))
+        if tipo == b":":
+            return int(valor)
+        if tipo == b"$":
+            longitud = int(valor)
+            if longitud < 0:
+                return None
+            datos = lector.read(longitud + 2)
+            if len(datos) != longitud + 2:
+                raise ConnectionError("Respuesta incompleta del servidor")
+            return datos[:-2]
+        if tipo == b"*":
+            longitud = int(valor)
+            return None if longitud < 0 else [self._leer() for _ in range(longitud)]
+        raise ConnectionError(f"Respuesta no válida del servidor: {linea[:20]!r}")
+
+    def _orden(self, *argumentos: bytes):
+        partes = [b"*%d\r\n" % len(argumentos)]
+        for argumento in argumentos:
+            partes += [b"$%d\r\n" % len(argumento), argumento, b"\r\n"]
+        self._hilo.conexion.sendall(b"".join(partes))
+        return self._leer()
+
+    def _ejecutar(self, *argumentos: bytes):
+        """Respuesta de la orden o None si el servidor no está disponible."""
+        if time.monotonic() < self._pausa_hasta:
+            return None
+        try:
+            if getattr(self._hilo, "conexion", None) is None:
+                self._conectar()
+            return self._orden(*argumentos)
+        except (OSError, ValueError, ErrorRedis) as exc:
+            self._cerrar()
+            self._pausa_hasta = time.monotonic() + self.PAUSA_TRAS_FALLO
+            logger.warning("Caché Redis en %s:%s no disponible: %s", self.host, self.puerto, exc)
+            self._contar("errores")
+            return None
+
+    def obtener(self, clave: str) -> Optional[bytes]:
+        datos = self._ejecutar(b"GET", (self.PREFIJO + clave).encode("utf-8"))
+        if isinstance(datos, bytes):
+            self._contar("aciertos")
+            return datos
+        self._contar("fallos")
+        return None
+
+    def guardar(self, clave: str, datos: bytes):
+        respuesta = self._ejecutar(
+            b"SET", (self.PREFIJO + clave).encode("utf-8"), datos, b"EX", str(self.ttl).encode("ascii")
+        )
+        if respuesta is not None:
+            self._contar("guardados")
+
+
+def almacen_desde_entorno() -> Almacen:
+    def leer(variable, defecto):
+        try:
+            return int(os.environ.get(variable, defecto))
+        except ValueError:
+            return defecto
+
+    destino = os.environ.get(VARIABLE_CACHE, "").strip()
+    max_bytes = max(1, leer(VARIABLE_MAX_MB, MAX_MB_POR_DEFECTO)) * 1024 * 1024
+    if destino.startswith("redis://"):
+        return AlmacenRedis(destino, max(1, leer(VARIABLE_TTL, TTL_POR_DEFECTO)))
+    if destino and destino != "memoria":
+        return AlmacenDirectorio(Path(destino).expanduser(), max_bytes)
+    return AlmacenMemoria(max_bytes)
+
+
+# Compartido por todo el proceso.
+almacen = almacen_desde_entorno()
+
+
+def memorizar(espacio: str, partes: Sequence, generar: Callable[[], Optional[bytes]]) -> Optional[bytes]:
+    """Artefacto de la caché o, si no está, ``generar()`` guardado para las demás réplicas (None no se guarda)."""
+    clave_artefacto = clave(espacio, *partes)
+    datos = almacen.obtener(clave_artefacto)
+    if datos is None:
+        datos = generar()
+        if datos is not None:
+            almacen.guardar(clave_artefacto, datos)
+    return datos
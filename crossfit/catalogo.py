@@ -0,0 +1,262 @@
+"""Catálogo de ejercicios cargado de un archivo JSON que se recarga en caliente.
+
+El archivo (``ejercicios.json`` junto a este módulo o el que indique
+``CROSSFIT_CATALOGO``) agrupa los ejercicios por categoría::
+
+    {"categorias": {"Autocarga": {"Burpees": {"id": 2, "musculos": ["Cuerpo completo", "Cardio"]}}}}
+
+El ``id`` es el que usan los enlaces ``?w=``: no se reutiliza ni se cambia. Un
+ejercicio nuevo sin ``id`` recibe el siguiente libre (conviene escribirlo en el
+archivo para que no cambie al reiniciar). Los ejercicios que se quitan dejan su
+id reservado: los enlaces antiguos siguen decodificándose, aunque el WOD ya no
+sea válido.
+
+Cada :class:`Catalogo` es una instantánea inmutable con sus índices. Al cambiar
+el archivo se construye una nueva a partir de la anterior (solo se recalculan
+las filas de los ejercicios que cambian; los músculos nuevos se añaden al final)
+y se sustituye de una vez. Cada rerun fija con :func:`fijar_catalogo` la
+instantánea que usará de principio a fin, así que una recarga nunca se ve a
+medias. El trabajo que el rerun manda a otro hilo (los PDFs del control de
+admisión) se envuelve con :func:`con_catalogo` para que use esa misma
+instantánea.
+"""
+
+import hashlib
+import json
+import logging
+import os
+import threading
+import time
+from pathlib import Path
+from types import MappingProxyType
+from typing import Callable, Dict, List, Mapping, Optional, Tuple
+
+import numpy as np
+
+VARIABLE_RUTA = "CROSSFIT_CATALOGO"
+RUTA_POR_DEFECTO = Path(__file__).resolve().parent / "ejercicios.json"
+# Como mucho una comprobación del archivo cada tantos segundos
+INTERVALO_COMPROBACION = 2.0
+MUSCULOS_POR_DEFECTO = ("Cuerpo completo",)
+
+logger = logging.getLogger(__name__)
+
+Par = Tuple[str, str]
+
+
+class CatalogoInvalido(ValueError):
+    pass
+
+
+def _leer(texto: str) -> List[Tuple[str, str, Optional[int], Tuple[str, ...]]]:
+    """Entradas ``(categoria, nombre, id, musculos)`` del JSON, en el orden del archivo."""
+    try:
+        datos = json.loads(texto)
+    except json.JSONDecodeError as exc:
+        raise CatalogoInvalido(f"JSON no válido: {exc}") from None
+    categorias = datos.get("categorias") if isinstance(datos, dict) else None
+    if not isinstance(categorias, dict) or not categorias:
+        raise CatalogoInvalido("Falta el objeto «categorias»")
+    entradas = []
+    ids = set()
+    for categoria, ejercicios in categorias.items():
+        if not categoria or not isinstance(ejercicios, dict):
+            raise CatalogoInvalido(f"Categoría no válida: {categoria!r}")
+        for nombre, info in ejercicios.items():
+            info = info if isinstance(info, dict) else {}
+            identificador = info.get("id")
+            musculos = info.get("musculos") or list(MUSCULOS_POR_DEFECTO)
+            if not nombre or not isinstance(musculos, list) or not all(isinstance(m, str) and m for m in musculos):
+                raise CatalogoInvalido(f"Ejercicio no válido en {categoria}: {nombre!r}")
+            if identificador is not None:
+                if not isinstance(identificador, int) or isinstance(identificador, bool) or identificador < 0:
+                    raise CatalogoInvalido(f"Id no válido en {categoria} – {nombre}")
+                if identificador in ids:
+                    raise CatalogoInvalido(f"Id repetido: {identificador}")
+                ids.add(identificador)
+            entradas.append((categoria, nombre, identificador, tuple(dict.fromkeys(musculos))))
+    return entradas
+
+
+class Catalogo:
+    """Instantánea inmutable del catálogo y sus índices."""
+
+    def __init__(self, version: int, ejercicios: Dict[str, Tuple[str, ...]], por_id: Tuple[Optional[Par], ...],
+                 id_de: Dict[Par, int], musculos_id: Tuple[Tuple[str, ...], ...], musculos: Tuple[str, ...], matriz: np.ndarray,
+                 cambiados: frozenset, huella: str):
+        self.version = version
+        # Huella del contenido: igual en todas las réplicas que leen el mismo archivo
+        self.huella = huella
+        # Categoría -> ejercicios activos, en el orden del archivo
+        self.ejercicios: Mapping[str, Tuple[str, ...]] = MappingProxyType(ejercicios)
+        # Id -> (categoria, nombre), incluidos los retirados (None = hueco)
+        self.por_id = por_id
+        self.id_de: Mapping[Par, int] = MappingProxyType(id_de)
+        self.musculos_id = musculos_id
+        # Músculos en orden de aparición (solo se añaden al final)
+        self.musculos = musculos
+        # Incidencia id × músculo; la última fila es la de un ejercicio desconocido
+        self.matriz = matriz
+        self.cambiados = cambiados
+        self._por_nombre: Dict[str, Tuple[str, ...]] = {}
+        for categoria, nombres in ejercicios.items():
+            for nombre in nombres:
+                self._por_nombre.setdefault(nombre, musculos_id[self.id_de[(categoria, nombre)]])
+        self._derivados: Dict[str, object] = {}
+
+    @property
+    def id_desconocido(self) -> int:
+        return len(self.por_id)
+
+    def musculos_de(self, nombre: str, categoria: Optional[str] = None) -> Tuple[str, ...]:
+        if categoria is not None:
+            identificador = self.id_de.get((categoria, nombre))
+            if identificador is not None:
+                return self.musculos_id[identificador]
+        return self._por_nombre.get(nombre, MUSCULOS_POR_DEFECTO)
+
+    def derivado(self, clave: str, funcion: Callable[["Catalogo"], object]):
+        """Índice derivado calculado una vez por instantánea (``funcion(self)``)."""
+        try:
+            return self._derivados[clave]
+        except KeyError:
+            return self._derivados.setdefault(clave, funcion(self))
+
+
+def construir(entradas, anterior: Optional[Catalogo] = None) -> Catalogo:
+    """Nueva instantánea; con ``anterior`` conserva sus ids y reutiliza las filas que no cambian."""
+    por_id: List[Optional[Par]] = list(anterior.por_id) if anterior else []
+    musculos_id: List[Tuple[str, ...]] = list(anterior.musculos_id) if anterior else []
+    id_de = dict(anterior.id_de) if anterior else {}
+    musculos = list(anterior.musculos) if anterior else list(MUSCULOS_POR_DEFECTO)
+    fijos = {identificador for _, _, identificador, _ in entradas if identificador is not None}
+    siguiente = max(fijos | {len(por_id) - 1}) + 1
+
+    asignados = []
+    for categoria, nombre, identificador, lista in entradas:
+        if identificador is None:
+            identificador = id_de.get((categoria, nombre))
+            if identificador is None or identificador in fijos:
+                identificador = siguiente
+                siguiente += 1
+            fijos.add(identificador)
+        asignados.append((categoria, nombre, identificador, lista))
+
+    faltan = siguiente - len(por_id)
+    por_id += [None] * faltan
+    musculos_id += [MUSCULOS_POR_DEFECTO] * faltan
+    cambiados = set()
+    ejercicios: Dict[str, List[str]] = {}
+    for categoria, nombre, identificador, lista in asignados:
+        par = (categoria, nombre)
+        if por_id[identificador] != par or musculos_id[identificador] != lista:
+            anterior_par = por_id[identificador]
+            if anterior_par is not None and id_de.get(anterior_par) == identificador:
+                del id_de[anterior_par]
+            por_id[identificador] = par
+            musculos_id[identificador] = lista
+            id_de[par] = identificador
+            cambiados.add(identificador)
+        ejercicios.setdefault(categoria, []).append(nombre)
+        musculos += [musculo for musculo in lista if musculo not in musculos]
+
+    matriz = np.zeros((len(por_id) + 1, len(musculos)), dtype=np.float32)
+    if anterior is not None:
+        filas, columnas = anterior.matriz.shape
+        matriz[:filas - 1, :columnas] = anterior.matriz[:-1]
+    indice = {musculo: posicion for posicion, musculo in enumerate(musculos)}
+    for identificador in cambiados:
+        matriz[identificador] = 0.0
+        matriz[identificador, [indice[musculo] for musculo in musculos_id[identificador]]] = 1.0
+    matriz[-1, [indice[musculo] for musculo in MUSCULOS_POR_DEFECTO]] = 1.0
+    matriz.flags.writeable = False
+    version = anterior.version + 1 if anterior else 1
+    huella = hashlib.blake2b(
+        json.dumps(asignados, ensure_ascii=False, separators=(",", ":")).encode("utf-8"), digest_size=16
+    ).hexdigest()
+    return Catalogo(
+        version, {categoria: tuple(nombres) for categoria, nombres in ejercicios.items()}, tuple(por_id), id_de,
+        tuple(musculos_id), tuple(musculos), matriz, frozenset(cambiados), huella,
+    )
+
+
+class _Vigilante:
+    """Guarda la instantánea vigente y la renueva cuando cambia el archivo."""
+
+    def __init__(self, ruta: Path):
+        self.ruta = ruta
+        self.ultimo_error: Optional[str] = None
+        self._bloqueo = threading.Lock()
+        self._firma = self._firma_archivo()
+        self._comprobado = time.monotonic()
+        try:
+            self.catalogo = construir(_leer(ruta.read_text(encoding="utf-8")))
+        except CatalogoInvalido as exc:
+            raise CatalogoInvalido(f"{ruta}: {exc}") from None
+
+    def _firma_archivo(self):
+        try:
+            estado = self.ruta.stat()
+        except OSError:
+            return None
+        return estado.st_mtime_ns, estado.st_size
+
+    def comprobar(self, forzar: bool = False) -> Catalogo:
+        """Instantánea vigente, recargando el archivo si ha cambiado."""
+        ahora = time.monotonic()
+        if not forzar and ahora - self._comprobado < INTERVALO_COMPROBACION:
+            return self.catalogo
+        with self._bloqueo:
+            self._comprobado = ahora
+            firma = self._firma_archivo()
+            if firma is None or firma == self._firma:
+                return self.catalogo
+            self._firma = firma
+            try:
+                nuevo = construir(_leer(self.ruta.read_text(encoding="utf-8")), self.catalogo)
+            except (OSError, UnicodeDecodeError, CatalogoInvalido) as exc:
+                # Se sigue con la instantánea anterior hasta que el archivo se corrija.
+                self.ultimo_error = str(exc)
+                logger.warning("No se ha podido recargar el catálogo %s: %s", self.ruta, exc)
+                return self.catalogo
+            self.ultimo_error = None
+            self.catalogo = nuevo
+            logger.info("Catálogo recargado (versión %d, %d ejercicios cambiados)", nuevo.version, len(nuevo.cambiados))
+            return nuevo
+
+
+def _ruta() -> Path:
+    valor = os.environ.get(VARIABLE_RUTA, "").strip()
+    return Path(valor).expanduser() if valor else RUTA_POR_DEFECTO
+
+
+vigilante = _Vigilante(_ruta())
+_hilo = threading.local()
+
+
+def fijar_catalogo(forzar: bool = False) -> Catalogo:
+    """Comprueba el archivo y fija la instantánea vigente para el resto del rerun de este hilo."""
+    _hilo.catalogo = vigilante.comprobar(forzar)
+    return _hilo.catalogo
+
+
+def catalogo_actual() -> Catalogo:
+    """Instantánea fijada en este hilo o, si no hay, la vigente."""
+    fijado = getattr(_hilo, "catalogo", None)
+    return vigilante.catalogo if fijado is None else fijado
+
+
+def con_catalogo(funcion: Callable, catalogo: Optional[Catalogo] = None) -> Callable:
+    """``funcion`` con la instantánea de este hilo (o ``catalogo``) fijada en el hilo que la ejecute."""
+    catalogo = catalogo or catalogo_actual()
+
+    def fijada(*args, **kwargs):
+        anterior = getattr(_hilo, "catalogo", None)
+        _hilo.catalogo = catalogo
+        try:
+            return funcion(*args, **kwargs)
+        finally:
+            # Los hilos de un ejecutor se reutilizan: no se quedan con la instantánea
+            _hilo.catalogo = anterior
+
+    return fijada
@@ -0,0 +1,94 @@
+"""Contexto de renderizado que comparten todos los PDFs del proceso.
+
+Streamlit ejecuta el script de cada sesión en su propio hilo, así que varios
+PDFs pueden generarse a la vez. Todo lo que no depende del WOD (fuentes
+registradas, estilos de párrafo, iconos y logos) se resuelve una sola vez, bajo
+un candado, en un :class:`ContextoRender` inmutable: las imágenes son ``bytes``
+y los estilos no se modifican nunca (quien necesite otro lo deriva con
+``ParagraphStyle(parent=...)``). Cada PDF crea a partir de él sus propios
+flowables, ``BytesIO`` e ``ImageReader``, que nunca se comparten.
+"""
+
+import threading
+from types import MappingProxyType
+from typing import Mapping, NamedTuple, Optional
+
+from reportlab.lib import colors
+from reportlab.lib.enums import TA_CENTER
+from reportlab.lib.styles import ParagraphStyle, getSampleStyleSheet
+
+from crossfit.recursos import (
+    ENCABEZADO_IMG,
+    ICONOS_DECORATIVOS,
+    generar_icono_decorativo,
+    obtener_fuentes_para_pdf,
+    obtener_icono_profesor_pdf_bytes,
+    obtener_logo_creative_commons,
+)
+
+
+class ContextoRender(NamedTuple):
+    fuente: str
+    fuente_negrita: str
+    # Estilos de párrafo del PDF completo, por nombre
+    estilos: Mapping[str, ParagraphStyle]
+    # "encabezado", "profesor", "creative_commons" y los iconos decorativos
+    imagenes: Mapping[str, Optional[bytes]]
+
+    def imagen(self, nombre: str) -> Optional[bytes]:
+        return self.imagenes.get(nombre)
+
+
+def _estilos(fuente: str, negrita: str) -> Mapping[str, ParagraphStyle]:
+    base = getSampleStyleSheet()
+    celda = ParagraphStyle(
+        'CellText', parent=base['BodyText'], fontSize=10, leading=13, textColor=colors.HexColor('#1F2933'),
+        fontName=fuente,
+    )
+    celda_negrita = ParagraphStyle('CellTextBold', parent=celda, fontName=negrita)
+    return MappingProxyType({
+        "titulo": ParagraphStyle(
+            'CustomTitle', parent=base['Heading1'], fontSize=24, textColor=colors.HexColor('#FF6B6B'),
+            spaceAfter=10, alignment=TA_CENTER, fontName=negrita,
+        ),
+        "cabecera_seccion": ParagraphStyle(
+            'SectionHeader', parent=base['Heading2'], fontSize=15, textColor=colors.whitesmoke, fontName=negrita,
+        ),
+        "celda": celda,
+        "celda_negrita": celda_negrita,
+        "centrado_negrita": ParagraphStyle(
+            'CenterBold', parent=celda_negrita, alignment=TA_CENTER, fontSize=11,
+        ),
+        "leyenda": ParagraphStyle(
+            'Caption', parent=celda, fontSize=8, leading=10, textColor=colors.HexColor('#475569'),
+        ),
+        "bloque_tipo": ParagraphStyle(
+            'TipoBlock', parent=base['BodyText'], fontSize=11, leading=15, textColor=colors.HexColor('#1F2933'),
+            fontName=fuente,
+        ),
+    })
+
+
+def _resolver() -> ContextoRender:
+    fuente, negrita = obtener_fuentes_para_pdf()
+    imagenes = {tipo: generar_icono_decorativo(tipo) for tipo in ICONOS_DECORATIVOS}
+    imagenes["encabezado"] = ENCABEZADO_IMG.read_bytes() if ENCABEZADO_IMG.exists() else None
+    imagenes["profesor"] = obtener_icono_profesor_pdf_bytes()
+    imagenes["creative_commons"] = obtener_logo_creative_commons()
+    return ContextoRender(fuente, negrita, _estilos(fuente, negrita), MappingProxyType(imagenes))
+
+
+_contexto: Optional[ContextoRender] = None
+_bloqueo = threading.Lock()
+
+
+def contexto_render() -> ContextoRender:
+    """El contexto del proceso; el primer PDF lo resuelve y los demás lo leen sin candado."""
+    global _contexto
+    contexto = _contexto
+    if contexto is None:
+        with _bloqueo:
+            if _contexto is None:
+                _contexto = _resolver()
+            contexto = _contexto
+    return contexto
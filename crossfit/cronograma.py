@@ -0,0 +1,199 @@
+"""Motor de cronogramas: convierte specs de WOD en intervalos con NumPy.
+
+Cada intervalo es una fila de ``INTERVALO`` (spec, ronda, ejercicio, inicio,
+fin, repeticiones objetivo); los descansos tienen ``ejercicio == -1``. Todos los
+tipos de WOD se generan con las mismas operaciones vectorizadas, así que
+``compilar_lote`` procesa miles de specs de una vez para exportaciones y
+analítica. Las duraciones de AMRAP, AFAP, Ladder y circuitos se estiman a partir
+de segundos por repetición (o por metro en las carreras).
+"""
+
+import math
+import re
+from functools import lru_cache
+from typing import TYPE_CHECKING, Sequence, Tuple
+
+import numpy as np
+
+from crossfit.datos import CIRCUITO_ENTRENAMIENTO_KEY, OBJETIVOS_ENTRENAMIENTO, extraer_rango_numerico, valor_intermedio
+
+if TYPE_CHECKING:
+    from crossfit.spec import WorkoutSpec
+
+INTERVALO = np.dtype([
+    ("spec", "<i4"),
+    ("ronda", "<i2"),
+    ("ejercicio", "<i2"),
+    ("inicio", "<f4"),
+    ("fin", "<f4"),
+    ("reps", "<i4"),
+])
+RESUMEN = np.dtype([
+    ("duracion", "<f4"),
+    ("trabajo", "<f4"),
+    ("descanso", "<f4"),
+    ("reps", "<i8"),
+    ("intervalos", "<i4"),
+])
+
+TABATA_BLOQUES = 8
+TABATA_TRABAJO = 20
+TABATA_DESCANSO = 10
+SEGUNDOS_EMOM = 60
+REPS_POR_DEFECTO = 10
+SEGUNDOS_POR_REP = 3.0
+SEGUNDOS_POR_REP_CATEGORIA = {
+    "Barra Olímpica": 4.0,
+    "Cajón": 2.5,
+    "Comba": 0.6,
+    "Carrera": 12.0,  # Shuttle Run: cada repetición es un ida y vuelta
+}
+SEGUNDOS_POR_METRO = 0.3
+
+# Códigos internos de tipo de WOD.
+_AMRAP, _EMOM, _TABATA, _LADDER, _RONDAS = range(5)
+_CODIGOS = {"AMRAP": _AMRAP, "EMOM": _EMOM, "Tabata": _TABATA, "Ladder": _LADDER}
+
+
+@lru_cache(maxsize=1024)
+def _estimacion(categoria: str, nombre: str, repeticiones) -> Tuple[int, float, float]:
+    """(reps objetivo, segundos por rep, segundos fijos) de un ejercicio."""
+    if isinstance(repeticiones, str):
+        segundos = re.match(r"(\d+)\s*s$", repeticiones.strip())
+        return 0, 0.0, float(segundos.group(1)) if segundos else 0.0
+    if repeticiones is None:
+        distancia = re.search(r"(\d+)\s*(k?m)\b", nombre)
+        if distancia:
+            metros = int(distancia.group(1)) * (1000 if distancia.group(2) == "km" else 1)
+            return 0, 0.0, metros * SEGUNDOS_POR_METRO
+        repeticiones = 0
+    return int(repeticiones), SEGUNDOS_POR_REP_CATEGORIA.get(categoria, SEGUNDOS_POR_REP), 0.0
+
+
+def _segundos_descanso(texto: str) -> int:
+    minimo, maximo = extraer_rango_numerico(texto, 0, 0)
+    segundos = valor_intermedio(minimo, maximo)
+    return segundos * 60 if "min" in (texto or "") else segundos
+
+
+def _segmentos(longitudes: np.ndarray):
+    """Para filas agrupadas por segmento: índice del segmento y posición dentro de él."""
+    total = int(longitudes.sum())
+    segmento = np.repeat(np.arange(len(longitudes)), longitudes)
+    comienzos = np.cumsum(longitudes) - longitudes
+    return segmento, np.arange(total) - comienzos[segmento]
+
+
+def compilar_lote(specs: Sequence["WorkoutSpec"]) -> np.ndarray:
+    """Cronograma de varias specs en un único array ordenado por spec y tiempo."""
+    n_specs = len(specs)
+    tipo = np.empty(n_specs, np.int8)
+    n_ej = np.empty(n_specs, np.int64)
+    rondas = np.zeros(n_specs, np.int64)
+    duracion = np.zeros(n_specs, np.float64)
+    reps_inicio = np.zeros(n_specs, np.int64)
+    salto = np.zeros(n_specs, np.int64)
+    descanso_ronda = np.zeros(n_specs, np.float64)
+    ejercicios = []
+    for i, spec in enumerate(specs):
+        tipo[i] = _CODIGOS.get(spec.tipo, _RONDAS)
+        n_ej[i] = len(spec.ejercicios)
+        rondas[i] = spec.rondas or 0
+        duracion[i] = 60 * (spec.duracion or 0)
+        if spec.tipo == "Ladder":
+            reps_inicio[i] = spec.reps_inicio or 1
+            salto[i] = (spec.incremento or 0) * (-1 if spec.direccion == "Decreciente" else 1)
+        elif spec.tipo == CIRCUITO_ENTRENAMIENTO_KEY:
+            descanso_ronda[i] = _segundos_descanso(OBJETIVOS_ENTRENAMIENTO.get(spec.objetivo, {}).get("descanso"))
+        ejercicios.extend(_estimacion(ej.categoria, ej.nombre, ej.repeticiones) for ej in spec.ejercicios)
+
+    estimaciones = np.array(ejercicios, dtype=np.float64).reshape(-1, 3)
+    reps_ej = estimaciones[:, 0].astype(np.int64)
+    seg_rep = estimaciones[:, 1]
+    fijo = estimaciones[:, 2]
+    primer_ej = np.cumsum(n_ej) - n_ej
+
+    # Duración estimada de cada ejercicio (una ronda) para dimensionar los AMRAP.
+    spec_de_ej = np.repeat(np.arange(n_specs), n_ej)
+    dur_ej = np.where(fijo > 0, fijo, np.where(reps_ej > 0, reps_ej, REPS_POR_DEFECTO) * seg_rep)
+    dur_ronda = np.bincount(spec_de_ej, weights=dur_ej, minlength=n_specs)
+
+    filas = np.where(tipo == _TABATA, TABATA_BLOQUES, rondas * n_ej)
+    filas = np.where(tipo == _EMOM, duracion // SEGUNDOS_EMOM, filas)
+    # Una ronda sin duración estimada cuenta como una sola; el resto, a lo sumo una por segundo.
+    rondas_amrap = np.where(dur_ronda > 0, np.ceil(duracion / np.maximum(dur_ronda, 1.0)), 1)
+    filas = np.where(tipo == _AMRAP, rondas_amrap * n_ej, filas)
+    filas = np.where(n_ej > 0, filas, 0).astype(np.int64)
+
+    s, local = _segmentos(filas)
+    n = n_ej[s]
+    ronda = local // n
+    ej_local = local - ronda * n
+    g = primer_ej[s] + ej_local
+    t = tipo[s]
+
+    reps = np.where(t == _TABATA, 0, reps_ej[g])
+    reps = np.where(t == _LADDER, np.maximum(1, reps_inicio[s] + salto[s] * ronda), reps)
+    trabajo = np.where(fijo[g] > 0, fijo[g], np.where(reps > 0, reps, REPS_POR_DEFECTO) * seg_rep[g])
+    trabajo = np.where(t == _TABATA, TABATA_TRABAJO, trabajo)
+    trabajo = np.where(t == _EMOM, SEGUNDOS_EMOM, trabajo)
+    descanso = np.where(t == _TABATA, TABATA_DESCANSO, 0.0)
+    fin_de_ronda = (ej_local == n - 1) & (ronda < rondas[s] - 1)
+    descanso = np.where(fin_de_ronda, descanso_ronda[s], descanso)
+
+    # Tiempos acumulados dentro de cada spec (suma acumulada segmentada).
+    paso = trabajo + descanso
+    comienzo = np.cumsum(paso) - paso
+    inicio = comienzo - comienzo[(np.cumsum(filas) - filas)[s]]
+    fin = inicio + trabajo
+
+    hay_descanso = descanso > 0
+    total = len(s) + int(hay_descanso.sum())
+    resultado = np.empty(total, dtype=INTERVALO)
+    orden = np.concatenate([2 * np.arange(len(s)), 2 * np.flatnonzero(hay_descanso) + 1])
+    posiciones = np.argsort(orden, kind="stable")
+    columnas = {
+        "spec": (s, s[hay_descanso]),
+        "ronda": (ronda, ronda[hay_descanso]),
+        "ejercicio": (ej_local, np.full(int(hay_descanso.sum()), -1)),
+        "inicio": (inicio, fin[hay_descanso]),
+        "fin": (fin, fin[hay_descanso] + descanso[hay_descanso]),
+        "reps": (reps, np.zeros(int(hay_descanso.sum()))),
+    }
+    for campo, (trabajos, descansos) in columnas.items():
+        resultado[campo] = np.concatenate([trabajos, descansos])[posiciones]
+
+    # Un AMRAP termina al agotar el tiempo, aunque la última ronda quede a medias.
+    limite = np.where(tipo == _AMRAP, duracion, np.inf)[resultado["spec"]]
+    dentro = resultado["inicio"] < limite
+    resultado = resultado[dentro]
+    resultado["fin"] = np.minimum(resultado["fin"], limite[dentro])
+    return resultado
+
+
+@lru_cache(maxsize=512)
+def compilar(spec: "WorkoutSpec") -> np.ndarray:
+    """Cronograma de una spec (cacheado y de solo lectura)."""
+    cronograma = compilar_lote([spec])
+    cronograma.flags.writeable = False
+    return cronograma
+
+
+def resumir_lote(cronograma: np.ndarray, n_specs: int) -> np.ndarray:
+    """Duración, tiempo de trabajo y descanso, repeticiones e intervalos por spec."""
+    spec = cronograma["spec"]
+    largo = (cronograma["fin"] - cronograma["inicio"]).astype(np.float64)
+    es_descanso = cronograma["ejercicio"] < 0
+    resumen = np.zeros(n_specs, dtype=RESUMEN)
+    if len(cronograma):
+        np.maximum.at(resumen["duracion"], spec, cronograma["fin"])
+    resumen["trabajo"] = np.bincount(spec, weights=np.where(es_descanso, 0, largo), minlength=n_specs)
+    resumen["descanso"] = np.bincount(spec, weights=np.where(es_descanso, largo, 0), minlength=n_specs)
+    resumen["reps"] = np.bincount(spec, weights=cronograma["reps"], minlength=n_specs)
+    resumen["intervalos"] = np.bincount(spec[~es_descanso], minlength=n_specs)
+    return resumen
+
+
+def duracion_texto(segundos: float) -> str:
+    minutos, resto = divmod(int(math.ceil(segundos)), 60)
+    return f"{minutos} min {resto:02d} s" if resto else f"{minutos} min"
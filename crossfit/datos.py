@@ -0,0 +1,196 @@
+"""Tipos de WOD, objetivos de entrenamiento y consultas al catálogo de ejercicios."""
+
+import re
+from typing import Optional
+
+from crossfit.catalogo import Catalogo, catalogo_actual
+
+# Los ejercicios (por categoría) y sus músculos están en el catálogo: ver crossfit.catalogo
+
+CARRERA_WODS_PERMITIDOS = {"AMRAP", "EMOM", "AFAP"}
+EMOM_CARRERA_OPCIONES = {"Shuttle Run", "Carrera 100 m", "Carrera 200 m", "Carrera 400 m"}
+
+
+def obtener_categorias_por_tipo(tipo_circuito: str, catalogo: Optional[Catalogo] = None):
+    categorias = []
+    for categoria, ejercicios in (catalogo or catalogo_actual()).ejercicios.items():
+        lista = ejercicios
+        if categoria == "Carrera":
+            if tipo_circuito not in CARRERA_WODS_PERMITIDOS:
+                continue
+            if tipo_circuito == "EMOM":
+                lista = [ej for ej in ejercicios if ej in EMOM_CARRERA_OPCIONES]
+                if not lista:
+                    continue
+        categorias.append((categoria, lista))
+    return categorias
+# Información de tipos de circuito
+TIPOS_CIRCUITO = {
+    "AMRAP": {
+        "nombre": "AMRAP (As Many Rounds As Possible)",
+        "descripcion": "Completa tantas rondas como sea posible en el tiempo establecido",
+        "duracion_sugerida": "10-20 minutos"
+    },
+    "EMOM": {
+        "nombre": "EMOM (Every Minute On the Minute)",
+        "descripcion": "Cada minuto comienza una nueva serie de ejercicios",
+        "duracion_sugerida": "10-20 minutos"
+    },
+    "Tabata": {
+        "nombre": "Tabata",
+        "descripcion": "20 segundos de trabajo intenso, 10 segundos de descanso, repetir 8 veces",
+        "duracion_sugerida": "4 minutos por ejercicio"
+    },
+    "Ladder": {
+        "nombre": "Ladder (Escalera)",
+        "descripcion": "Incrementa o disminuye las repeticiones en cada ronda",
+        "duracion_sugerida": "Variable según repeticiones"
+    },
+    "AFAP": {
+        "nombre": "AFAP (As Fast As Possible)",
+        "descripcion": "Completa las repeticiones establecidas lo más rápido posible",
+        "duracion_sugerida": "Variable"
+    },
+    "Circuito de Entrenamiento": {
+        "nombre": "Circuito de Entrenamiento",
+        "descripcion": "Secuencia de 6 a 12 ejercicios personalizados para objetivos de fuerza",
+        "duracion_sugerida": "Variable según objetivo"
+    }
+}
+
+OBJETIVOS_ENTRENAMIENTO = {
+    "Fuerza Máxima": {
+        "descripcion": "Prioriza la producción de fuerza absoluta con pocas repeticiones y descansos amplios.",
+        "porcentaje": "85–100%",
+        "carga": "85–100% del 1RM",
+        "reps": "1–5",
+        "series": "3–6",
+        "descanso": "3–5 min",
+        "rir": "2–4",
+    },
+    "Hipertrofia": {
+        "descripcion": "Busca aumentar el tamaño muscular con un volumen moderado-alto y descansos controlados.",
+        "porcentaje": "65–85%",
+        "carga": "65–85% del 1RM",
+        "reps": "6–12 (hasta 15)",
+        "series": "3–5",
+        "descanso": "60–90 s",
+        "rir": "0–2",
+    },
+    "Fuerza-Resistencia": {
+        "descripcion": "Mejora la capacidad de sostener esfuerzos prolongados con cargas ligeras y muchas repeticiones.",
+        "porcentaje": "30–60%",
+        "carga": "30–60% del 1RM",
+        "reps": "15–30+",
+        "series": "2–4",
+        "descanso": "30–60 s",
+        "rir": "3–5",
+    },
+}
+
+OBJETIVOS_ORDEN = ["Fuerza Máxima", "Hipertrofia", "Fuerza-Resistencia"]
+MIN_EJERCICIOS_CIRCUITO = 6
+MAX_EJERCICIOS_CIRCUITO = 12
+CIRCUITO_ENTRENAMIENTO_KEY = "Circuito de Entrenamiento"
+EMOM_RECUPERACION_TEXTO = "El tiempo sobrante al terminar las repeticiones indicadas en cada ejercicio"
+
+BORG_ESCALA = [
+    {
+        "nivel": "Muy ligero",
+        "color": "#DCFCE7",
+        "descripcion": "Respiración tranquila; sirve como calentamiento o descarga.",
+    },
+    {
+        "nivel": "Ligero",
+        "color": "#BBF7D0",
+        "descripcion": "Puedes mantener una conversación corta; sensación cómoda.",
+    },
+    {
+        "nivel": "Moderado",
+        "color": "#FDE68A",
+        "descripcion": "Empiezas a sudar; concentración total en la técnica.",
+    },
+    {
+        "nivel": "Duro",
+        "color": "#FECACA",
+        "descripcion": "Respiración intensa; requiere pausas planificadas.",
+    },
+    {
+        "nivel": "Muy duro",
+        "color": "#FCA5A5",
+        "descripcion": "Esfuerzo máximo sostenible sólo durante poco tiempo.",
+    },
+]
+
+BENEFICIOS_WOD = {
+    "AMRAP": [
+        "Mejora la resistencia muscular al repetir rondas sostenidas.",
+        "Potencia la capacidad de gestión del ritmo y del tiempo de trabajo.",
+        "Favorece el uso de cargas moderadas con densidad alta de ejercicio.",
+    ],
+    "EMOM": [
+        "Entrena la velocidad de ejecución bajo fatiga controlada.",
+        "Refuerza la técnica mediante descansos breves y predecibles.",
+        "Optimiza la autogestión del esfuerzo gracias a intervalos fijos.",
+    ],
+    "Tabata": [
+        "Impulsa la potencia anaeróbica con intervalos explosivos.",
+        "Incrementa la tolerancia al lactato en trabajos muy intensos.",
+        "Favorece la quema calórica en tiempos reducidos.",
+    ],
+    "Ladder": [
+        "Desarrolla fuerza progresiva gracias al aumento o disminución de repeticiones.",
+        "Promueve el control de la técnica bajo volúmenes cambiantes.",
+        "Estimula la concentración al gestionar saltos de carga o repeticiones.",
+    ],
+    "AFAP": [
+        "Mejora la potencia y la velocidad de finalización de tareas.",
+        "Incrementa la capacidad de mantener intensidad alta sin pausas largas.",
+        "Entrena la toma de decisiones rápida bajo presión.",
+    ],
+    CIRCUITO_ENTRENAMIENTO_KEY: [
+        "Permite atacar objetivos concretos de fuerza, hipertrofia o resistencia.",
+        "Desarrolla equilibrio muscular combinando implementos y autocargas.",
+        "Favorece la transferencia a gestos deportivos y de la vida diaria.",
+    ],
+}
+
+BENEFICIOS_OTROS = [
+    "Reduce el estrés y mejora el estado de ánimo a través de la liberación de endorfinas.",
+    "Potencia la función cognitiva, la memoria de trabajo y la capacidad de concentración.",
+    "Refuerza la autoconfianza y la percepción de autoeficacia en el entrenamiento diario.",
+    "Mejora la calidad del sueño y acelera la recuperación mental.",
+    "Favorece la socialización y el sentido de comunidad con el grupo de entrenamiento.",
+    "Ayuda a regular la ansiedad y promueve hábitos saludables sostenibles.",
+]
+
+NOTAS_IMPORTANTES = [
+    "Realiza un calentamiento de 5-10 minutos antes de comenzar",
+    "Mantén una técnica correcta en todo momento",
+    "Hidrátate adecuadamente durante el entrenamiento",
+    "Escucha a tu cuerpo y ajusta la intensidad si es necesario",
+    "Realiza estiramientos al finalizar (5-10 minutos)",
+]
+
+TABATA_VIDEO_URL = "https://youtu.be/V67eNoSYwNE"
+TEXTO_QR_WOD = "Escanea el código QR para abrir este mismo WOD en la aplicación y volver a generarlo, o usa este enlace:"
+
+
+def extraer_rango_numerico(texto: Optional[str], fallback_min: int = 1, fallback_max: int = 10):
+    """Obtiene el rango numérico (mínimo, máximo) presente en un texto como "6–12"."""
+    if fallback_min > fallback_max:
+        fallback_max = fallback_min
+    numeros = [int(valor) for valor in re.findall(r"\d+", texto or "")]
+    if not numeros:
+        return fallback_min, fallback_max
+    return min(numeros), max(numeros)
+
+
+def valor_intermedio(min_val: int, max_val: int) -> int:
+    """Devuelve un valor entero centrado dentro del rango dado."""
+    if min_val >= max_val:
+        return min_val
+    return min_val + (max_val - min_val) // 2
+
+def obtener_musculos(ejercicio: str, categoria: Optional[str] = None, catalogo: Optional[Catalogo] = None):
+    return (catalogo or catalogo_actual()).musculos_de(ejercicio, categoria)
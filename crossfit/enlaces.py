@@ -0,0 +1,224 @@
+"""Enlaces compartibles: la selección de un WOD codificada en ``?w=<token>``.
+
+El token es una secuencia de enteros en varint (tipo de WOD, parámetros, ids de
+ejercicio en delta zigzag y repeticiones) codificada en base64url sin relleno;
+un Tabata de cuatro ejercicios ocupa unos 20 caracteres. No incluye el nombre
+ni el grupo del alumno. Al abrir el enlace, los valores se usan como valores
+iniciales de los widgets, así que el entrenamiento aparece en el primer rerun.
+"""
+
+import base64
+import os
+from functools import lru_cache
+from typing import List, Optional
+
+import streamlit as st
+
+from crossfit.catalogo import catalogo_actual
+from crossfit.datos import OBJETIVOS_ORDEN, TIPOS_CIRCUITO
+from crossfit.spec import DIRECCIONES_LADDER, EjercicioSpec, SpecInvalida, WorkoutSpec
+
+PARAMETRO_URL = "w"
+VERSION_ENLACE = 1
+CLAVE_SESION = "_valores_enlace"
+MAX_EJERCICIOS_ENLACE = 64
+# URL pública de la aplicación para construir enlaces absolutos (p. ej. https://crossfit.ejemplo.org/).
+VARIABLE_URL_APP = "CROSSFIT_URL_APP"
+
+TIPOS_POR_ID = list(TIPOS_CIRCUITO)
+
+
+def _varint(valor: int, salida: bytearray):
+    while valor >= 0x80:
+        salida.append((valor & 0x7F) | 0x80)
+        valor >>= 7
+    salida.append(valor)
+
+
+def _leer_varints(datos: bytes) -> List[int]:
+    valores, actual, desplazamiento = [], 0, 0
+    for byte in datos:
+        actual |= (byte & 0x7F) << desplazamiento
+        if byte & 0x80:
+            desplazamiento += 7
+            if desplazamiento > 28:
+                raise SpecInvalida(["Enlace dañado"])
+        else:
+            valores.append(actual)
+            actual, desplazamiento = 0, 0
+    if desplazamiento:
+        raise SpecInvalida(["Enlace incompleto"])
+    return valores
+
+
+def _opcional(valor: Optional[int]) -> int:
+    return 0 if valor is None else valor + 1
+
+
+def _reps_a_codigo(repeticiones) -> int:
+    """0 = sin repeticiones, impar = repeticiones, par = segundos ("30 s")."""
+    if repeticiones is None:
+        return 0
+    if isinstance(repeticiones, str):
+        return 2 * int(repeticiones[:-2]) + 2
+    return 2 * int(repeticiones) + 1
+
+
+def _codigo_a_reps(codigo: int):
+    if codigo == 0:
+        return None
+    if codigo % 2:
+        return (codigo - 1) // 2
+    return f"{(codigo - 2) // 2} s"
+
+
+def codificar(spec: WorkoutSpec) -> str:
+    salida = bytearray()
+    for valor in (
+        VERSION_ENLACE,
+        TIPOS_POR_ID.index(spec.tipo),
+        _opcional(spec.duracion),
+        _opcional(spec.rondas),
+        _opcional(spec.incremento),
+        _opcional(spec.reps_inicio),
+        0 if spec.direccion is None else DIRECCIONES_LADDER.index(spec.direccion) + 1,
+        0 if spec.objetivo is None else OBJETIVOS_ORDEN.index(spec.objetivo) + 1,
+        len(spec.ejercicios),
+    ):
+        _varint(valor, salida)
+    anterior = -1
+    # Los ids son los fijos del catálogo, así que los enlaces sobreviven a sus cambios.
+    id_de = catalogo_actual().id_de
+    for ejercicio in spec.ejercicios:
+        actual = id_de[(ejercicio.categoria, ejercicio.nombre)]
+        delta = actual - anterior
+        _varint(2 * delta if delta >= 0 else -2 * delta - 1, salida)
+        _varint(_reps_a_codigo(ejercicio.repeticiones), salida)
+        anterior = actual
+    return base64.urlsafe_b64encode(bytes(salida)).rstrip(b"=").decode("ascii")
+
+
+def decodificar(token: str) -> WorkoutSpec:
+    """Spec (sin alumno) de un token; lanza :class:`SpecInvalida` si no es válido."""
+    try:
+        datos = base64.urlsafe_b64decode(token + "=" * (-len(token) % 4))
+    except (ValueError, TypeError):
+        raise SpecInvalida(["Enlace no válido"]) from None
+    valores = _leer_varints(datos)
+    if len(valores) < 9 or valores[0] != VERSION_ENLACE:
+        raise SpecInvalida(["Versión de enlace no reconocida"])
+    tipo, duracion, rondas, incremento, reps_inicio, direccion, objetivo, cantidad = valores[1:9]
+    if cantidad > MAX_EJERCICIOS_ENLACE or len(valores) != 9 + 2 * cantidad:
+        raise SpecInvalida(["Enlace dañado"])
+    try:
+        ejercicios = []
+        por_id = catalogo_actual().por_id
+        actual = -1
+        for posicion in range(cantidad):
+            zigzag, codigo = valores[9 + 2 * posicion:11 + 2 * posicion]
+            actual += zigzag // 2 if zigzag % 2 == 0 else -(zigzag + 1) // 2
+            if actual < 0 or por_id[actual] is None:
+                raise IndexError
+            categoria, nombre = por_id[actual]
+            ejercicios.append(EjercicioSpec(categoria, nombre, _codigo_a_reps(codigo)))
+        spec = WorkoutSpec(
+            "", "", TIPOS_POR_ID[tipo], ejercicios,
+            duracion=duracion - 1 if duracion else None,
+            rondas=rondas - 1 if rondas else None,
+            incremento=incremento - 1 if incremento else None,
+            reps_inicio=reps_inicio - 1 if reps_inicio else None,
+            direccion=DIRECCIONES_LADDER[direccion - 1] if direccion else None,
+            objetivo=OBJETIVOS_ORDEN[objetivo - 1] if objetivo else None,
+        )
+    except IndexError:
+        raise SpecInvalida(["El enlace hace referencia a ejercicios o parámetros desconocidos"]) from None
+    return spec.validar(requiere_alumno=False)
+
+
+def valores_formulario(spec: WorkoutSpec) -> dict:
+    """Valores iniciales de los widgets de la aplicación para reproducir la spec."""
+    valores = {
+        "tipo": spec.tipo,
+        "duracion": spec.duracion,
+        "rondas": spec.rondas,
+        "tabata": len(spec.ejercicios) if spec.tipo == "Tabata" else None,
+        "incremento": spec.incremento,
+        "reps_inicio": spec.reps_inicio,
+        "direccion": spec.direccion,
+        "objetivo": spec.objetivo,
+    }
+    for ejercicio in spec.ejercicios:
+        valores[f"{ejercicio.categoria}_{ejercicio.nombre}"] = True
+        if isinstance(ejercicio.repeticiones, str):
+            valores[f"segundos_{ejercicio.categoria}_{ejercicio.nombre}"] = int(ejercicio.repeticiones[:-2])
+        elif ejercicio.repeticiones is not None:
+            valores[f"reps_{ejercicio.categoria}_{ejercicio.nombre}"] = ejercicio.repeticiones
+    return valores
+
+
+def cargar_enlace() -> dict:
+    """Lee ``?w=`` una vez por sesión y devuelve los valores iniciales de los widgets.
+
+    Se guardan en la sesión para que los valores por defecto no cambien mientras
+    el alumno edita el entrenamiento (y los widgets conserven su estado).
+    """
+    if CLAVE_SESION not in st.session_state:
+        valores, error = {}, None
+        token = st.query_params.get(PARAMETRO_URL)
+        if token:
+            try:
+                valores = valores_formulario(decodificar(token))
+            except SpecInvalida as exc:
+                error = str(exc)
+        st.session_state[CLAVE_SESION] = (valores, error)
+    valores, error = st.session_state[CLAVE_SESION]
+    if error:
+        st.warning(f"No se ha podido cargar el entrenamiento del enlace: {error}")
+        st.session_state[CLAVE_SESION] = (valores, None)
+    return valores
+
+
+def cargar_en_formulario(spec: WorkoutSpec):
+    """Monta la spec en el formulario como si se abriera su enlace (para callbacks de botones).
+
+    Se borra el estado de los widgets de ejercicios para que todos tomen los
+    nuevos valores iniciales, incluidos los que dejan de estar seleccionados.
+    """
+    for categoria, nombre in catalogo_actual().id_de:
+        for clave in (f"{categoria}_{nombre}", f"reps_{categoria}_{nombre}", f"segundos_{categoria}_{nombre}"):
+            if clave in st.session_state:
+                del st.session_state[clave]
+    st.session_state[CLAVE_SESION] = (valores_formulario(spec), None)
+
+
+def actualizar_enlace(spec: Optional[WorkoutSpec]) -> Optional[str]:
+    """Refleja en la URL la selección actual si es un WOD completo (solo si ha cambiado)."""
+    valida = spec is not None and not spec.errores(requiere_alumno=False)
+    token = codificar(spec) if valida else None
+    if token is None:
+        if PARAMETRO_URL in st.query_params:
+            del st.query_params[PARAMETRO_URL]
+    elif st.query_params.get(PARAMETRO_URL) != token:
+        st.query_params[PARAMETRO_URL] = token
+    return token
+
+
+def url_app() -> str:
+    """URL pública configurada o, si no la hay, la dirección del servidor de Streamlit."""
+    url = os.environ.get(VARIABLE_URL_APP)
+    if url:
+        return url.rstrip("/")
+    direccion = st.get_option("browser.serverAddress") or "localhost"
+    puerto = st.get_option("browser.serverPort") or st.get_option("server.port")
+    ruta = (st.get_option("server.baseUrlPath") or "").strip("/")
+    return f"http://{direccion}:{puerto}" + (f"/{ruta}" if ruta else "")
+
+
+def enlace_completo(token: str) -> str:
+    return f"{url_app()}/?{PARAMETRO_URL}={token}"
+
+
+@lru_cache(maxsize=512)
+def enlace_spec(spec: WorkoutSpec) -> str:
+    """Enlace que reabre la spec en la aplicación (lo que codifica el QR del PDF)."""
+    return enlace_completo(codificar(spec))
@@ -0,0 +1,124 @@
+"""Rotación de estaciones para hacer los entrenamientos de toda una clase a la vez.
+
+Cada ejercicio de cada alumno es una tarea que ocupa un turno y, salvo en
+Autocarga y Carrera, una unidad del material de su categoría. El planificador
+es una coloración voraz por turnos: en cada turno atiende primero a los alumnos
+con más tareas pendientes y a cada uno le asigna la categoría con material libre
+más escasa (demanda pendiente / unidades). Así el material escaso trabaja a
+plena capacidad y el número de turnos queda cerca de la cota inferior
+``max(ejercicios del alumno con más, ⌈demanda / unidades⌉ de cada material)``.
+"""
+
+import math
+from functools import lru_cache
+from typing import Dict, List, NamedTuple, Optional, Sequence, Tuple
+
+from crossfit.catalogo import Catalogo, catalogo_actual
+from crossfit.spec import EjercicioSpec, WorkoutSpec
+
+# Categorías que no necesitan material: cualquier número de alumnos a la vez.
+SIN_MATERIAL = {"Autocarga", "Carrera"}
+INVENTARIO_POR_DEFECTO = {
+    "Barra Olímpica": 2,
+    "Mancuernas": 6,
+    "Kettlebell": 4,
+    "TRX": 2,
+    "Cajón": 4,
+    "Medball": 4,
+    "Comba": 10,
+}
+MINUTOS_POR_TURNO = 3
+
+
+def categorias_material(catalogo: Optional[Catalogo] = None) -> List[str]:
+    """Categorías del catálogo que necesitan material."""
+    return [categoria for categoria in (catalogo or catalogo_actual()).ejercicios if categoria not in SIN_MATERIAL]
+
+
+class PlanRotacion(NamedTuple):
+    alumnos: List[str]
+    # turnos[t][a]: ejercicio del alumno ``a`` en el turno ``t`` (None = espera o terminado)
+    turnos: List[List[Optional[EjercicioSpec]]]
+    inventario: Dict[str, int]
+    # Ejercicios que no se pueden hacer porque no hay ninguna unidad de su material
+    sin_material: List[Tuple[str, EjercicioSpec]]
+    cota_inferior: int
+
+    def cuello_de_botella(self) -> Optional[str]:
+        """Material con más turnos de espera (demanda / unidades), o None si no limita."""
+        demanda: Dict[str, int] = {}
+        for fila in self.turnos:
+            for ejercicio in fila:
+                if ejercicio is not None and ejercicio.categoria not in SIN_MATERIAL:
+                    demanda[ejercicio.categoria] = demanda.get(ejercicio.categoria, 0) + 1
+        if not demanda:
+            return None
+        categoria = max(demanda, key=lambda nombre: demanda[nombre] / self.inventario[nombre])
+        limite = math.ceil(demanda[categoria] / self.inventario[categoria])
+        por_alumno = max((sum(ejercicio is not None for ejercicio in columna) for columna in zip(*self.turnos)), default=0)
+        return categoria if limite > por_alumno else None
+
+    def estaciones(self, turno: int) -> Dict[str, List[str]]:
+        """Alumnos que usan cada categoría de material en un turno."""
+        ocupacion: Dict[str, List[str]] = {}
+        for alumno, ejercicio in zip(self.alumnos, self.turnos[turno]):
+            if ejercicio is not None:
+                ocupacion.setdefault(ejercicio.categoria, []).append(alumno)
+        return ocupacion
+
+
+def planificar(alumnos: Sequence[Tuple[str, Sequence[EjercicioSpec]]], inventario: Dict[str, int]) -> PlanRotacion:
+    """Plan sin conflictos de material para ``(alumno, ejercicios)`` con el ``inventario`` dado."""
+    nombres = [nombre for nombre, _ in alumnos]
+    capacidad = {categoria: max(0, int(unidades)) for categoria, unidades in inventario.items()}
+    pendientes: List[Dict[str, List[EjercicioSpec]]] = []
+    demanda: Dict[str, int] = {}
+    sin_material = []
+    for nombre, ejercicios in alumnos:
+        por_categoria: Dict[str, List[EjercicioSpec]] = {}
+        for ejercicio in ejercicios:
+            if ejercicio.categoria not in SIN_MATERIAL and capacidad.get(ejercicio.categoria, 0) == 0:
+                sin_material.append((nombre, ejercicio))
+                continue
+            por_categoria.setdefault(ejercicio.categoria, []).append(ejercicio)
+            demanda[ejercicio.categoria] = demanda.get(ejercicio.categoria, 0) + 1
+        # Se sacan del final: se invierte para respetar el orden del alumno cuando no hay conflictos.
+        for lista in por_categoria.values():
+            lista.reverse()
+        pendientes.append(por_categoria)
+
+    restantes = [sum(len(lista) for lista in por_categoria.values()) for por_categoria in pendientes]
+    cota = max(restantes, default=0)
+    for categoria, total in demanda.items():
+        if categoria not in SIN_MATERIAL:
+            cota = max(cota, math.ceil(total / capacidad[categoria]))
+
+    def escasez(categoria: str) -> float:
+        return 0.0 if categoria in SIN_MATERIAL else demanda[categoria] / capacidad[categoria]
+
+    turnos = []
+    while any(restantes):
+        libres = dict(capacidad)
+        fila: List[Optional[EjercicioSpec]] = [None] * len(nombres)
+        orden = sorted((indice for indice, quedan in enumerate(restantes) if quedan), key=lambda indice: -restantes[indice])
+        for indice in orden:
+            opciones = [
+                categoria for categoria, lista in pendientes[indice].items()
+                if lista and (categoria in SIN_MATERIAL or libres[categoria] > 0)
+            ]
+            if not opciones:
+                continue
+            categoria = max(opciones, key=escasez)
+            fila[indice] = pendientes[indice][categoria].pop()
+            restantes[indice] -= 1
+            demanda[categoria] -= 1
+            if categoria not in SIN_MATERIAL:
+                libres[categoria] -= 1
+        turnos.append(fila)
+    return PlanRotacion(nombres, turnos, capacidad, sin_material, cota)
+
+
+@lru_cache(maxsize=32)
+def plan_clase(specs: Tuple[WorkoutSpec, ...], inventario: Tuple[Tuple[str, int], ...]) -> PlanRotacion:
+    """Plan (cacheado) para los entrenamientos de una clase; el inventario como pares ordenados."""
+    return planificar([(spec.nombre, spec.ejercicios) for spec in specs], dict(inventario))
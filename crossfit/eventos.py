@@ -0,0 +1,168 @@
+"""Registro de eventos de generación en JSON por líneas.
+
+Cada PDF generado, cada PDF servido desde el historial o la caché y cada clic
+de descarga añade una línea a ``datos/eventos.jsonl`` (o al archivo de
+``CROSSFIT_EVENTOS``; ``off`` lo desactiva) con la huella de la spec, el tipo
+de WOD, el número de ejercicios, el tiempo y el tamaño. La línea empieza
+siempre por ``{"ts":"AAAA-MM-DD`` para que ``herramientas.analizar_eventos``
+descarte sin decodificar las de otros días.
+
+``registrar`` solo encola el evento: un hilo lo escribe por lotes, así que
+nunca bloquea un rerun (si la cola se llena, los eventos se descartan y se
+cuentan). Cuando el archivo pasa de ``CROSSFIT_EVENTOS_MAX_MB`` se rota a
+``eventos.jsonl.1`` … ``.5``. Cada proceso que escriba eventos (réplicas,
+servicio de renderizado) debería usar su propio archivo.
+"""
+
+import atexit
+import json
+import logging
+import os
+import queue
+import threading
+import time
+from collections import Counter
+from datetime import datetime
+from pathlib import Path
+from typing import Callable, List, Optional
+
+from crossfit.recursos import BASE_DIR
+from crossfit.spec import WorkoutSpec
+
+VARIABLE_ARCHIVO = "CROSSFIT_EVENTOS"
+VARIABLE_MAX_MB = "CROSSFIT_EVENTOS_MAX_MB"
+RUTA_POR_DEFECTO = BASE_DIR / "datos" / "eventos.jsonl"
+MAX_MB_POR_DEFECTO = 50
+ARCHIVOS_ROTADOS = 5
+MAX_PENDIENTES = 10000
+# Tiempo máximo que un evento espera en la cola antes de escribirse
+INTERVALO_ESCRITURA = 1.0
+
+EVENTO_GENERADO = "pdf_generado"
+EVENTO_REUTILIZADO = "pdf_reutilizado"
+EVENTO_AGRUPADO = "pdf_agrupado"
+EVENTO_RECHAZADO = "pdf_rechazado"
+EVENTO_DESCARGA = "descarga"
+
+logger = logging.getLogger(__name__)
+
+
+def campos_spec(spec: WorkoutSpec) -> dict:
+    """Datos de la spec que acompañan a cada evento (sin nombre ni grupo del alumno)."""
+    return {"huella": spec.huella(), "tipo": spec.tipo, "ejercicios": len(spec.ejercicios)}
+
+
+class RegistroEventos:
+    def __init__(self, ruta: Optional[Path], max_bytes: int = MAX_MB_POR_DEFECTO * 1024 * 1024):
+        self.ruta = ruta
+        self.max_bytes = max_bytes
+        self._cola: "queue.Queue[str]" = queue.Queue(MAX_PENDIENTES)
+        self._bloqueo = threading.Lock()
+        self._hilo: Optional[threading.Thread] = None
+        self._contadores = Counter()
+        self._oyentes: List[Callable[[str, dict], None]] = []
+
+    @classmethod
+    def desde_entorno(cls) -> "RegistroEventos":
+        valor = os.environ.get(VARIABLE_ARCHIVO, "").strip()
+        if valor.lower() in ("off", "0", "no"):
+            return cls(None)
+        try:
+            max_mb = max(1, int(os.environ.get(VARIABLE_MAX_MB, MAX_MB_POR_DEFECTO)))
+        except ValueError:
+            max_mb = MAX_MB_POR_DEFECTO
+        return cls(Path(valor).expanduser() if valor else RUTA_POR_DEFECTO, max_mb * 1024 * 1024)
+
+    @property
+    def activo(self) -> bool:
+        return self.ruta is not None
+
+    def suscribir(self, oyente: Callable[[str, dict], None]):
+        """``oyente(evento, campos)`` se llama al registrar cada evento, aunque el archivo esté desactivado."""
+        self._oyentes.append(oyente)
+
+    def registrar(self, evento: str, **campos):
+        """Encola el evento; no espera a que se escriba."""
+        for oyente in self._oyentes:
+            oyente(evento, campos)
+        if self.ruta is None:
+            return
+        linea = json.dumps(
+            {"ts": datetime.now().isoformat(timespec="milliseconds"), "evento": evento, "pid": os.getpid(), **campos},
+            ensure_ascii=False, separators=(",", ":"),
+        )
+        if self._hilo is None:
+            self._arrancar()
+        try:
+            self._cola.put_nowait(linea)
+        except queue.Full:
+            with self._bloqueo:
+                self._contadores["descartados"] += 1
+
+    def _arrancar(self):
+        with self._bloqueo:
+            if self._hilo is None:
+                self._hilo = threading.Thread(target=self._escribir, name="crossfit-eventos", daemon=True)
+                self._hilo.start()
+                atexit.register(self.vaciar)
+
+    def _escribir(self):
+        while True:
+            lote = [self._cola.get()]
+            # Junta lo que llegue en el próximo intervalo en una sola escritura
+            limite = time.monotonic() + INTERVALO_ESCRITURA
+            while len(lote) < MAX_PENDIENTES:
+                restante = limite - time.monotonic()
+                try:
+                    lote.append(self._cola.get(timeout=restante) if restante > 0 else self._cola.get_nowait())
+                except queue.Empty:
+                    break
+            try:
+                self._volcar(lote)
+            except OSError as exc:
+                logger.warning("No se han podido escribir %d eventos en %s: %s", len(lote), self.ruta, exc)
+                with self._bloqueo:
+                    self._contadores["perdidos"] += len(lote)
+            else:
+                with self._bloqueo:
+                    self._contadores["escritos"] += len(lote)
+            finally:
+                for _ in lote:
+                    self._cola.task_done()
+
+    def _volcar(self, lote):
+        self.ruta.parent.mkdir(parents=True, exist_ok=True)
+        with open(self.ruta, "a", encoding="utf-8") as archivo:
+            archivo.write("\n".join(lote) + "\n")
+            tamano = archivo.tell()
+        if tamano > self.max_bytes:
+            self._rotar()
+
+    def _rotar(self):
+        for numero in range(ARCHIVOS_ROTADOS - 1, 0, -1):
+            anterior = self.ruta.with_name(f"{self.ruta.name}.{numero}")
+            if anterior.exists():
+                os.replace(anterior, self.ruta.with_name(f"{self.ruta.name}.{numero + 1}"))
+        os.replace(self.ruta, self.ruta.with_name(f"{self.ruta.name}.1"))
+
+    def vaciar(self, timeout: float = 5.0) -> bool:
+        """Espera a que se escriban los eventos encolados (al salir del proceso y en las herramientas)."""
+        limite = time.monotonic() + timeout
+        while self._cola.unfinished_tasks:
+            if time.monotonic() > limite:
+                return False
+            time.sleep(0.01)
+        return True
+
+    def estadisticas(self) -> dict:
+        with self._bloqueo:
+            return {
+                "pendientes": self._cola.qsize(),
+                "escritos": self._contadores["escritos"],
+                "descartados": self._contadores["descartados"],
+                "perdidos": self._contadores["perdidos"],
+            }
+
+
+# Compartido por todas las sesiones del proceso.
+eventos = RegistroEventos.desde_entorno()
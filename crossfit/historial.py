@@ -0,0 +1,367 @@
+"""Historial persistente de entrenamientos descargados (SQLite).
+
+Cada descarga guarda la spec serializada y el PDF entregado. Los PDFs se
+almacenan una sola vez por contenido (clave SHA-256), así que volver a
+descargar un entrenamiento antiguo no obliga a generarlo de nuevo. Las
+consultas por alumno, grupo, tipo de WOD y fecha usan índices y paginan por
+cursor (el ``id`` del último registro mostrado), de modo que su coste no crece
+con el tamaño del historial. La base de datos se configura con
+``CROSSFIT_HISTORIAL_DB`` (``off`` la desactiva).
+"""
+
+import hashlib
+import os
+import sqlite3
+import threading
+import unicodedata
+from functools import lru_cache
+from datetime import date, datetime, timedelta
+from pathlib import Path
+from typing import Dict, List, NamedTuple, Optional, Tuple
+
+import streamlit as st
+
+from crossfit.recursos import BASE_DIR
+from crossfit.spec import WorkoutSpec
+
+VARIABLE_RUTA = "CROSSFIT_HISTORIAL_DB"
+RUTA_POR_DEFECTO = BASE_DIR / "datos" / "historial.sqlite3"
+TAMANO_PAGINA = 20
+MAX_PAGINA = 200
+
+_ESQUEMA = """
+CREATE TABLE IF NOT EXISTS pdfs (
+    hash TEXT PRIMARY KEY,
+    datos BLOB NOT NULL
+);
+CREATE TABLE IF NOT EXISTS entrenamientos (
+    id INTEGER PRIMARY KEY,
+    creado TEXT NOT NULL,
+    nombre TEXT NOT NULL,
+    alumno TEXT NOT NULL,
+    grupo TEXT NOT NULL,
+    grupo_clave TEXT NOT NULL,
+    tipo TEXT NOT NULL,
+    motor TEXT NOT NULL,
+    huella TEXT NOT NULL,
+    contenido TEXT NOT NULL,
+    spec TEXT NOT NULL,
+    pdf TEXT NOT NULL REFERENCES pdfs (hash),
+    bytes INTEGER NOT NULL
+);
+CREATE INDEX IF NOT EXISTS ix_entrenamientos_alumno ON entrenamientos (alumno, id);
+CREATE INDEX IF NOT EXISTS ix_entrenamientos_grupo ON entrenamientos (grupo_clave, id);
+CREATE INDEX IF NOT EXISTS ix_entrenamientos_tipo ON entrenamientos (tipo, id);
+CREATE INDEX IF NOT EXISTS ix_entrenamientos_creado ON entrenamientos (creado);
+CREATE INDEX IF NOT EXISTS ix_entrenamientos_huella ON entrenamientos (huella, motor, creado);
+CREATE INDEX IF NOT EXISTS ix_entrenamientos_contenido ON entrenamientos (contenido);
+"""
+
+_COLUMNAS = "id, creado, nombre, grupo, tipo, motor, huella, pdf, bytes"
+
+
+class Registro(NamedTuple):
+    id: int
+    creado: str
+    nombre: str
+    grupo: str
+    tipo: str
+    motor: str
+    huella: str
+    pdf: str
+    bytes: int
+
+    @property
+    def fecha(self) -> str:
+        return self.creado[:10]
+
+
+def clave_texto(texto: str) -> str:
+    """Forma normalizada para buscar sin distinguir mayúsculas, tildes ni espacios."""
+    sin_tildes = unicodedata.normalize("NFKD", texto or "")
+    sin_tildes = "".join(c for c in sin_tildes if not unicodedata.combining(c))
+    return " ".join(sin_tildes.casefold().split())
+
+
+@lru_cache(maxsize=4096)
+def _spec_guardada(texto: str) -> WorkoutSpec:
+    return WorkoutSpec.deserializar(texto, validar=False)
+
+
+class Historial:
+    def __init__(self, ruta: Optional[Path]):
+        self.ruta = ruta
+        self._local = threading.local()
+        self._bloqueo = threading.Lock()
+        self._preparada = False
+
+    @classmethod
+    def desde_entorno(cls) -> "Historial":
+        valor = os.environ.get(VARIABLE_RUTA, "")
+        if valor.lower() in ("off", "0", "no"):
+            return cls(None)
+        return cls(Path(valor) if valor else RUTA_POR_DEFECTO)
+
+    @property
+    def activo(self) -> bool:
+        return self.ruta is not None
+
+    def conexion(self) -> sqlite3.Connection:
+        """Una conexión por hilo: Streamlit ejecuta cada sesión en su propio hilo."""
+        conexion = getattr(self._local, "conexion", None)
+        if conexion is None:
+            with self._bloqueo:
+                if not self._preparada:
+                    self.ruta.parent.mkdir(parents=True, exist_ok=True)
+                conexion = sqlite3.connect(str(self.ruta), timeout=5.0)
+                conexion.execute("PRAGMA journal_mode=WAL")
+                conexion.execute("PRAGMA synchronous=NORMAL")
+                if not self._preparada:
+                    self._migrar(conexion)
+                    conexion.executescript(_ESQUEMA)
+                    self._preparada = True
+            self._local.conexion = conexion
+        return conexion
+
+    @staticmethod
+    def _migrar(conexion: sqlite3.Connection):
+        """Añade a una base de datos anterior las columnas que faltan."""
+        columnas = {fila[1] for fila in conexion.execute("PRAGMA table_info(entrenamientos)")}
+        if columnas and "contenido" not in columnas:
+            with conexion:
+                conexion.execute("ALTER TABLE entrenamientos ADD COLUMN contenido TEXT NOT NULL DEFAULT ''")
+                for id_registro, texto in conexion.execute("SELECT id, spec FROM entrenamientos").fetchall():
+                    conexion.execute(
+                        "UPDATE entrenamientos SET contenido = ? WHERE id = ?",
+                        (_spec_guardada(texto).huella_contenido(), id_registro),
+                    )
+
+    def registrar(self, spec: WorkoutSpec, motor: str, pdf: bytes) -> Optional[int]:
+        """Guarda una descarga; la misma spec y formato en el mismo día solo se guarda una vez."""
+        if not self.activo:
+            return None
+        ahora = datetime.now()
+        existente = self._buscar(spec, motor, ahora.date())
+        if existente is not None:
+            return existente[0]
+        hash_pdf = hashlib.sha256(pdf).hexdigest()
+        conexion = self.conexion()
+        with conexion:
+            conexion.execute("INSERT OR IGNORE INTO pdfs (hash, datos) VALUES (?, ?)", (hash_pdf, pdf))
+            cursor = conexion.execute(
+                "INSERT INTO entrenamientos"
+                " (creado, nombre, alumno, grupo, grupo_clave, tipo, motor, huella, contenido, spec, pdf, bytes)"
+                " VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                (
+                    ahora.strftime("%Y-%m-%d %H:%M:%S"), spec.nombre, clave_texto(spec.nombre),
+                    spec.grupo, clave_texto(spec.grupo), spec.tipo, motor, spec.huella(),
+                    spec.huella_contenido(), spec.serializar(), hash_pdf, len(pdf),
+                ),
+            )
+        return cursor.lastrowid
+
+    def _buscar(self, spec: WorkoutSpec, motor: str, dia: date) -> Optional[Tuple[int, str]]:
+        return self.conexion().execute(
+            "SELECT id, pdf FROM entrenamientos WHERE huella = ? AND motor = ? AND creado >= ? AND creado < ?"
+            " ORDER BY id DESC LIMIT 1",
+            (spec.huella(), motor, dia.isoformat(), (dia + timedelta(days=1)).isoformat()),
+        ).fetchone()
+
+    def pdf_guardado(self, spec: WorkoutSpec, motor: str, dia: Optional[date] = None) -> Optional[bytes]:
+        """PDF ya entregado hoy para la misma spec y formato (el contenido sería idéntico)."""
+        if not self.activo:
+            return None
+        existente = self._buscar(spec, motor, dia or date.today())
+        return self.obtener_pdf(existente[1]) if existente else None
+
+    @staticmethod
+    def _filtros(
+        alumno: Optional[str] = None,
+        grupo: Optional[str] = None,
+        tipo: Optional[str] = None,
+        desde: Optional[date] = None,
+        hasta: Optional[date] = None,
+        prefijo: bool = False,
+    ) -> Tuple[List[str], list]:
+        condiciones, parametros = [], []
+        if alumno:
+            if prefijo:
+                # Rango en lugar de LIKE para que SQLite use el índice.
+                condiciones.append("alumno >= ? AND alumno < ?")
+                parametros += [clave_texto(alumno), clave_texto(alumno) + "\uffff"]
+            else:
+                condiciones.append("alumno = ?")
+                parametros.append(clave_texto(alumno))
+        if grupo:
+            condiciones.append("grupo_clave = ?")
+            parametros.append(clave_texto(grupo))
+        if tipo:
+            condiciones.append("tipo = ?")
+            parametros.append(tipo)
+        if desde:
+            condiciones.append("creado >= ?")
+            parametros.append(desde.isoformat())
+        if hasta:
+            condiciones.append("creado < ?")
+            parametros.append((hasta + timedelta(days=1)).isoformat())
+        return condiciones, parametros
+
+    def listar(self, antes_de: Optional[int] = None, limite: int = TAMANO_PAGINA, **filtros) -> Tuple[List[Registro], Optional[int]]:
+        """Página de registros del más reciente al más antiguo y cursor de la siguiente (o None).
+
+        Filtros: ``alumno`` (completo o, con ``prefijo=True``, por el comienzo del
+        nombre), ``grupo``, ``tipo``, ``desde`` y ``hasta`` (fechas incluidas).
+        """
+        if not self.activo:
+            return [], None
+        condiciones, parametros = self._filtros(**filtros)
+        if antes_de is not None:
+            condiciones.append("id < ?")
+            parametros.append(antes_de)
+        limite = max(1, min(limite, MAX_PAGINA))
+        consulta = f"SELECT {_COLUMNAS} FROM entrenamientos"
+        if condiciones:
+            consulta += " WHERE " + " AND ".join(condiciones)
+        consulta += " ORDER BY id DESC LIMIT ?"
+        filas = self.conexion().execute(consulta, parametros + [limite + 1]).fetchall()
+        registros = [Registro(*fila) for fila in filas[:limite]]
+        return registros, (registros[-1].id if len(filas) > limite else None)
+
+    def contenidos(self, **filtros) -> Tuple[List[str], List[str], List[str]]:
+        """Alumno, grupo y huella de contenido de cada registro que cumple los filtros."""
+        if not self.activo:
+            return [], [], []
+        condiciones, parametros = self._filtros(**filtros)
+        consulta = "SELECT nombre, grupo, contenido FROM entrenamientos"
+        if condiciones:
+            consulta += " WHERE " + " AND ".join(condiciones)
+        alumnos, grupos, contenidos = [], [], []
+        for nombre, grupo, contenido in self.conexion().execute(consulta, parametros):
+            alumnos.append(nombre)
+            grupos.append(grupo)
+            contenidos.append(contenido)
+        return alumnos, grupos, contenidos
+
+    def specs_por_contenido(self, contenidos) -> Dict[str, WorkoutSpec]:
+        """Una spec representativa de cada huella de contenido."""
+        if not self.activo:
+            return {}
+        resultado = {}
+        contenidos = list(contenidos)
+        for inicio in range(0, len(contenidos), 500):
+            bloque = contenidos[inicio:inicio + 500]
+            filas = self.conexion().execute(
+                "SELECT contenido, MAX(spec) FROM entrenamientos"
+                f" WHERE contenido IN ({', '.join('?' * len(bloque))}) GROUP BY contenido",
+                bloque,
+            )
+            resultado.update((contenido, _spec_guardada(texto)) for contenido, texto in filas)
+        return resultado
+
+    def ultimas_specs(self, **filtros) -> List[WorkoutSpec]:
+        """El entrenamiento más reciente de cada alumno que cumple los filtros, por nombre."""
+        if not self.activo:
+            return []
+        condiciones, parametros = self._filtros(**filtros)
+        consulta = "SELECT MAX(id) FROM entrenamientos"
+        if condiciones:
+            consulta += " WHERE " + " AND ".join(condiciones)
+        consulta += " GROUP BY alumno, grupo_clave"
+        filas = self.conexion().execute(
+            f"SELECT spec FROM entrenamientos WHERE id IN ({consulta}) ORDER BY alumno", parametros
+        )
+        return [_spec_guardada(texto) for (texto,) in filas]
+
+    def ultimo_id(self) -> int:
+        """Crece con cada registro nuevo: sirve para invalidar cachés de informes."""
+        if not self.activo:
+            return 0
+        return self.conexion().execute("SELECT COALESCE(MAX(id), 0) FROM entrenamientos").fetchone()[0]
+
+    def obtener_pdf(self, hash_pdf: str) -> Optional[bytes]:
+        if not self.activo:
+            return None
+        fila = self.conexion().execute("SELECT datos FROM pdfs WHERE hash = ?", (hash_pdf,)).fetchone()
+        return bytes(fila[0]) if fila else None
+
+    def obtener_spec(self, id_registro: int) -> Optional[WorkoutSpec]:
+        if not self.activo:
+            return None
+        fila = self.conexion().execute("SELECT spec FROM entrenamientos WHERE id = ?", (id_registro,)).fetchone()
+        return _spec_guardada(fila[0]) if fila else None
+
+    def grupos(self) -> List[str]:
+        if not self.activo:
+            return []
+        filas = self.conexion().execute(
+            "SELECT MIN(grupo) FROM entrenamientos GROUP BY grupo_clave ORDER BY grupo_clave"
+        ).fetchall()
+        return [fila[0] for fila in filas]
+
+
+historial = Historial.desde_entorno()
+
+
+def _etiqueta(registro: Registro) -> str:
+    return f"{registro.creado[:16]} · {registro.nombre} ({registro.grupo}) · {registro.tipo}"
+
+
+def mostrar_historial(clave: str, vacio: str, **filtros):
+    """Tabla paginada de registros con descarga del PDF guardado del que se elija.
+
+    La sesión guarda la pila de cursores de las páginas visitadas; cambiar los
+    filtros vuelve a la primera página.
+    """
+    estado = f"_historial_{clave}"
+    if st.session_state.get(estado, (None,))[0] != filtros:
+        st.session_state[estado] = (filtros, [None])
+    cursores = st.session_state[estado][1]
+    try:
+        registros, siguiente = historial.listar(antes_de=cursores[-1], **filtros)
+    except sqlite3.Error as exc:
+        st.error(f"No se ha podido leer el historial: {exc}")
+        return
+    if not registros:
+        st.caption(vacio)
+        return
+
+    st.dataframe(
+        [
+            {
+                "Fecha": registro.creado[:16],
+                "Alumno": registro.nombre,
+                "Grupo": registro.grupo,
+                "WOD": registro.tipo,
+                "Formato": registro.motor,
+                "KiB": round(registro.bytes / 1024),
+            }
+            for registro in registros
+        ],
+        hide_index=True,
+        use_container_width=True,
+    )
+    por_id = {registro.id: registro for registro in registros}
+    elegido = por_id[st.selectbox(
+        "Entrenamiento:", options=list(por_id), format_func=lambda id_registro: _etiqueta(por_id[id_registro]),
+        key=f"{estado}_elegido",
+    )]
+    pdf = historial.obtener_pdf(elegido.pdf)
+    if pdf is not None:
+        st.download_button(
+            label="Volver a descargar (PDF)",
+            data=pdf,
+            file_name=f"Entrenamiento_CrossFit_{elegido.nombre.replace(' ', '_')}_{elegido.fecha.replace('-', '')}.pdf",
+            mime="application/pdf",
+            key=f"{estado}_descargar",
+        )
+
+    col_anterior, col_pagina, col_siguiente = st.columns([1, 2, 1])
+    col_anterior.button(
+        "← Más recientes", key=f"{estado}_anterior", disabled=len(cursores) == 1,
+        on_click=cursores.pop,
+    )
+    col_pagina.caption(f"Página {len(cursores)}")
+    col_siguiente.button(
+        "Más antiguos →", key=f"{estado}_siguiente", disabled=siguiente is None,
+        on_click=cursores.append, args=(siguiente,),
+    )
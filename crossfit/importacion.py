@@ -0,0 +1,245 @@
+"""Importación masiva de resultados desde CSV (lo que el profesor recoge en papel).
+
+Columnas (la cabecera no distingue mayúsculas ni tildes; el separador puede
+ser coma o punto y coma):
+
+``fecha``
+    ``AAAA-MM-DD`` o ``DD/MM/AAAA``.
+``alumno``, ``grupo``
+    Como los escribe el alumno en la aplicación.
+``wod``
+    Clave o nombre de :data:`crossfit.datos.TIPOS_CIRCUITO` (``AMRAP``, ``AFAP``…).
+``rondas``, ``reps``, ``tiempo``
+    Los que correspondan al WOD (ver :data:`crossfit.resultados.MEDIDAS`). En
+    Tabata ``reps`` admite las repeticiones de cada bloque (``12-11-10-9``). El
+    tiempo va en ``mm:ss``, ``h:mm:ss`` o segundos.
+``enlace`` (opcional)
+    Enlace o token ``?w=`` del WOD, para que el resultado entre en su clasificación.
+    Sin enlace entra en la clasificación del tipo de WOD
+    (:func:`crossfit.resultados.contenido_de_tipo`).
+
+El archivo se lee por bloques de ``TAMANO_BLOQUE`` filas; cada bloque se valida
+y puntúa con operaciones vectorizadas de NumPy y se inserta en una sola
+transacción.
+"""
+
+import csv
+import io
+import re
+from datetime import datetime
+from functools import lru_cache
+from itertools import chain, islice
+from typing import IO, Dict, List, NamedTuple, Optional, Tuple
+
+import numpy as np
+
+from crossfit.datos import TIPOS_CIRCUITO
+from crossfit.enlaces import PARAMETRO_URL, decodificar
+from crossfit.historial import clave_texto
+from crossfit.resultados import BASE_RONDAS, MEDIDAS, Resultados, contenido_de_tipo, resultados
+from crossfit.spec import SpecInvalida
+
+TAMANO_BLOQUE = 20000
+MAX_ERRORES = 50
+# Más cifras no caben en int64 al sumar bloques ni son un resultado real
+MAX_CIFRAS = 9
+COLUMNAS_OBLIGATORIAS = ("fecha", "alumno", "grupo", "wod")
+COLUMNAS = COLUMNAS_OBLIGATORIAS + ("rondas", "reps", "tiempo", "enlace")
+
+_TIPOS = list(TIPOS_CIRCUITO)
+_TIPO_POR_TEXTO = {
+    **{clave_texto(tipo): indice for indice, tipo in enumerate(_TIPOS)},
+    **{clave_texto(info["nombre"]): indice for indice, info in enumerate(TIPOS_CIRCUITO.values())},
+}
+_NOMBRES_TIPO = np.array(_TIPOS, dtype=object)
+_MEDIDA_POR_TIPO = np.array([MEDIDAS.get(tipo, "") for tipo in _TIPOS])
+_CONTENIDO_POR_TIPO = np.array([contenido_de_tipo(tipo) for tipo in _TIPOS], dtype=object)
+_TOKEN = re.compile(rf"(?:[?&]{PARAMETRO_URL}=)?([A-Za-z0-9_-]+)$")
+_CIFRAS = "0123456789"
+
+
+class InformeImportacion(NamedTuple):
+    filas: int
+    importadas: int
+    duplicadas: int
+    errores: List[str]
+    total_errores: int
+
+
+@lru_cache(maxsize=4096)
+def _fecha(texto: str) -> Optional[str]:
+    for formato in ("%Y-%m-%d", "%d/%m/%Y"):
+        try:
+            return datetime.strptime(texto, formato).strftime("%Y-%m-%d 00:00:00")
+        except ValueError:
+            continue
+    return None
+
+
+@lru_cache(maxsize=4096)
+def _contenido(enlace: str, tipo: str) -> Optional[str]:
+    """Huella de contenido del WOD del enlace (None si no es válido o es de otro tipo)."""
+    coincidencia = _TOKEN.search(enlace)
+    if coincidencia is None:
+        return None
+    try:
+        spec = decodificar(coincidencia.group(1))
+    except SpecInvalida:
+        return None
+    return spec.huella_contenido() if spec.tipo == tipo else None
+
+
+def _por_valor(columna: np.ndarray, funcion):
+    """Aplica ``funcion`` solo a los valores distintos de la columna (se repiten mucho) y expande sus resultados."""
+    unicos, inverso = np.unique(columna, return_inverse=True)
+    return tuple(resultado[inverso] for resultado in funcion(unicos))
+
+
+def _claves(unicos: np.ndarray):
+    return (np.array([clave_texto(texto) for texto in unicos], dtype=object),)
+
+
+def _es_numero(texto: str) -> bool:
+    return 0 < len(texto) <= MAX_CIFRAS and not texto.strip(_CIFRAS)
+
+
+def _enteros(columna: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    """Valores enteros de una columna de texto y máscara de celdas con número.
+
+    Solo cuentan las cifras ASCII (``isdigit`` también acepta «²» o «٣», que
+    ``int`` no convierte) y hasta :data:`MAX_CIFRAS`.
+    """
+    longitudes = np.char.str_len(columna)
+    validos = (longitudes > 0) & (longitudes <= MAX_CIFRAS) & (np.char.str_len(np.char.strip(columna, _CIFRAS)) == 0)
+    return np.where(validos, columna, "0").astype(np.int64), validos
+
+
+def _segundos(columna: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    """``mm:ss``, ``h:mm:ss`` o segundos a segundos."""
+    resto, separador, ultimo = np.char.rpartition(columna, ":").T
+    horas_texto, separador_horas, minutos_texto = np.char.rpartition(resto, ":").T
+    segundos, ok_segundos = _enteros(ultimo)
+    minutos, ok_minutos = _enteros(minutos_texto)
+    horas, ok_horas = _enteros(horas_texto)
+    con_minutos = separador != ""
+    con_horas = separador_horas != ""
+    validos = (
+        ok_segundos
+        & (~con_minutos | (ok_minutos & (segundos < 60)))
+        & (~con_horas | (ok_horas & (minutos < 60)))
+    )
+    return horas * 3600 + minutos * 60 + segundos, validos
+
+
+def _reps_bloques(columna: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    """Repeticiones totales; las celdas con varios bloques (``12-11-10``) se suman."""
+    unificada = np.char.replace(np.char.replace(columna, "/", "-"), "+", "-")
+    reps, validos = _enteros(unificada)
+    for indice in np.flatnonzero(np.char.find(unificada, "-") >= 0):
+        partes = unificada[indice].split("-")
+        if all(_es_numero(parte.strip()) for parte in partes):
+            reps[indice] = sum(int(parte) for parte in partes)
+            validos[indice] = True
+    return reps, validos
+
+
+def puntuar(tipos: np.ndarray, rondas: np.ndarray, reps: np.ndarray, tiempo: np.ndarray):
+    """Puntuación (más es mejor) de cada fila y motivo de error ("" si es válida).
+
+    ``tipos`` son índices de :data:`TIPOS_CIRCUITO` (-1 si el WOD no existe) y
+    el resto, columnas de texto ya recortadas.
+    """
+    medida = np.where(tipos >= 0, _MEDIDA_POR_TIPO[np.maximum(tipos, 0)], "")
+    valor_rondas, ok_rondas = _por_valor(rondas, _enteros)
+    valor_reps, ok_reps = _por_valor(reps, _reps_bloques)
+    valor_tiempo, ok_tiempo = _por_valor(tiempo, _segundos)
+    reps_vacias = reps == ""
+    puntuaciones = np.select(
+        [medida == "rondas_reps", medida == "rondas", medida == "reps", medida == "tiempo"],
+        [valor_rondas * BASE_RONDAS + valor_reps, valor_rondas, valor_reps, -valor_tiempo],
+        0,
+    ).astype(np.float64)
+    errores = np.full(len(tipos), "", dtype=object)
+    errores[(medida == "tiempo") & ~(ok_tiempo & (valor_tiempo > 0))] = "tiempo no válido"
+    errores[(medida == "reps") & ~ok_reps] = "repeticiones no válidas"
+    errores[(medida == "rondas") & ~ok_rondas] = "rondas no válidas"
+    errores[(medida == "rondas_reps") & ~(ok_rondas & (reps_vacias | (ok_reps & (valor_reps < BASE_RONDAS))))] = (
+        "rondas o repeticiones no válidas"
+    )
+    errores[(tipos >= 0) & (medida == "")] = "WOD sin resultado registrable"
+    errores[tipos < 0] = "WOD desconocido"
+    return puntuaciones, errores
+
+
+def _cabecera(fila: List[str]) -> Dict[str, int]:
+    posiciones = {clave_texto(nombre): indice for indice, nombre in enumerate(fila)}
+    faltan = [columna for columna in COLUMNAS_OBLIGATORIAS if columna not in posiciones]
+    if faltan:
+        raise ValueError(f"Faltan columnas en el CSV: {', '.join(faltan)}")
+    return {columna: posiciones[columna] for columna in COLUMNAS if columna in posiciones}
+
+
+def _columna(filas: List[List[str]], posicion: Optional[int]) -> np.ndarray:
+    if posicion is None:
+        return np.full(len(filas), "", dtype="<U1")
+    return np.char.strip(np.array([fila[posicion] if posicion < len(fila) else "" for fila in filas], dtype=str))
+
+
+def importar_csv(archivo: IO, almacen: Resultados = resultados, tamano_bloque: int = TAMANO_BLOQUE) -> InformeImportacion:
+    """Importa los resultados de ``archivo`` (texto o binario UTF-8) y devuelve el resumen.
+
+    Las filas con errores se saltan; las que ya estaban importadas se ignoran.
+    """
+    if isinstance(archivo, io.BufferedIOBase):
+        texto = io.TextIOWrapper(archivo, encoding="utf-8-sig", newline="")
+        try:
+            return importar_csv(texto, almacen, tamano_bloque)
+        finally:
+            # Sin cerrar el archivo original (p. ej. el que sube Streamlit)
+            texto.detach()
+    primera = archivo.readline()
+    separador = ";" if primera.count(";") > primera.count(",") else ","
+    lector = csv.reader(chain([primera], archivo), delimiter=separador)
+    posiciones = _cabecera(next(lector, []))
+    filas_totales = importadas = duplicadas = total_errores = 0
+    errores: List[str] = []
+    linea = 1
+    while True:
+        filas = list(islice(lector, tamano_bloque))
+        if not filas:
+            break
+        columnas = {nombre: _columna(filas, posiciones.get(nombre)) for nombre in COLUMNAS}
+        tipos, = _por_valor(columnas["wod"], lambda unicos: (
+            np.array([_TIPO_POR_TEXTO.get(clave_texto(texto), -1) for texto in unicos], dtype=np.int64),
+        ))
+        puntuaciones, motivos = puntuar(tipos, columnas["rondas"], columnas["reps"], columnas["tiempo"])
+        creados, = _por_valor(columnas["fecha"], lambda unicos: (np.array([_fecha(texto) for texto in unicos], dtype=object),))
+        alumnos, = _por_valor(columnas["alumno"], _claves)
+        grupos, = _por_valor(columnas["grupo"], _claves)
+        # Sin enlace, la clasificación del tipo de WOD (las filas sin tipo válido ya tienen error)
+        contenidos = _CONTENIDO_POR_TIPO[np.maximum(tipos, 0)]
+        for indice in np.flatnonzero((columnas["enlace"] != "") & (tipos >= 0)):
+            contenidos[indice] = _contenido(columnas["enlace"][indice], _TIPOS[tipos[indice]])
+
+        sin_error = motivos == ""
+        motivos[sin_error & np.equal(creados, None)] = "fecha no válida"
+        motivos[(motivos == "") & ((alumnos == "") | (grupos == ""))] = "falta el alumno o el grupo"
+        motivos[(motivos == "") & np.equal(contenidos, None)] = "enlace no válido o de otro WOD"
+        con_error = np.flatnonzero(motivos != "")
+        total_errores += len(con_error)
+        for indice in con_error[:MAX_ERRORES - len(errores)]:
+            errores.append(f"Línea {linea + indice + 1}: {motivos[indice]}")
+
+        validas = np.flatnonzero(motivos == "")
+        lote = list(zip(
+            creados[validas], columnas["alumno"][validas].tolist(), alumnos[validas],
+            columnas["grupo"][validas].tolist(), grupos[validas], _NOMBRES_TIPO[tipos[validas]],
+            contenidos[validas], puntuaciones[validas].tolist(),
+        ))
+        insertadas = almacen.registrar_lote(lote)
+        importadas += insertadas
+        duplicadas += len(lote) - insertadas
+        filas_totales += len(filas)
+        linea += len(filas)
+    return InformeImportacion(filas_totales, importadas, duplicadas, errores, total_errores)
+
@@ -0,0 +1,137 @@
+"""Maquetación del PDF completo sin reintentos de ReportLab.
+
+Cada sección (cabecera + contenido) es un :class:`Bloque` que mide sus
+elementos una sola vez por documento y no se parte entre páginas. Los bloques
+invariantes (Borg, beneficios, notas) guardan su altura por proceso con una
+``clave``, así que al planificar ni siquiera se miden: sus elementos se miden
+una vez, al dibujarse. :func:`planificar` recorre la historia con esas alturas y
+coloca los saltos de página antes de los bloques que no caben, de modo que
+``doc.build`` pone cada bloque a la primera, sin los intentos de partir de
+``KeepTogether`` ni los bucles de reducción de ``KeepInFrame``.
+"""
+
+from typing import Dict, List, Optional, Tuple
+
+from reportlab.platypus import Flowable, Frame, PageBreak, Spacer
+
+# Altura de los bloques invariantes por (clave, ancho disponible)
+_ALTOS: Dict[Tuple[str, float], float] = {}
+# Margen de redondeo, el mismo que usa ReportLab al comprobar si algo cabe
+_HOLGURA = 1e-6
+
+
+class Bloque(Flowable):
+    """Elementos que se colocan juntos, uno debajo de otro, medidos una sola vez."""
+
+    def __init__(self, elementos: List[Flowable], clave: Optional[str] = None):
+        super().__init__()
+        self.elementos = elementos
+        self.clave = clave
+        # Los márgenes de los extremos se quedan fuera del bloque, como los dejaría el marco
+        self.spaceBefore = elementos[0].getSpaceBefore()
+        self.spaceAfter = elementos[-1].getSpaceAfter()
+        self._ancho: Optional[float] = None
+        self._alto = 0.0
+        # (elemento, ancho, alto, hueco encima) de la última medida
+        self._medidas: Optional[List[Tuple[Flowable, float, float, float]]] = None
+
+    def _medir(self, ancho: float):
+        self._medidas = []
+        alto = 0.0
+        for indice, elemento in enumerate(self.elementos):
+            # Entre dos elementos el marco deja el mayor de los dos márgenes
+            hueco = max(self.elementos[indice - 1].getSpaceAfter(), elemento.getSpaceBefore()) if indice else 0.0
+            w, h = elemento.wrap(ancho, 1e6)
+            self._medidas.append((elemento, w, h, hueco))
+            alto += hueco + h
+        self._ancho, self._alto = ancho, alto
+        if self.clave is not None:
+            _ALTOS[(self.clave, ancho)] = alto
+
+    def wrap(self, ancho, alto):
+        if self._ancho != ancho:
+            conocido = _ALTOS.get((self.clave, ancho)) if self.clave is not None else None
+            if conocido is None:
+                self._medir(ancho)
+            else:
+                # Bloque invariante: sus elementos se miden al dibujarlo.
+                self._ancho, self._alto, self._medidas = ancho, conocido, None
+        return ancho, self._alto
+
+    def split(self, ancho, alto):
+        marco = getattr(self, "_frame", None)
+        if marco is not None and self.wrap(ancho, alto)[1] > marco._aH + _HOLGURA:
+            # Más alto que una página entera: se reparte elemento a elemento.
+            return list(self.elementos)
+        return []
+
+    def draw(self):
+        if self._medidas is None:
+            self._medir(self._ancho)
+        y = self._alto
+        for elemento, w, h, hueco in self._medidas:
+            y -= hueco + h
+            elemento.drawOn(self.canv, 0, y, _sW=self._ancho - w)
+
+
+class Encajado(Flowable):
+    """Contenido reducido para caber en ``ancho`` × ``alto`` con una sola medida (como ``KeepInFrame`` en modo
+    ``shrink``, pero sin buscar la escala por tanteo)."""
+
+    def __init__(self, contenido: Flowable, ancho: float, alto: float):
+        super().__init__()
+        self.contenido = contenido
+        self.ancho = ancho
+        self.alto = alto
+        self._limites: Optional[Tuple[float, float]] = None
+        self._escala = 1.0
+        self._medida = (0.0, 0.0)
+        self._tam = (0.0, 0.0)
+
+    def wrap(self, ancho, alto):
+        limites = (min(self.ancho, ancho), min(self.alto, alto))
+        if limites != self._limites:
+            maximo_ancho, maximo_alto = limites
+            w, h = self.contenido.wrap(maximo_ancho, 1e6)
+            escala = 1.0
+            if h > maximo_alto:
+                escala = maximo_alto / h
+                # Al ensanchar el texto en la misma proporción su altura no crece: cabe seguro.
+                w, h = self.contenido.wrap(maximo_ancho / escala, 1e6)
+            self._limites, self._escala, self._medida = limites, escala, (w, h)
+            # Como KeepInFrame, un contenido más ancho se declara del ancho disponible y se centra según su hAlign.
+            self._tam = (min(w * escala, maximo_ancho), h * escala)
+        return self._tam
+
+    def draw(self):
+        self.canv.saveState()
+        self.canv.scale(self._escala, self._escala)
+        self.contenido.drawOn(self.canv, 0, 0, _sW=self._tam[0] / self._escala - self._medida[0])
+        self.canv.restoreState()
+
+
+def planificar(historia: List[Flowable], marco: Frame) -> List[Flowable]:
+    """Historia con cada elemento en un :class:`Bloque` y los saltos de página ya decididos.
+
+    Repite la cuenta del marco de ReportLab (márgenes que se solapan, sin margen
+    superior al principio de la página), así que ``doc.build`` coloca cada
+    bloque donde se ha planificado.
+    """
+    ancho, alto_util = marco._getAvailableWidth(), marco._aH
+    planificada: List[Flowable] = []
+    usado = margen_previo = 0.0
+    for posicion, elemento in enumerate(historia):
+        if not isinstance(elemento, (Bloque, Spacer)):
+            elemento = Bloque([elemento])
+        alto = elemento.wrap(ancho, alto_util)[1]
+        margen = max(elemento.getSpaceBefore() - margen_previo, 0.0) if usado else 0.0
+        if usado and usado + margen + alto > alto_util + _HOLGURA:
+            planificada.append(PageBreak())
+            usado = margen_previo = margen = 0.0
+        if alto > alto_util + _HOLGURA:
+            # No cabe ni en una página vacía: el resto lo coloca ReportLab.
+            return planificada + [elemento] + historia[posicion + 1:]
+        planificada.append(elemento)
+        margen_previo = elemento.getSpaceAfter()
+        usado += margen + alto + margen_previo
+    return planificada
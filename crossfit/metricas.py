@@ -0,0 +1,300 @@
+"""Métricas del proceso en el formato de texto de Prometheus.
+
+Con ``CROSSFIT_METRICAS_PUERTO`` definido, cada proceso de la interfaz sirve
+``GET /metrics`` en ``127.0.0.1:<puerto>`` (``CROSSFIT_METRICAS_HOST`` para
+escuchar en otra interfaz) desde un hilo propio, así que un scrape nunca
+compite con los reruns. Si se lanzan varias réplicas, cada una necesita su
+propio puerto.
+
+Los contadores se actualizan con los eventos de :mod:`crossfit.eventos` (una
+suma bajo un candado por evento); los valores instantáneos (PDFs en curso,
+caché, sesiones, memoria) se leen solo cuando llega el scrape.
+"""
+
+import bisect
+import logging
+import os
+import resource
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Callable, Dict, List, Optional, Sequence, Tuple, Union
+
+from crossfit.admision import control_pdf
+from crossfit.cache import almacen
+from crossfit.eventos import (
+    EVENTO_AGRUPADO,
+    EVENTO_DESCARGA,
+    EVENTO_GENERADO,
+    EVENTO_RECHAZADO,
+    EVENTO_REUTILIZADO,
+    eventos,
+)
+
+VARIABLE_PUERTO = "CROSSFIT_METRICAS_PUERTO"
+VARIABLE_HOST = "CROSSFIT_METRICAS_HOST"
+TIPO_CONTENIDO = "text/plain; version=0.0.4; charset=utf-8"
+# Segundos: del PDF ligero con caché caliente al completo con muchas miniaturas
+LIMITES_PDF = (0.05, 0.1, 0.25, 0.5, 1.0, 2.0, 5.0, 10.0, 30.0)
+
+logger = logging.getLogger(__name__)
+
+Etiquetas = Tuple[str, ...]
+
+
+def _escapar(valor: str) -> str:
+    return str(valor).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _texto_etiquetas(nombres: Sequence[str], valores: Sequence[str]) -> str:
+    if not nombres:
+        return ""
+    return "{" + ",".join(f'{nombre}="{_escapar(valor)}"' for nombre, valor in zip(nombres, valores)) + "}"
+
+
+def _numero(valor: float) -> str:
+    if valor == float("inf"):
+        return "+Inf"
+    return repr(float(valor)) if isinstance(valor, float) else str(valor)
+
+
+class Contador:
+    def __init__(self, nombre: str, ayuda: str, etiquetas: Etiquetas = ()):
+        self.nombre, self.ayuda, self.etiquetas = nombre, ayuda, etiquetas
+        self._valores: Dict[Etiquetas, float] = {}
+        self._bloqueo = threading.Lock()
+
+    def incrementar(self, *valores: str, cantidad: float = 1):
+        with self._bloqueo:
+            self._valores[valores] = self._valores.get(valores, 0) + cantidad
+
+    def exponer(self) -> List[str]:
+        with self._bloqueo:
+            valores = sorted(self._valores.items())
+        lineas = [f"# HELP {self.nombre} {self.ayuda}", f"# TYPE {self.nombre} counter"]
+        if not valores and not self.etiquetas:
+            valores = [((), 0)]
+        lineas += [f"{self.nombre}{_texto_etiquetas(self.etiquetas, clave)} {_numero(valor)}" for clave, valor in valores]
+        return lineas
+
+
+class Histograma:
+    def __init__(self, nombre: str, ayuda: str, limites: Sequence[float], etiquetas: Etiquetas = ()):
+        self.nombre, self.ayuda, self.etiquetas = nombre, ayuda, etiquetas
+        self.limites = tuple(sorted(limites))
+        # Por etiquetas: cuentas por intervalo (la última, por encima del mayor límite) y suma
+        self._series: Dict[Etiquetas, Tuple[List[int], List[float]]] = {}
+        self._bloqueo = threading.Lock()
+
+    def observar(self, valor: float, *valores: str):
+        posicion = bisect.bisect_left(self.limites, valor)
+        with self._bloqueo:
+            serie = self._series.get(valores)
+            if serie is None:
+                serie = self._series[valores] = ([0] * (len(self.limites) + 1), [0.0])
+            serie[0][posicion] += 1
+            serie[1][0] += valor
+
+    def exponer(self) -> List[str]:
+        with self._bloqueo:
+            series = sorted((clave, list(cuentas), suma[0]) for clave, (cuentas, suma) in self._series.items())
+        lineas = [f"# HELP {self.nombre} {self.ayuda}", f"# TYPE {self.nombre} histogram"]
+        nombres = self.etiquetas + ("le",)
+        for clave, cuentas, suma in series:
+            acumulado = 0
+            for limite, cuenta in zip(self.limites + (float("inf"),), cuentas):
+                acumulado += cuenta
+                lineas.append(f"{self.nombre}_bucket{_texto_etiquetas(nombres, clave + (_numero(limite),))} {acumulado}")
+            lineas.append(f"{self.nombre}_sum{_texto_etiquetas(self.etiquetas, clave)} {_numero(suma)}")
+            lineas.append(f"{self.nombre}_count{_texto_etiquetas(self.etiquetas, clave)} {acumulado}")
+        return lineas
+
+
+Lectura = Union[Optional[float], Dict[Etiquetas, float]]
+
+
+class Medidor:
+    """Valor que se calcula al exponerlo; ``leer`` devuelve un número, ``None`` o ``{etiquetas: valor}``."""
+
+    def __init__(self, nombre: str, ayuda: str, leer: Callable[[], Lectura], etiquetas: Etiquetas = (),
+                 tipo: str = "gauge"):
+        self.nombre, self.ayuda, self.leer, self.etiquetas, self.tipo = nombre, ayuda, leer, etiquetas, tipo
+
+    def exponer(self) -> List[str]:
+        try:
+            lectura = self.leer()
+        except Exception:
+            logger.exception("No se ha podido leer la métrica %s", self.nombre)
+            return []
+        if lectura is None:
+            return []
+        if not isinstance(lectura, dict):
+            lectura = {(): lectura}
+        lineas = [f"# HELP {self.nombre} {self.ayuda}", f"# TYPE {self.nombre} {self.tipo}"]
+        lineas += [
+            f"{self.nombre}{_texto_etiquetas(self.etiquetas, clave)} {_numero(valor)}"
+            for clave, valor in sorted(lectura.items())
+        ]
+        return lineas
+
+
+class Registro:
+    def __init__(self):
+        self.metricas: list = []
+
+    def contador(self, nombre: str, ayuda: str, etiquetas: Etiquetas = ()) -> Contador:
+        return self._anadir(Contador(nombre, ayuda, etiquetas))
+
+    def histograma(self, nombre: str, ayuda: str, limites: Sequence[float], etiquetas: Etiquetas = ()) -> Histograma:
+        return self._anadir(Histograma(nombre, ayuda, limites, etiquetas))
+
+    def medidor(self, nombre: str, ayuda: str, leer: Callable[[], Lectura], etiquetas: Etiquetas = (),
+                tipo: str = "gauge") -> Medidor:
+        return self._anadir(Medidor(nombre, ayuda, leer, etiquetas, tipo))
+
+    def _anadir(self, metrica):
+        self.metricas.append(metrica)
+        return metrica
+
+    def exponer(self) -> str:
+        lineas = []
+        for metrica in self.metricas:
+            lineas += metrica.exponer()
+        return "\n".join(lineas) + "\n"
+
+
+registro = Registro()
+
+pdf_generados = registro.contador("crossfit_pdf_generados_total", "PDFs generados por motor", ("motor",))
+pdf_segundos = registro.histograma(
+    "crossfit_pdf_segundos", "Tiempo de generación de cada PDF", LIMITES_PDF, ("motor",)
+)
+pdf_reutilizados = registro.contador(
+    "crossfit_pdf_reutilizados_total", "PDFs servidos sin generarlos, por origen", ("origen",)
+)
+pdf_agrupados = registro.contador(
+    "crossfit_pdf_agrupados_total", "Peticiones que esperaron a un PDF idéntico ya en curso"
+)
+pdf_rechazados = registro.contador("crossfit_pdf_rechazados_total", "PDFs rechazados por motivo", ("motivo",))
+descargas = registro.contador("crossfit_descargas_total", "Clics de descarga por motor", ("motor",))
+reruns = registro.contador("crossfit_reruns_total", "Ejecuciones del script por página", ("pagina",))
+
+
+def _al_evento(evento: str, campos: dict):
+    if evento == EVENTO_GENERADO:
+        motor = campos.get("motor", "")
+        pdf_generados.incrementar(motor)
+        if "ms" in campos:
+            pdf_segundos.observar(campos["ms"] / 1000, motor)
+    elif evento == EVENTO_REUTILIZADO:
+        pdf_reutilizados.incrementar(campos.get("origen", ""))
+    elif evento == EVENTO_AGRUPADO:
+        pdf_agrupados.incrementar()
+    elif evento == EVENTO_RECHAZADO:
+        pdf_rechazados.incrementar(campos.get("motivo", ""))
+    elif evento == EVENTO_DESCARGA:
+        descargas.incrementar(campos.get("motor", ""))
+
+
+eventos.suscribir(_al_evento)
+
+
+def _admision(campo: str) -> Callable[[], float]:
+    return lambda: control_pdf.estadisticas()[campo]
+
+
+def _cache() -> dict:
+    datos = almacen.estadisticas()
+    return {(datos["tipo"], resultado): datos[resultado] for resultado in ("aciertos", "fallos")}
+
+
+def _proporcion_cache() -> Optional[float]:
+    datos = almacen.estadisticas()
+    consultas = datos["aciertos"] + datos["fallos"]
+    return datos["aciertos"] / consultas if consultas else None
+
+
+def _sesiones() -> Optional[int]:
+    from streamlit import runtime
+
+    if not runtime.exists():
+        return None
+    gestor = getattr(runtime.get_instance(), "_session_mgr", None)
+    return gestor.num_active_sessions() if gestor is not None else None
+
+
+def memoria_residente() -> float:
+    try:
+        with open("/proc/self/statm") as archivo:
+            return int(archivo.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError, IndexError):
+        # Sin /proc solo queda el máximo alcanzado (en KiB en Linux, en bytes en macOS)
+        maximo = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        return maximo if os.uname().sysname == "Darwin" else maximo * 1024
+
+
+def _cpu() -> float:
+    tiempos = os.times()
+    return tiempos.user + tiempos.system
+
+
+registro.medidor("crossfit_pdf_en_curso", "PDFs generándose ahora mismo", _admision("en_curso"))
+registro.medidor("crossfit_pdf_en_cola", "PDFs esperando turno para generarse", _admision("en_cola"))
+registro.medidor("crossfit_pdf_max_simultaneos", "PDFs que pueden generarse a la vez", _admision("max_simultaneos"))
+registro.medidor(
+    "crossfit_cache_consultas_total", "Consultas a la caché de artefactos por resultado", _cache,
+    ("almacen", "resultado"), tipo="counter",
+)
+registro.medidor("crossfit_cache_proporcion_aciertos", "Aciertos / consultas de la caché de artefactos", _proporcion_cache)
+registro.medidor("crossfit_sesiones_activas", "Sesiones de Streamlit conectadas a este proceso", _sesiones)
+registro.medidor("process_resident_memory_bytes", "Memoria residente del proceso", memoria_residente)
+registro.medidor("process_cpu_seconds_total", "Tiempo de CPU del proceso", _cpu, tipo="counter")
+registro.medidor("process_threads", "Hilos del proceso", threading.active_count)
+
+
+class _Manejador(BaseHTTPRequestHandler):
+    def do_GET(self):
+        if self.path.split("?")[0] not in ("/metrics", "/"):
+            self.send_error(404)
+            return
+        cuerpo = registro.exponer().encode("utf-8")
+        self.send_response(200)
+        self.send_header("Content-Type", TIPO_CONTENIDO)
+        self.send_header("Content-Length", str(len(cuerpo)))
+        self.end_headers()
+        self.wfile.write(cuerpo)
+
+    def log_message(self, formato, *args):
+        logger.debug("%s %s", self.address_string(), formato % args)
+
+
+class _Servidor(ThreadingHTTPServer):
+    daemon_threads = True
+
+
+_servidor: Optional[_Servidor] = None
+_intentado = False
+_bloqueo = threading.Lock()
+
+
+def iniciar_metricas() -> Optional[int]:
+    """Arranca (una sola vez por proceso) el servidor de métricas; devuelve el puerto o ``None``."""
+    global _servidor, _intentado
+    if _servidor is not None or _intentado:
+        return _servidor.server_address[1] if _servidor is not None else None
+    with _bloqueo:
+        if _intentado:
+            return _servidor.server_address[1] if _servidor is not None else None
+        _intentado = True
+        valor = os.environ.get(VARIABLE_PUERTO, "").strip()
+        if not valor:
+            return None
+        host = os.environ.get(VARIABLE_HOST, "127.0.0.1").strip() or "127.0.0.1"
+        try:
+            servidor = _Servidor((host, int(valor)), _Manejador)
+        except (OSError, ValueError) as exc:
+            logger.warning("No se ha podido abrir el puerto de métricas %s:%s: %s", host, valor, exc)
+            return None
+        threading.Thread(target=servidor.serve_forever, name="crossfit-metricas", daemon=True).start()
+        _servidor = servidor
+        logger.info("Métricas en http://%s:%d/metrics", host, servidor.server_address[1])
+        return servidor.server_address[1]
@@ -0,0 +1,131 @@
+"""Miniaturas de demostración de los ejercicios para la tabla del PDF.
+
+Las imágenes originales se dejan en ``imagenes/ejercicios`` (o en la carpeta de
+``CROSSFIT_IMAGENES_EJERCICIOS``) con el nombre del ejercicio en minúsculas,
+sin tildes y con guiones bajos: ``TRX Atomic Push-up`` → ``trx_atomic_push_up.jpg``.
+Los ejercicios sin imagen simplemente no la muestran.
+
+Cada original se reduce una sola vez a ``LADO_PULGADAS`` a ``PPP`` y se guarda
+como JPEG en una caché en disco direccionada por contenido (el nombre es la
+huella SHA-256 del original y de los parámetros de reducción), compartida entre
+procesos y reinicios. Los PDFs dibujan la miniatura por su ruta y reportlab
+incrusta cada ruta una sola vez por documento: como la ruta es la huella del
+contenido, dos ejercicios con la misma imagen comparten también el objeto.
+"""
+
+import hashlib
+import io
+import logging
+import os
+import re
+import unicodedata
+from functools import lru_cache
+from pathlib import Path
+from typing import Dict, List, NamedTuple, Optional, Sequence
+
+from crossfit.cache import escribir_atomico
+from crossfit.recursos import BASE_DIR, Image
+from crossfit.spec import EjercicioSpec
+
+VARIABLE_IMAGENES = "CROSSFIT_IMAGENES_EJERCICIOS"
+VARIABLE_CACHE = "CROSSFIT_CACHE_MINIATURAS"
+DIRECTORIO_IMAGENES = BASE_DIR / "imagenes" / "ejercicios"
+DIRECTORIO_CACHE = BASE_DIR / "datos" / "miniaturas"
+EXTENSIONES = (".jpg", ".jpeg", ".png", ".webp")
+# Lado del cuadro en el que se imprime la miniatura y su resolución
+LADO_PULGADAS = 0.5
+PPP = 150
+CALIDAD_JPEG = 75
+# Cambiarlo invalida las miniaturas ya generadas
+VERSION_MINIATURAS = 1
+
+logger = logging.getLogger(__name__)
+
+
+class Miniatura(NamedTuple):
+    ruta: str
+    # Tamaño impreso en puntos (dentro del cuadro de LADO_PULGADAS)
+    ancho: float
+    alto: float
+
+
+def clave_archivo(nombre: str) -> str:
+    """Nombre de archivo (sin extensión) de la imagen de un ejercicio."""
+    sin_tildes = unicodedata.normalize("NFKD", nombre).encode("ascii", "ignore").decode("ascii")
+    return re.sub(r"[^a-z0-9]+", "_", sin_tildes.lower()).strip("_")
+
+
+def _directorio(variable: str, por_defecto: Path) -> Path:
+    valor = os.environ.get(variable, "").strip()
+    return Path(valor).expanduser() if valor else por_defecto
+
+
+@lru_cache(maxsize=4)
+def _originales(directorio: str, modificado: int) -> Dict[str, str]:
+    """Imágenes de la carpeta por clave de ejercicio (se relee cuando cambia la carpeta)."""
+    originales = {}
+    for entrada in sorted(os.scandir(directorio), key=lambda entrada: entrada.name):
+        raiz, extension = os.path.splitext(entrada.name)
+        if extension.lower() in EXTENSIONES and entrada.is_file():
+            originales.setdefault(raiz.lower(), entrada.path)
+    return originales
+
+
+def _reducir(datos: bytes) -> bytes:
+    lado_px = int(LADO_PULGADAS * PPP)
+    with Image.open(io.BytesIO(datos)) as img:
+        # Los JPEG grandes se decodifican ya a escala reducida
+        img.draft("RGB", (2 * lado_px, 2 * lado_px))
+        img.thumbnail((lado_px, lado_px), Image.LANCZOS)
+        if img.mode in ("RGBA", "LA", "P"):
+            img = img.convert("RGBA")
+            fondo = Image.new("RGB", img.size, "white")
+            fondo.paste(img, mask=img.getchannel("A"))
+            img = fondo
+        elif img.mode != "RGB":
+            img = img.convert("RGB")
+        salida = io.BytesIO()
+        img.save(salida, format="JPEG", quality=CALIDAD_JPEG, optimize=True)
+        return salida.getvalue()
+
+
+@lru_cache(maxsize=1024)
+def _miniatura(original: str, modificado: int, tamano: int, cache: str) -> Optional[Miniatura]:
+    """Miniatura del original en la caché, generándola si aún no existe (una vez por versión del archivo)."""
+    try:
+        datos = Path(original).read_bytes()
+        huella = hashlib.sha256(
+            f"{VERSION_MINIATURAS}:{LADO_PULGADAS}:{PPP}:{CALIDAD_JPEG}:".encode("ascii") + datos
+        ).hexdigest()
+        destino = Path(cache) / huella[:2] / f"{huella}.jpg"
+        if not destino.exists():
+            escribir_atomico(destino, _reducir(datos))
+        with Image.open(destino) as img:
+            ancho_px, alto_px = img.size
+    except (OSError, ValueError, Image.DecompressionBombError) as exc:
+        # Una imagen enorme deja el ejercicio sin miniatura, no el PDF sin generar
+        logger.warning("No se ha podido preparar la miniatura de %s: %s", original, exc)
+        return None
+    escala = 72 / PPP
+    return Miniatura(str(destino), ancho_px * escala, alto_px * escala)
+
+
+def miniaturas(ejercicios: Sequence[EjercicioSpec]) -> List[Optional[Miniatura]]:
+    """Miniatura de cada ejercicio (None si no tiene imagen)."""
+    if Image is None:
+        return [None] * len(ejercicios)
+    directorio = _directorio(VARIABLE_IMAGENES, DIRECTORIO_IMAGENES)
+    try:
+        originales = _originales(str(directorio), directorio.stat().st_mtime_ns)
+    except OSError:
+        return [None] * len(ejercicios)
+    cache = str(_directorio(VARIABLE_CACHE, DIRECTORIO_CACHE))
+    resultado = []
+    for ejercicio in ejercicios:
+        original = originales.get(clave_archivo(ejercicio.nombre))
+        try:
+            estado = os.stat(original) if original else None
+        except OSError:
+            estado = None
+        resultado.append(_miniatura(original, estado.st_mtime_ns, estado.st_size, cache) if estado else None)
+    return resultado
@@ -0,0 +1,487 @@
+"""Generación del PDF del entrenamiento con platypus."""
+
+import io
+from datetime import date, datetime
+from typing import Optional
+
+from reportlab.lib import colors
+from reportlab.lib.pagesizes import A4
+from reportlab.lib.units import inch
+from reportlab.platypus import (
+    Frame,
+    Image as RLImage,
+    Paragraph,
+    SimpleDocTemplate,
+    Spacer,
+    Table,
+    TableStyle,
+)
+from reportlab.lib.utils import ImageReader
+from reportlab.pdfgen import canvas
+
+from crossfit.cache import clave
+from crossfit.catalogo import catalogo_actual
+from crossfit.contexto import contexto_render
+from crossfit.datos import (
+    BENEFICIOS_OTROS,
+    BENEFICIOS_WOD,
+    BORG_ESCALA,
+    CIRCUITO_ENTRENAMIENTO_KEY,
+    NOTAS_IMPORTANTES,
+    OBJETIVOS_ENTRENAMIENTO,
+    OBJETIVOS_ORDEN,
+    TABATA_VIDEO_URL,
+    TEXTO_QR_WOD,
+    TIPOS_CIRCUITO,
+)
+from crossfit.enlaces import enlace_spec
+from crossfit.maquetacion import Bloque, Encajado, planificar
+from crossfit.miniaturas import miniaturas
+from crossfit.pdf_rapido import generar_pdf_rapido
+from crossfit.recursos import ICONO_PROFESOR, LADO_QR_WOD, PROFESOR_EMAIL, PROFESOR_NOMBRE, CodigoQR
+from crossfit.spec import WorkoutSpec, construir_tabata_plan, parametros_pdf
+
+# Clase de lienzo para añadir icono Creative Commons al final
+class CreativeCommonsCanvas(canvas.Canvas):
+    def __init__(self, *args, cc_image=None, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.cc_image = cc_image
+        self._saved_page_states = []
+
+    def showPage(self):
+        self._saved_page_states.append(dict(self.__dict__))
+        self._startPage()
+
+    def save(self):
+        total_pages = len(self._saved_page_states)
+        for idx, state in enumerate(self._saved_page_states, start=1):
+            self.__dict__.update(state)
+            if idx == total_pages:
+                self._draw_cc_logo()
+            canvas.Canvas.showPage(self)
+        canvas.Canvas.save(self)
+
+    def _draw_cc_logo(self):
+        if not self.cc_image:
+            return
+        try:
+            reader = ImageReader(io.BytesIO(self.cc_image))
+        except Exception:
+            return
+        try:
+            img_width, img_height = reader.getSize()
+        except Exception:
+            img_width = img_height = None
+        max_width = 0.95 * inch
+        max_height = 0.55 * inch
+        if img_width and img_height and img_width > 0 and img_height > 0:
+            scale = min(max_width / img_width, max_height / img_height)
+            draw_width = img_width * scale
+            draw_height = img_height * scale
+        else:
+            draw_width = draw_height = max_height
+        x_pos = self._pagesize[0] - draw_width - 22
+        y_pos = 18
+        self.drawImage(reader, x_pos, y_pos, width=draw_width, height=draw_height, mask='auto')
+
+
+# Función para generar PDF
+def generar_pdf(spec: WorkoutSpec):
+    nombre, grupo, tipo_circuito, objetivo = spec.nombre, spec.grupo, spec.tipo, spec.objetivo
+    objetivo_info = spec.objetivo_info
+    plan_tabata = construir_tabata_plan(spec)
+    buffer = io.BytesIO()
+    doc = SimpleDocTemplate(
+        buffer,
+        pagesize=A4,
+        topMargin=0.42*inch,
+        bottomMargin=0.42*inch,
+        leftMargin=0.45*inch,
+        rightMargin=0.45*inch,
+    )
+    story = []
+    # Fuentes, estilos e imágenes compartidos: no se modifican, solo se leen
+    contexto = contexto_render()
+    font_regular, font_bold = contexto.fuente, contexto.fuente_negrita
+    title_style = contexto.estilos["titulo"]
+    section_header_style = contexto.estilos["cabecera_seccion"]
+    cell_style = contexto.estilos["celda"]
+    cell_bold = contexto.estilos["celda_negrita"]
+    center_bold = contexto.estilos["centrado_negrita"]
+    tipo_block_style = contexto.estilos["bloque_tipo"]
+    leyenda_style = contexto.estilos["leyenda"]
+
+    def construir_icono(icono_tipo: Optional[str], ancho: float) -> Optional[RLImage]:
+        if not icono_tipo:
+            return None
+        icono_bytes = contexto.imagen(icono_tipo)
+        if not icono_bytes:
+            return None
+        return RLImage(io.BytesIO(icono_bytes), width=ancho, height=ancho)
+
+    def construir_encabezado(titulo: str, icono_tipo: Optional[str], color_fondo: str):
+        icon_flow = construir_icono(icono_tipo, 0.42*inch) if icono_tipo else None
+        if icon_flow:
+            data = [[icon_flow, Paragraph(titulo.upper(), section_header_style)]]
+            col_widths = [0.5*inch, doc.width - 0.5*inch]
+        else:
+            data = [[Paragraph(titulo.upper(), section_header_style)]]
+            col_widths = [doc.width]
+        header = Table(data, colWidths=col_widths)
+        header.setStyle(TableStyle([
+            ('BACKGROUND', (0, 0), (-1, -1), colors.HexColor(color_fondo)),
+            ('LEFTPADDING', (0, 0), (-1, -1), 10),
+            ('RIGHTPADDING', (0, 0), (-1, -1), 10),
+            ('TOPPADDING', (0, 0), (-1, -1), 5),
+            ('BOTTOMPADDING', (0, 0), (-1, -1), 5),
+            ('VALIGN', (0, 0), (-1, -1), 'MIDDLE'),
+        ]))
+        return header
+
+    def agregar_bloque(titulo: str, contenido, icono_tipo: Optional[str] = None, color_fondo: str = '#2F3C7E',
+                       clave: Optional[str] = None):
+        # clave: el bloque no depende del WOD y su altura se reutiliza entre PDFs
+        contenido_list = contenido if isinstance(contenido, list) else [contenido]
+        elementos = [construir_encabezado(titulo, icono_tipo, color_fondo), Spacer(1, 0.08*inch)]
+        elementos.extend(contenido_list)
+        story.append(Bloque(elementos, clave))
+        story.append(Spacer(1, 0.12*inch))
+
+    def construir_lista_puntos(textos):
+        data = [[Paragraph("•", cell_bold), Paragraph(texto, cell_style)] for texto in textos]
+        tabla = Table(data, colWidths=[0.18*inch, doc.width - 0.18*inch])
+        tabla.setStyle(TableStyle([
+            ('VALIGN', (0, 0), (-1, -1), 'TOP'),
+            ('TEXTCOLOR', (0, 0), (-1, -1), colors.HexColor('#1F2933')),
+            ('LEFTPADDING', (0, 0), (-1, -1), 2),
+            ('BOTTOMPADDING', (0, 0), (-1, -1), 3),
+        ]))
+        return tabla
+
+    def construir_tabla_borg():
+        data = [[Paragraph("Sensación", cell_bold), Paragraph("Descripción", cell_bold)]]
+        for nivel in BORG_ESCALA:
+            data.append([
+                Paragraph(nivel['nivel'], cell_style),
+                Paragraph(nivel['descripcion'], cell_style)
+            ])
+        tabla = Table(data, colWidths=[0.34*doc.width, 0.66*doc.width])
+        estilo = [
+            ('BACKGROUND', (0, 0), (-1, 0), colors.HexColor('#E0E7FF')),
+            ('TEXTCOLOR', (0, 0), (-1, 0), colors.HexColor('#1E1B4B')),
+            ('FONTNAME', (0, 0), (-1, 0), font_bold),
+            ('ALIGN', (0, 0), (-1, 0), 'CENTER'),
+            ('VALIGN', (0, 0), (-1, -1), 'MIDDLE'),
+            ('GRID', (0, 0), (-1, -1), 0.3, colors.HexColor('#E5E7EB')),
+        ]
+        for idx, nivel in enumerate(BORG_ESCALA, start=1):
+            estilo.append(('BACKGROUND', (0, idx), (-1, idx), colors.HexColor(nivel['color'])))
+        tabla.setStyle(TableStyle(estilo))
+        return tabla
+
+    encabezado_img = None
+    encabezado_bytes = contexto.imagen("encabezado")
+    if encabezado_bytes:
+        encabezado_img = RLImage(io.BytesIO(encabezado_bytes), width=doc.width, height=doc.width * 0.28)
+    if encabezado_img:
+        encabezado_img.hAlign = 'CENTER'
+        story.append(encabezado_img)
+        story.append(Spacer(1, 0.05*inch))
+    else:
+        story.append(Paragraph("Entrenamiento CrossFit", title_style))
+        story.append(Spacer(1, 0.05*inch))
+
+    icono_pdf_bytes = contexto.imagen("profesor")
+    icon_img = None
+    if icono_pdf_bytes:
+        icon_img = RLImage(io.BytesIO(icono_pdf_bytes), width=0.9*inch, height=0.9*inch)
+    elif ICONO_PROFESOR.exists():
+        icon_img = RLImage(str(ICONO_PROFESOR), width=0.85*inch, height=0.85*inch)
+
+    # El QR del WOD va en la fila del profesor, así no añade una sección (ni una página) al final
+    enlace_wod = enlace_spec(spec)
+    autor_text = [
+        Paragraph(
+            f"{PROFESOR_NOMBRE}<br/><font size=9 color='#475569'>{PROFESOR_EMAIL}</font>",
+            cell_bold,
+        ),
+        Spacer(1, 0.06*inch),
+        Paragraph(f"{TEXTO_QR_WOD} <link href='{enlace_wod}' color='blue'>{enlace_wod}</link>", leyenda_style),
+    ]
+    codigo_qr = CodigoQR(enlace_wod, LADO_QR_WOD)
+    ancho_qr = LADO_QR_WOD + 0.1*inch
+
+    if icon_img:
+        icon_img.hAlign = 'LEFT'
+        autor = Table(
+            [[icon_img, autor_text, codigo_qr]],
+            colWidths=[1.0*inch, doc.width - 1.0*inch - ancho_qr, ancho_qr]
+        )
+    else:
+        autor = Table([[autor_text, codigo_qr]], colWidths=[doc.width - ancho_qr, ancho_qr])
+    autor.setStyle(TableStyle([
+        ('VALIGN', (0, 0), (-1, -1), 'MIDDLE'),
+        ('ALIGN', (-1, 0), (-1, 0), 'RIGHT'),
+        ('LEFTPADDING', (0, 0), (-1, -1), 0),
+        ('RIGHTPADDING', (0, 0), (-1, -1), 4),
+        ('TOPPADDING', (0, 0), (-1, -1), 2),
+        ('BOTTOMPADDING', (0, 0), (-1, -1), 2),
+    ]))
+    story.append(autor)
+
+    story.append(Spacer(1, 0.12*inch))
+
+    info_row = [
+        Paragraph(f"<b>Nombre:</b> {nombre}", cell_style),
+        Paragraph(f"<b>Grupo:</b> {grupo}", cell_style),
+        Paragraph(f"<b>Fecha:</b> {datetime.now().strftime('%d/%m/%Y')}", cell_style),
+    ]
+    info_table = Table([info_row], colWidths=[0.38*doc.width, 0.26*doc.width, 0.36*doc.width])
+    info_table.setStyle(TableStyle([
+        ('BACKGROUND', (0, 0), (-1, -1), colors.HexColor('#F7F9FC')),
+        ('TEXTCOLOR', (0, 0), (-1, -1), colors.HexColor('#1F2933')),
+        ('ALIGN', (0, 0), (-1, -1), 'LEFT'),
+        ('FONTNAME', (0, 0), (-1, -1), font_regular),
+        ('FONTSIZE', (0, 0), (-1, -1), 10.5),
+        ('TOPPADDING', (0, 0), (-1, -1), 4),
+        ('BOTTOMPADDING', (0, 0), (-1, -1), 4),
+        ('LEFTPADDING', (0, 0), (-1, -1), 6),
+        ('RIGHTPADDING', (0, 0), (-1, -1), 6),
+        ('INNERGRID', (0, 0), (-1, -1), 0.25, colors.HexColor('#E0E4EC')),
+        ('BOX', (0, 0), (-1, -1), 0.5, colors.HexColor('#E0E4EC')),
+    ]))
+    story.append(info_table)
+    story.append(Spacer(1, 0.1*inch))
+
+    target_icon_flow = construir_icono('target', 1.0*inch)
+    if target_icon_flow:
+        tipo_icon = Encajado(target_icon_flow, 1.05*inch, 1.05*inch)
+    else:
+        tipo_icon = Spacer(1.0*inch, 1.0*inch)
+    texto_tipo = (
+        "<font size=9 color='#B5179E'>WOD</font><br/>"
+        f"<font size=18 color='#B5179E'><b>{TIPOS_CIRCUITO[tipo_circuito]['nombre']}</b></font><br/>"
+        f"<font size=11 color='#1F2933'>{TIPOS_CIRCUITO[tipo_circuito]['descripcion']}</font>"
+    )
+    tipo_text = Encajado(Paragraph(texto_tipo, tipo_block_style), max(doc.width * 0.56, 2.8*inch), 1.35*inch)
+    texto_width = doc.width - 1.05*inch
+    tipo_card = Table(
+        [[tipo_icon, tipo_text]],
+        colWidths=[1.05*inch, texto_width]
+    )
+    tipo_card.setStyle(TableStyle([
+        ('BACKGROUND', (0, 0), (-1, -1), colors.HexColor('#FFF4EE')),
+        ('BOX', (0, 0), (-1, -1), 0.9, colors.HexColor('#F5C9B5')),
+        ('INNERGRID', (0, 0), (-1, -1), 0.3, colors.HexColor('#FBE1D2')),
+        ('LEFTPADDING', (0, 0), (-1, -1), 8),
+        ('RIGHTPADDING', (0, 0), (-1, -1), 8),
+        ('TOPPADDING', (0, 0), (-1, -1), 8),
+        ('BOTTOMPADDING', (0, 0), (-1, -1), 8),
+        ('VALIGN', (0, 0), (-1, -1), 'MIDDLE'),
+    ]))
+    story.append(tipo_card)
+    story.append(Spacer(1, 0.16*inch))
+
+    notas_table = construir_lista_puntos(NOTAS_IMPORTANTES)
+    agregar_bloque("Notas importantes", [notas_table], icono_tipo="notes", color_fondo='#92400E', clave="notas")
+
+    parametros = parametros_pdf(spec)
+    if parametros:
+        param_rows = [[Paragraph(key, cell_bold), Paragraph(value, cell_style)] for key, value in parametros]
+        param_table = Table(param_rows, colWidths=[0.38*doc.width, 0.62*doc.width])
+        param_table.setStyle(TableStyle([
+            ('BACKGROUND', (0, 0), (-1, -1), colors.whitesmoke),
+            ('ROWBACKGROUNDS', (0, 0), (-1, -1), [colors.white, colors.HexColor('#F5F5F5')]),
+            ('TEXTCOLOR', (0, 0), (-1, -1), colors.HexColor('#111111')),
+            ('LEFTPADDING', (0, 0), (-1, -1), 6),
+            ('RIGHTPADDING', (0, 0), (-1, -1), 6),
+            ('VALIGN', (0, 0), (-1, -1), 'MIDDLE'),
+            ('GRID', (0, 0), (-1, -1), 0.3, colors.HexColor('#D9DEE7')),
+        ]))
+        agregar_bloque("Parámetros configurados", [param_table], icono_tipo="settings", color_fondo='#1F4172')
+
+    if objetivo and objetivo_info:
+        objetivo_rows = []
+        for etiqueta, campo in [
+            ("Objetivo", objetivo),
+            ("Carga", objetivo_info['carga']),
+            ("Repeticiones", objetivo_info['reps']),
+            ("Series", objetivo_info['series']),
+            ("Descanso", objetivo_info['descanso']),
+            ("RIR", objetivo_info['rir']),
+        ]:
+            objetivo_rows.append([Paragraph(etiqueta, cell_bold), Paragraph(campo, cell_style)])
+        objetivo_table = Table(objetivo_rows, colWidths=[0.34*doc.width, 0.66*doc.width])
+        objetivo_table.setStyle(TableStyle([
+            ('BACKGROUND', (0, 0), (-1, -1), colors.HexColor('#FFF7ED')),
+            ('ROWBACKGROUNDS', (0, 0), (-1, -1), [colors.white, colors.HexColor('#FFF1DB')]),
+            ('GRID', (0, 0), (-1, -1), 0.3, colors.HexColor('#F4C7A1')),
+            ('LEFTPADDING', (0, 0), (-1, -1), 6),
+            ('RIGHTPADDING', (0, 0), (-1, -1), 6),
+        ]))
+        agregar_bloque("Objetivo del entrenamiento", [objetivo_table], icono_tipo="summit", color_fondo='#B42318')
+
+    if objetivo:
+        tabla_resumen = [["Objetivo", "%1RM", "Reps", "Series", "Descanso", "RIR"]]
+        for nombre_objetivo in OBJETIVOS_ORDEN:
+            datos = OBJETIVOS_ENTRENAMIENTO[nombre_objetivo]
+            tabla_resumen.append([
+                Paragraph(nombre_objetivo, cell_style),
+                Paragraph(datos['porcentaje'], cell_style),
+                Paragraph(datos['reps'], cell_style),
+                Paragraph(datos['series'], cell_style),
+                Paragraph(datos['descanso'], cell_style),
+                Paragraph(datos['rir'], cell_style),
+            ])
+        resumen_table = Table(
+            tabla_resumen,
+            colWidths=[0.22*doc.width, 0.14*doc.width, 0.14*doc.width, 0.14*doc.width, 0.2*doc.width, 0.16*doc.width]
+        )
+        resumen_table.setStyle(TableStyle([
+            ('BACKGROUND', (0, 0), (-1, 0), colors.HexColor('#1E293B')),
+            ('TEXTCOLOR', (0, 0), (-1, 0), colors.whitesmoke),
+            ('FONTNAME', (0, 0), (-1, 0), font_bold),
+            ('ALIGN', (1, 1), (-1, -1), 'CENTER'),
+            ('VALIGN', (0, 0), (-1, -1), 'MIDDLE'),
+            ('GRID', (0, 0), (-1, -1), 0.35, colors.HexColor('#CBD5F5')),
+            ('ROWBACKGROUNDS', (0, 1), (-1, -1), [colors.white, colors.HexColor('#EEF2FF')])
+        ]))
+        agregar_bloque("Tabla guía de objetivos", [resumen_table], icono_tipo="settings", color_fondo='#0F172A')
+
+    if plan_tabata:
+        plan_data = [["Ejercicio", 'Bloques (20" trabajo / 10" descanso)']]
+        for nombre_ejercicio, bloques in plan_tabata:
+            plan_data.append([
+                Paragraph(nombre_ejercicio, cell_style),
+                Paragraph(str(bloques), cell_style)
+            ])
+        plan_table = Table(plan_data, colWidths=[0.68*doc.width, 0.32*doc.width])
+        plan_table.setStyle(TableStyle([
+            ('BACKGROUND', (0, 0), (-1, 0), colors.HexColor('#FF6B6B')),
+            ('TEXTCOLOR', (0, 0), (-1, 0), colors.whitesmoke),
+            ('ALIGN', (0, 1), (0, -1), 'LEFT'),
+            ('ALIGN', (-1, 1), (-1, -1), 'CENTER'),
+            ('VALIGN', (0, 0), (-1, -1), 'MIDDLE'),
+            ('GRID', (0, 0), (-1, -1), 0.4, colors.HexColor('#F9DCDC')),
+            ('ROWBACKGROUNDS', (0, 1), (-1, -1), [colors.white, colors.HexColor('#FFF2F2')])
+        ]))
+        tabata_url = TABATA_VIDEO_URL
+        enlace_parrafo = (
+            f"<font size=10>Escanea el código QR o usa este enlace: "
+            f"<link href='{tabata_url}' color='blue'>{tabata_url}</link></font>"
+        )
+        plan_content = [plan_table, Spacer(1, 0.08*inch), Paragraph(enlace_parrafo, cell_style), Spacer(1, 0.06*inch)]
+        try:
+            plan_content.append(CodigoQR(tabata_url, 1.6*inch))
+        except Exception:
+            pass
+        agregar_bloque("Plan Tabata", plan_content, icono_tipo="timer", color_fondo='#A02334')
+
+    imagenes = miniaturas(spec.ejercicios)
+    con_imagenes = any(imagenes)
+    ejercicios_data = [["#", "Ejercicio", "Categoría", "Grupos musculares", "Reps"]]
+    for idx, (ej, imagen) in enumerate(zip(spec.ejercicios, imagenes), 1):
+        fila = [
+            str(idx),
+            Paragraph(ej.nombre, cell_style),
+            Paragraph(ej.categoria, cell_style),
+            Paragraph(", ".join(ej.musculos), cell_style),
+            Paragraph(ej.reps_texto, cell_style),
+        ]
+        if con_imagenes:
+            # Por la ruta de la caché: reportlab incrusta cada miniatura una sola vez.
+            fila.insert(1, RLImage(imagen.ruta, width=imagen.ancho, height=imagen.alto) if imagen else "")
+        ejercicios_data.append(fila)
+    proporciones = [0.07, 0.32, 0.18, 0.31, 0.12]
+    if con_imagenes:
+        ejercicios_data[0].insert(1, "")
+        proporciones = [0.07, 0.10, 0.26, 0.16, 0.29, 0.12]
+    tabla_ancho = doc.width
+    ejercicios_table = Table(ejercicios_data, colWidths=[proporcion * tabla_ancho for proporcion in proporciones])
+    ejercicios_table.setStyle(TableStyle([
+        ('BACKGROUND', (0, 0), (-1, 0), colors.HexColor('#4ECDC4')),
+        ('TEXTCOLOR', (0, 0), (-1, 0), colors.whitesmoke),
+        ('ALIGN', (0, 1), (1 if con_imagenes else 0, -1), 'CENTER'),
+        ('ALIGN', (-1, 1), (-1, -1), 'CENTER'),
+        ('VALIGN', (0, 0), (-1, -1), 'MIDDLE'),
+        ('FONTNAME', (0, 0), (-1, 0), font_bold),
+        ('FONTSIZE', (0, 0), (-1, 0), 11),
+        ('BOTTOMPADDING', (0, 0), (-1, 0), 8),
+        ('GRID', (0, 0), (-1, -1), 0.35, colors.HexColor('#B7E4DC')),
+        ('ROWBACKGROUNDS', (0, 1), (-1, -1), [colors.white, colors.HexColor('#F2FFFC')])
+    ]))
+    agregar_bloque("Ejercicios del WOD", [ejercicios_table], icono_tipo="dumbbell", color_fondo='#0F766E')
+
+    borg_table = construir_tabla_borg()
+    agregar_bloque(
+        "Percepción subjetiva del esfuerzo (Escala de Borg)",
+        [borg_table],
+        icono_tipo="notes",
+        color_fondo='#7C3AED',
+        clave="borg",
+    )
+
+    beneficios_especificos = BENEFICIOS_WOD.get(
+        tipo_circuito,
+        BENEFICIOS_WOD.get(CIRCUITO_ENTRENAMIENTO_KEY, []),
+    )
+    if beneficios_especificos:
+        tabla_beneficios = construir_lista_puntos(beneficios_especificos)
+        agregar_bloque(
+            "Beneficios específicos del WOD",
+            [tabla_beneficios],
+            icono_tipo="performance",
+            color_fondo='#2563EB',
+            clave=f"beneficios:{tipo_circuito}",
+        )
+
+    tabla_beneficios_generales = construir_lista_puntos(BENEFICIOS_OTROS)
+    agregar_bloque(
+        "Otros beneficios",
+        [tabla_beneficios_generales],
+        icono_tipo="wellbeing",
+        color_fondo='#4C1D95',
+        clave="otros_beneficios",
+    )
+
+    registro_table = Table(
+        [
+            [Paragraph("<b>Tiempo invertido / Rondas o repeticiones completadas</b>", cell_bold)],
+            [Paragraph("\n\n", cell_style)],
+            [Paragraph("<b>Observaciones</b>", cell_bold)],
+            [Paragraph("\n\n\n", cell_style)],
+        ],
+        colWidths=[doc.width],
+        rowHeights=[None, 0.4*inch, None, 1.1*inch]
+    )
+    registro_table.setStyle(TableStyle([
+        ('BACKGROUND', (0, 0), (-1, -1), colors.HexColor('#F8FAFC')),
+        ('BOX', (0, 0), (-1, -1), 0.5, colors.HexColor('#CBD5F5')),
+        ('INNERGRID', (0, 0), (-1, -1), 0.5, colors.HexColor('#E2E8F0')),
+        ('LEFTPADDING', (0, 0), (-1, -1), 6),
+        ('RIGHTPADDING', (0, 0), (-1, -1), 6),
+        ('VALIGN', (0, 0), (-1, -1), 'TOP'),
+    ]))
+    agregar_bloque("Registro del entrenamiento", [registro_table], icono_tipo="settings", color_fondo='#0F172A')
+    story.append(Paragraph("¡Disfruta de tu entrenamiento!", center_bold))
+    story.append(Spacer(1, 0.12*inch))
+
+    cc_icon_bytes = contexto.imagen("creative_commons")
+    doc.build(
+        planificar(story, Frame(doc.leftMargin, doc.bottomMargin, doc.width, doc.height)),
+        canvasmaker=lambda *args, **kwargs: CreativeCommonsCanvas(*args, cc_image=cc_icon_bytes, **kwargs)
+    )
+    buffer.seek(0)
+    return buffer
+
+
+# Motores disponibles para generar el PDF, seleccionables por petición.
+MOTORES_PDF = {
+    "completo": generar_pdf,
+    "rapido": generar_pdf_rapido,
+}
+
+
+def clave_pdf(spec: WorkoutSpec, motor: str, dia: Optional[date] = None) -> str:
+    """Clave del PDF en la caché compartida (la fecha impresa forma parte del contenido)."""
+    return clave("pdf", motor, spec.huella(), catalogo_actual().huella, (dia or date.today()).isoformat())
@@ -0,0 +1,135 @@
+"""PDF para el profesor con la rotación de estaciones de una clase."""
+
+import io
+from datetime import datetime
+from functools import lru_cache
+from typing import Tuple
+from xml.sax.saxutils import escape
+
+from reportlab.lib import colors
+from reportlab.lib.pagesizes import A4, landscape
+from reportlab.lib.styles import ParagraphStyle, getSampleStyleSheet
+from reportlab.lib.units import inch
+from reportlab.platypus import Paragraph, SimpleDocTemplate, Spacer, Table, TableStyle
+
+from crossfit.cache import memorizar
+from crossfit.catalogo import catalogo_actual
+from crossfit.contexto import contexto_render
+from crossfit.estaciones import SIN_MATERIAL, PlanRotacion, plan_clase
+from crossfit.recursos import PROFESOR_NOMBRE
+from crossfit.spec import WorkoutSpec
+
+COLOR_CABECERA = colors.HexColor('#2F3C7E')
+COLOR_ALTERNO = colors.HexColor('#F1F5F9')
+
+
+def _reloj(minutos: int) -> str:
+    return f"{minutos // 60}:{minutos % 60:02d}" if minutos >= 60 else f"{minutos}'"
+
+
+def generar_pdf_rotacion(plan: PlanRotacion, grupo: str, minutos_por_turno: int):
+    buffer = io.BytesIO()
+    doc = SimpleDocTemplate(
+        buffer,
+        pagesize=landscape(A4),
+        topMargin=0.4*inch,
+        bottomMargin=0.4*inch,
+        leftMargin=0.4*inch,
+        rightMargin=0.4*inch,
+        title=f"Rotación de estaciones {grupo}",
+    )
+    styles = getSampleStyleSheet()
+    contexto = contexto_render()
+    font_regular, font_bold = contexto.fuente, contexto.fuente_negrita
+    titulo = ParagraphStyle('Titulo', parent=styles['Heading1'], fontSize=18, fontName=font_bold,
+                            textColor=colors.HexColor('#FF6B6B'), spaceAfter=4)
+    subtitulo = ParagraphStyle('Subtitulo', parent=styles['Heading2'], fontSize=12, fontName=font_bold,
+                               textColor=COLOR_CABECERA, spaceBefore=8, spaceAfter=4)
+    texto = ParagraphStyle('Texto', parent=styles['BodyText'], fontSize=9, leading=12, fontName=font_regular)
+    celda = ParagraphStyle('Celda', parent=texto, fontSize=7, leading=8.5)
+    celda_cabecera = ParagraphStyle('CeldaCabecera', parent=celda, fontName=font_bold, textColor=colors.white)
+
+    def tabla(filas, anchos):
+        resultado = Table(filas, colWidths=anchos, repeatRows=1)
+        resultado.setStyle(TableStyle([
+            ('BACKGROUND', (0, 0), (-1, 0), COLOR_CABECERA),
+            ('ROWBACKGROUNDS', (0, 1), (-1, -1), [colors.white, COLOR_ALTERNO]),
+            ('GRID', (0, 0), (-1, -1), 0.3, colors.HexColor('#CBD5E1')),
+            ('VALIGN', (0, 0), (-1, -1), 'TOP'),
+            ('LEFTPADDING', (0, 0), (-1, -1), 3),
+            ('RIGHTPADDING', (0, 0), (-1, -1), 3),
+            ('TOPPADDING', (0, 0), (-1, -1), 2),
+            ('BOTTOMPADDING', (0, 0), (-1, -1), 2),
+        ]))
+        return resultado
+
+    n_turnos = len(plan.turnos)
+    usados = {ejercicio.categoria for fila in plan.turnos for ejercicio in fila if ejercicio is not None}
+    materiales = [categoria for categoria in plan.inventario if categoria not in SIN_MATERIAL and categoria in usados]
+    inventario_texto = ", ".join(f"{categoria}: {unidades}" for categoria, unidades in plan.inventario.items()) or "-"
+    story = [
+        Paragraph(f"Rotación de estaciones · {escape(grupo)}", titulo),
+        Paragraph(
+            f"{PROFESOR_NOMBRE} · {datetime.now().strftime('%d/%m/%Y')} · {len(plan.alumnos)} alumnos · "
+            f"{n_turnos} turnos de {minutos_por_turno} min ({n_turnos * minutos_por_turno} min por vuelta; "
+            f"mínimo posible: {plan.cota_inferior} turnos)",
+            texto,
+        ),
+        Paragraph(f"<b>Material:</b> {inventario_texto}. Autocarga y Carrera no necesitan material.", texto),
+        Paragraph("Si el WOD tiene varias rondas, se repite la rotación completa en cada ronda.", texto),
+    ]
+    if plan.sin_material:
+        faltan = "; ".join(f"{escape(alumno)}: {ejercicio.nombre} ({ejercicio.categoria})" for alumno, ejercicio in plan.sin_material)
+        story.append(Paragraph(f"<b>Sin material disponible (no incluidos):</b> {faltan}", texto))
+
+    # Vista por estaciones: qué alumnos usan cada material en cada turno.
+    story.append(Paragraph("Ocupación del material por turno", subtitulo))
+    columnas = ["Autocarga / Carrera"] + materiales
+    ancho_turno = 0.75*inch
+    ancho_columna = (doc.width - ancho_turno) / len(columnas)
+    filas = [[Paragraph("Turno", celda_cabecera)] + [
+        Paragraph(columna if columna not in plan.inventario else f"{columna} ({plan.inventario[columna]})", celda_cabecera)
+        for columna in columnas
+    ]]
+    for turno in range(n_turnos):
+        ocupacion = plan.estaciones(turno)
+        libres = [alumno for categoria in SIN_MATERIAL for alumno in ocupacion.get(categoria, [])]
+        filas.append(
+            [Paragraph(f"{turno + 1} · {_reloj(turno * minutos_por_turno)}", celda),
+             Paragraph(escape(", ".join(libres)), celda)]
+            + [Paragraph(escape(", ".join(ocupacion.get(categoria, []))), celda) for categoria in materiales]
+        )
+    story.append(tabla(filas, [ancho_turno] + [ancho_columna] * len(columnas)))
+
+    # Vista por alumno: el ejercicio de cada turno (en bloques de turnos para que quepa en la página).
+    story.append(Spacer(1, 0.1*inch))
+    story.append(Paragraph("Recorrido de cada alumno", subtitulo))
+    ancho_alumno = 1.4*inch
+    por_bloque = max(1, int((doc.width - ancho_alumno) // (0.8*inch)))
+    for inicio in range(0, n_turnos, por_bloque):
+        bloque = range(inicio, min(n_turnos, inicio + por_bloque))
+        filas = [[Paragraph("Alumno", celda_cabecera)] + [Paragraph(f"Turno {turno + 1}", celda_cabecera) for turno in bloque]]
+        for indice, alumno in enumerate(plan.alumnos):
+            filas.append([Paragraph(escape(alumno), celda)] + [
+                Paragraph(plan.turnos[turno][indice].nombre if plan.turnos[turno][indice] else "—", celda)
+                for turno in bloque
+            ])
+        ancho = (doc.width - ancho_alumno) / len(bloque)
+        story.append(tabla(filas, [ancho_alumno] + [ancho] * len(bloque)))
+        story.append(Spacer(1, 0.1*inch))
+
+    doc.build(story)
+    buffer.seek(0)
+    return buffer
+
+
+@lru_cache(maxsize=16)
+def pdf_rotacion_clase(
+    specs: Tuple[WorkoutSpec, ...], inventario: Tuple[Tuple[str, int], ...], grupo: str, minutos_por_turno: int, dia: str
+) -> bytes:
+    """PDF de la rotación cacheado entre reruns del panel y réplicas (``dia`` invalida la fecha impresa)."""
+    return memorizar(
+        "rotacion",
+        ([spec.huella() for spec in specs], catalogo_actual().huella, inventario, grupo, minutos_por_turno, dia),
+        lambda: generar_pdf_rotacion(plan_clase(specs, inventario), grupo, minutos_por_turno).getvalue(),
+    )
@@ -0,0 +1,732 @@
+"""Motor «rápido» del PDF: dibuja la misma plantilla directamente sobre el lienzo.
+
+La plantilla es fija (dos o tres páginas según el WOD), así que cada bloque se mide una vez con
+``simpleSplit`` y se coloca con coordenadas calculadas, sin tablas anidadas,
+``KeepTogether`` ni ``KeepInFrame``. Las imágenes se reducen una sola vez a la
+resolución con la que se imprimen.
+"""
+
+import hashlib
+import io
+from datetime import datetime
+from functools import lru_cache
+from typing import List, Optional, Sequence
+
+from reportlab.lib import colors
+from reportlab.lib.pagesizes import A4
+from reportlab.lib.units import inch
+from reportlab.lib.utils import ImageReader, simpleSplit
+from reportlab.pdfgen import canvas
+
+from crossfit.cache import memorizar
+from crossfit.contexto import contexto_render
+from crossfit.datos import (
+    BENEFICIOS_OTROS,
+    BENEFICIOS_WOD,
+    BORG_ESCALA,
+    CIRCUITO_ENTRENAMIENTO_KEY,
+    NOTAS_IMPORTANTES,
+    OBJETIVOS_ENTRENAMIENTO,
+    OBJETIVOS_ORDEN,
+    TABATA_VIDEO_URL,
+    TEXTO_QR_WOD,
+    TIPOS_CIRCUITO,
+)
+from crossfit.enlaces import enlace_spec
+from crossfit.miniaturas import Miniatura, miniaturas
+from crossfit.recursos import Image, LADO_QR_WOD, PROFESOR_EMAIL, PROFESOR_NOMBRE, dibujar_qr
+from crossfit.spec import WorkoutSpec, construir_tabata_plan, parametros_pdf
+
+PAGINA_ANCHO, PAGINA_ALTO = A4
+MARGEN_IZQ = MARGEN_DER = 0.45 * inch
+MARGEN_SUP = MARGEN_INF = 0.42 * inch
+ANCHO = PAGINA_ANCHO - MARGEN_IZQ - MARGEN_DER
+ALTO_UTIL = PAGINA_ALTO - MARGEN_SUP - MARGEN_INF
+ALTO_CABECERA_SECCION = 0.42 * inch + 10
+ESPACIO_TRAS_CABECERA = 0.08 * inch
+ESPACIO_TRAS_BLOQUE = 0.12 * inch
+# Resolución de impresión de las imágenes reducidas (píxeles por pulgada).
+PPP_IMAGENES = 150
+
+COLOR_TEXTO = colors.HexColor('#1F2933')
+
+
+@lru_cache(maxsize=32)
+def imagen_reducida(nombre: str, ancho_pulgadas: float) -> Optional[bytes]:
+    """Devuelve el recurso ``nombre`` reducido a ``PPP_IMAGENES`` para el ancho impreso."""
+    datos = contexto_render().imagen(nombre)
+    if not datos or Image is None:
+        return datos
+    ancho_px = max(1, int(ancho_pulgadas * PPP_IMAGENES))
+    return memorizar(
+        "imagen", ("reducida", hashlib.sha256(datos).hexdigest(), ancho_px), lambda: _reducir(datos, ancho_px)
+    )
+
+
+def _reducir(datos: bytes, ancho_px: int) -> bytes:
+    try:
+        with Image.open(io.BytesIO(datos)) as img:
+            if img.width <= ancho_px:
+                return datos
+            alto_px = max(1, round(img.height * ancho_px / img.width))
+            reducida = img.resize((ancho_px, alto_px), Image.LANCZOS)
+            salida = io.BytesIO()
+            if reducida.mode in ("RGBA", "LA", "P"):
+                reducida.save(salida, format="PNG", optimize=True)
+            else:
+                reducida.convert("RGB").save(salida, format="JPEG", quality=85)
+            return salida.getvalue()
+    except Exception:
+        return datos
+
+
+@lru_cache(maxsize=4096)
+def _partir(texto: str, fuente: str, tam: float, ancho: float) -> tuple:
+    """``simpleSplit`` memorizado: los textos fijos de la plantilla se miden una vez por proceso."""
+    return tuple(simpleSplit(texto, fuente, tam, ancho))
+
+
+class _Celda:
+    __slots__ = ("lineas", "fuente", "tam", "color", "alinear", "imagen")
+
+    def __init__(self, lineas, fuente, tam, color, alinear, imagen=None):
+        self.lineas = lineas
+        self.fuente = fuente
+        self.tam = tam
+        self.color = color
+        self.alinear = alinear
+        self.imagen = imagen
+
+
+class _Tabla:
+    """Tabla medida de antemano: cada fila conoce su altura antes de dibujarse."""
+
+    def __init__(self, lienzo, filas, proporciones, cabecera=None, fondo_cabecera=None,
+                 texto_cabecera=colors.whitesmoke, fondos=None, fondos_fila=None, rejilla=None,
+                 caja=None, negrita_columnas=(), centrar_columnas=(), tam=10, interlineado=13,
+                 relleno_h=6, relleno_v=4, altos_minimos=None):
+        self.lienzo = lienzo
+        self.anchos = [p * ANCHO for p in proporciones]
+        self.fondo_cabecera = fondo_cabecera
+        self.fondos = fondos
+        self.fondos_fila = fondos_fila
+        self.rejilla = rejilla
+        self.caja = caja
+        self.interlineado = interlineado
+        self.relleno_h = relleno_h
+        self.relleno_v = relleno_v
+        self.cabecera = None
+        if cabecera:
+            self.cabecera = self._medir(cabecera, [True] * len(cabecera), centrar_columnas, texto_cabecera, tam, None)
+        self.filas = []
+        for indice, fila in enumerate(filas):
+            negritas = [col in negrita_columnas for col in range(len(fila))]
+            minimo = altos_minimos[indice] if altos_minimos else None
+            self.filas.append(self._medir(fila, negritas, centrar_columnas, COLOR_TEXTO, tam, minimo))
+        self.alto = sum(alto for _, alto in self.filas) + (self.cabecera[1] if self.cabecera else 0)
+
+    def _medir(self, fila, negritas, centrar_columnas, color, tam, minimo):
+        celdas = []
+        lineas_max = 1
+        for col, (texto, ancho) in enumerate(zip(fila, self.anchos)):
+            if isinstance(texto, Miniatura):
+                celdas.append(_Celda((), self.lienzo.fuente, tam, color, "C", texto))
+                minimo = max(minimo or 0, texto.alto + 2 * self.relleno_v)
+                continue
+            fuente = self.lienzo.negrita if negritas[col] else self.lienzo.fuente
+            lineas = _partir("" if texto is None else str(texto), fuente, tam, ancho - 2 * self.relleno_h) or ("",)
+            lineas_max = max(lineas_max, len(lineas))
+            celdas.append(_Celda(lineas, fuente, tam, color, "C" if col in centrar_columnas else "L"))
+        alto = lineas_max * self.interlineado + 2 * self.relleno_v
+        return celdas, max(alto, minimo or 0)
+
+    @property
+    def alto_primera_fila(self):
+        primera = self.filas[0][1] if self.filas else 0
+        return primera + (self.cabecera[1] if self.cabecera else 0)
+
+    def _dibujar_fila(self, celdas, alto, fondo):
+        c = self.lienzo.c
+        y = self.lienzo.y - alto
+        x = MARGEN_IZQ
+        if fondo is not None:
+            c.setFillColor(fondo)
+            c.rect(MARGEN_IZQ, y, sum(self.anchos), alto, stroke=0, fill=1)
+        for celda, ancho in zip(celdas, self.anchos):
+            if celda.imagen is not None:
+                # Por la ruta: reportlab incrusta cada imagen una sola vez por documento.
+                imagen = celda.imagen
+                c.drawImage(imagen.ruta, x + (ancho - imagen.ancho) / 2, y + (alto - imagen.alto) / 2,
+                            imagen.ancho, imagen.alto)
+            c.setFillColor(celda.color)
+            c.setFont(celda.fuente, celda.tam)
+            base = self.lienzo.y - self.relleno_v - celda.tam
+            for linea in celda.lineas:
+                if celda.alinear == "C":
+                    c.drawCentredString(x + ancho / 2, base, linea)
+                else:
+                    c.drawString(x + self.relleno_h, base, linea)
+                base -= self.interlineado
+            if self.rejilla is not None:
+                c.setStrokeColor(self.rejilla)
+                c.setLineWidth(0.3)
+                c.rect(x, y, ancho, alto, stroke=1, fill=0)
+            x += ancho
+        if self.caja is not None:
+            c.setStrokeColor(self.caja)
+            c.setLineWidth(0.5)
+            c.rect(MARGEN_IZQ, y, sum(self.anchos), alto, stroke=1, fill=0)
+        self.lienzo.y = y
+
+    def dibujar(self, partir: bool = True):
+        if self.cabecera:
+            self._dibujar_fila(*self.cabecera, self.fondo_cabecera)
+        for indice, (celdas, alto) in enumerate(self.filas):
+            if partir and self.lienzo.y - alto < self.lienzo.margen_inferior:
+                self.lienzo.nueva_pagina()
+                if self.cabecera:
+                    self._dibujar_fila(*self.cabecera, self.fondo_cabecera)
+            if self.fondos_fila is not None:
+                fondo = self.fondos_fila[indice]
+            elif self.fondos:
+                fondo = self.fondos[indice % len(self.fondos)]
+            else:
+                fondo = None
+            self._dibujar_fila(celdas, alto, fondo)
+
+
+def _tabla_ejercicios(filas, ejercicios) -> dict:
+    """Filas, columnas y cabecera de la tabla de ejercicios, con miniaturas si algún ejercicio tiene imagen."""
+    imagenes = miniaturas(ejercicios)
+    if not any(imagenes):
+        return dict(
+            filas=filas, proporciones=[0.07, 0.32, 0.18, 0.31, 0.12],
+            cabecera=["#", "Ejercicio", "Categoría", "Grupos musculares", "Reps"], centrar_columnas=(0, 4),
+        )
+    return dict(
+        filas=[[fila[0], imagen or "", *fila[1:]] for fila, imagen in zip(filas, imagenes)],
+        proporciones=[0.07, 0.10, 0.26, 0.16, 0.29, 0.12],
+        cabecera=["#", "", "Ejercicio", "Categoría", "Grupos musculares", "Reps"], centrar_columnas=(0, 1, 5),
+    )
+
+
+class _Espacio:
+    def __init__(self, lienzo, alto):
+        self.lienzo = lienzo
+        self.alto = self.alto_primera_fila = alto
+
+    def dibujar(self):
+        self.lienzo.y -= self.alto
+
+
+class _Parrafo:
+    def __init__(self, lienzo, texto, tam=10, interlineado=13, enlace=None):
+        self.lienzo = lienzo
+        self.tam = tam
+        self.interlineado = interlineado
+        self.enlace = enlace
+        self.lineas = _partir(texto, lienzo.fuente, tam, ANCHO) or ("",)
+        self.alto = self.alto_primera_fila = len(self.lineas) * interlineado
+
+    def dibujar(self):
+        c = self.lienzo.c
+        c.setFillColor(COLOR_TEXTO)
+        c.setFont(self.lienzo.fuente, self.tam)
+        base = self.lienzo.y - self.tam
+        for linea in self.lineas:
+            c.drawString(MARGEN_IZQ, base, linea)
+            base -= self.interlineado
+        if self.enlace:
+            c.linkURL(self.enlace, (MARGEN_IZQ, self.lienzo.y - self.alto, MARGEN_IZQ + ANCHO, self.lienzo.y), relative=0)
+        self.lienzo.y -= self.alto
+
+
+class _CodigoQR:
+    def __init__(self, lienzo, valor, lado=1.6 * inch):
+        self.lienzo = lienzo
+        self.valor = valor
+        self.alto = self.alto_primera_fila = lado
+
+    def dibujar(self):
+        dibujar_qr(self.lienzo.c, self.valor, MARGEN_IZQ, self.lienzo.y - self.alto, self.alto)
+        self.lienzo.y -= self.alto
+
+
+class _Lienzo:
+    margen_inferior = MARGEN_INF
+
+    def __init__(self, c, fuente, negrita):
+        self.c = c
+        self.fuente = fuente
+        self.negrita = negrita
+        self.y = PAGINA_ALTO - MARGEN_SUP
+
+    def nueva_pagina(self):
+        self.c.showPage()
+        self.y = PAGINA_ALTO - MARGEN_SUP
+
+    def reservar(self, alto):
+        if self.y - alto < self.margen_inferior:
+            self.nueva_pagina()
+
+    def imagen(self, nombre, x, y, ancho, alto) -> bool:
+        datos = imagen_reducida(nombre, round(max(ancho, alto) / inch, 2))
+        if not datos:
+            return False
+        self.c.drawImage(ImageReader(io.BytesIO(datos)), x, y, width=ancho, height=alto, mask='auto')
+        return True
+
+    def bloque(self, titulo: str, contenidos: Sequence, icono: Optional[str], color_fondo: str):
+        total = ALTO_CABECERA_SECCION + ESPACIO_TRAS_CABECERA + sum(item.alto for item in contenidos)
+        if total <= ALTO_UTIL:
+            self.reservar(total)
+        else:
+            self.reservar(ALTO_CABECERA_SECCION + ESPACIO_TRAS_CABECERA + contenidos[0].alto_primera_fila)
+        c = self.c
+        y = self.y - ALTO_CABECERA_SECCION
+        c.setFillColor(colors.HexColor(color_fondo))
+        c.rect(MARGEN_IZQ, y, ANCHO, ALTO_CABECERA_SECCION, stroke=0, fill=1)
+        x_texto = MARGEN_IZQ + 10
+        if icono and self.imagen(icono, MARGEN_IZQ + 10, y + 5, 0.42 * inch, 0.42 * inch):
+            x_texto = MARGEN_IZQ + 10 + 0.5 * inch
+        c.setFillColor(colors.whitesmoke)
+        c.setFont(self.negrita, 15)
+        lineas = simpleSplit(titulo.upper(), self.negrita, 15, MARGEN_IZQ + ANCHO - 10 - x_texto)
+        base = y + ALTO_CABECERA_SECCION / 2 + 9 * (len(lineas) - 1) - 5
+        for linea in lineas:
+            c.drawString(x_texto, base, linea)
+            base -= 18
+        self.y = y - ESPACIO_TRAS_CABECERA
+        for item in contenidos:
+            item.dibujar()
+        self.y -= ESPACIO_TRAS_BLOQUE
+
+    def lista(self, textos: List[str]):
+        return _Tabla(
+            self, [["•", texto] for texto in textos], [0.18 * inch / ANCHO, 1 - 0.18 * inch / ANCHO],
+            negrita_columnas=(0,), relleno_h=2, relleno_v=1.5,
+        )
+
+
+def _dibujar_cabecera(lienzo: _Lienzo, enlace: str):
+    """Imagen de cabecera (o título) y datos del profesor, con el QR de ``enlace`` a la derecha."""
+    c, fuente, negrita = lienzo.c, lienzo.fuente, lienzo.negrita
+    # Cabecera con imagen o título
+    alto_encabezado = ANCHO * 0.28
+    if lienzo.imagen("encabezado", MARGEN_IZQ, lienzo.y - alto_encabezado, ANCHO, alto_encabezado):
+        lienzo.y -= alto_encabezado + 0.05 * inch
+    else:
+        c.setFillColor(colors.HexColor('#FF6B6B'))
+        c.setFont(negrita, 24)
+        c.drawCentredString(PAGINA_ANCHO / 2, lienzo.y - 24, "Entrenamiento CrossFit")
+        lienzo.y -= 24 + 10 + 0.05 * inch
+
+    # Autor
+    lado_icono = 0.9 * inch
+    x_autor = MARGEN_IZQ
+    if lienzo.imagen("profesor", MARGEN_IZQ, lienzo.y - lado_icono - 2, lado_icono, lado_icono):
+        x_autor = MARGEN_IZQ + 1.0 * inch
+        alto_autor = lado_icono + 4
+    else:
+        alto_autor = 30
+    # El QR del WOD va en la fila del profesor, así no añade una sección (ni una página) al final
+    ancho_leyenda = MARGEN_IZQ + ANCHO - LADO_QR_WOD - 0.1 * inch - x_autor
+    lineas_leyenda = _partir(f"{TEXTO_QR_WOD} {enlace}", fuente, 8, ancho_leyenda)
+    alto_texto = 26 + 0.06 * inch + 10 * len(lineas_leyenda)
+    alto_autor = max(alto_autor, alto_texto + 4, LADO_QR_WOD + 4)
+    dibujar_qr(c, enlace, MARGEN_IZQ + ANCHO - 4 - LADO_QR_WOD, lienzo.y - (alto_autor + LADO_QR_WOD) / 2, LADO_QR_WOD)
+    base = lienzo.y - (alto_autor - alto_texto) / 2 - 10
+    c.setFillColor(COLOR_TEXTO)
+    c.setFont(negrita, 10)
+    c.drawString(x_autor, base, PROFESOR_NOMBRE)
+    c.setFillColor(colors.HexColor('#475569'))
+    c.setFont(negrita, 9)
+    c.drawString(x_autor, base - 13, PROFESOR_EMAIL)
+    c.setFont(fuente, 8)
+    base -= 13 + 0.06 * inch + 10
+    arriba_leyenda = base + 8
+    for linea in lineas_leyenda:
+        c.drawString(x_autor, base, linea)
+        base -= 10
+    c.linkURL(enlace, (x_autor, base + 8, x_autor + ancho_leyenda, arriba_leyenda), relative=0)
+    lienzo.y -= alto_autor + 0.12 * inch
+
+
+def _dibujar_datos_alumno(lienzo: _Lienzo, nombre: str, grupo: str):
+    """Recuadro con nombre, grupo y fecha."""
+    c, fuente, negrita = lienzo.c, lienzo.fuente, lienzo.negrita
+    celdas = [("Nombre:", nombre), ("Grupo:", grupo), ("Fecha:", datetime.now().strftime('%d/%m/%Y'))]
+    anchos = [0.38 * ANCHO, 0.26 * ANCHO, 0.36 * ANCHO]
+    medidas = []
+    for (etiqueta, valor), ancho in zip(celdas, anchos):
+        ancho_etiqueta = c.stringWidth(etiqueta + " ", negrita, 10.5)
+        lineas = simpleSplit(str(valor), fuente, 10.5, ancho - 12 - ancho_etiqueta) or [""]
+        medidas.append((etiqueta, ancho_etiqueta, lineas))
+    alto_info = max(len(lineas) for _, _, lineas in medidas) * 13 + 8
+    y_info = lienzo.y - alto_info
+    c.setFillColor(colors.HexColor('#F7F9FC'))
+    c.setStrokeColor(colors.HexColor('#E0E4EC'))
+    c.setLineWidth(0.5)
+    c.rect(MARGEN_IZQ, y_info, ANCHO, alto_info, stroke=1, fill=1)
+    x = MARGEN_IZQ
+    for (etiqueta, ancho_etiqueta, lineas), ancho in zip(medidas, anchos):
+        base = lienzo.y - 4 - 10.5
+        c.setFillColor(COLOR_TEXTO)
+        c.setFont(negrita, 10.5)
+        c.drawString(x + 6, base, etiqueta)
+        c.setFont(fuente, 10.5)
+        for linea in lineas:
+            c.drawString(x + 6 + ancho_etiqueta, base, linea)
+            base -= 13
+        if x > MARGEN_IZQ:
+            c.setLineWidth(0.25)
+            c.line(x, y_info, x, lienzo.y)
+        x += ancho
+    lienzo.y = y_info - 0.1 * inch
+
+
+def _dibujar_logo_cc(c, y: float = 18):
+    """Logo Creative Commons en la esquina inferior de la página actual."""
+    datos_cc = imagen_reducida("creative_commons", 0.95)
+    if datos_cc:
+        lector = ImageReader(io.BytesIO(datos_cc))
+        ancho_img, alto_img = lector.getSize()
+        escala = min(0.95 * inch / ancho_img, 0.55 * inch / alto_img)
+        ancho_cc, alto_cc = ancho_img * escala, alto_img * escala
+        c.drawImage(lector, PAGINA_ANCHO - ancho_cc - 22, y, width=ancho_cc, height=alto_cc, mask='auto')
+
+
+def generar_pdf_rapido(spec: WorkoutSpec):
+    nombre, grupo, tipo_circuito, objetivo = spec.nombre, spec.grupo, spec.tipo, spec.objetivo
+    objetivo_info = spec.objetivo_info
+    plan_tabata = construir_tabata_plan(spec)
+    parametros = parametros_pdf(spec)
+    buffer = io.BytesIO()
+    c = canvas.Canvas(buffer, pagesize=A4)
+    contexto = contexto_render()
+    fuente, negrita = contexto.fuente, contexto.fuente_negrita
+    lienzo = _Lienzo(c, fuente, negrita)
+
+    _dibujar_cabecera(lienzo, enlace_spec(spec))
+    _dibujar_datos_alumno(lienzo, nombre, grupo)
+
+    # Tarjeta del WOD
+    info_wod = TIPOS_CIRCUITO[tipo_circuito]
+    ancho_texto = ANCHO - 1.05 * inch - 16
+    lineas_nombre = simpleSplit(info_wod['nombre'], negrita, 18, ancho_texto)
+    lineas_desc = simpleSplit(info_wod['descripcion'], fuente, 11, ancho_texto)
+    alto_texto = 12 + 21 * len(lineas_nombre) + 15 * len(lineas_desc)
+    alto_tarjeta = max(1.05 * inch, alto_texto) + 16
+    lienzo.reservar(alto_tarjeta)
+    y_tarjeta = lienzo.y - alto_tarjeta
+    c.setFillColor(colors.HexColor('#FFF4EE'))
+    c.setStrokeColor(colors.HexColor('#F5C9B5'))
+    c.setLineWidth(0.9)
+    c.rect(MARGEN_IZQ, y_tarjeta, ANCHO, alto_tarjeta, stroke=1, fill=1)
+    lienzo.imagen("target", MARGEN_IZQ + 8, y_tarjeta + (alto_tarjeta - 1.0 * inch) / 2, 1.0 * inch, 1.0 * inch)
+    x_texto = MARGEN_IZQ + 1.05 * inch + 8
+    base = y_tarjeta + (alto_tarjeta + alto_texto) / 2 - 9
+    morado = colors.HexColor('#B5179E')
+    c.setFillColor(morado)
+    c.setFont(fuente, 9)
+    c.drawString(x_texto, base, "WOD")
+    c.setFont(negrita, 18)
+    for linea in lineas_nombre:
+        base -= 21
+        c.drawString(x_texto, base, linea)
+    c.setFillColor(COLOR_TEXTO)
+    c.setFont(fuente, 11)
+    base -= 4
+    for linea in lineas_desc:
+        base -= 15
+        c.drawString(x_texto, base, linea)
+    lienzo.y = y_tarjeta - 0.16 * inch
+
+    lienzo.bloque("Notas importantes", [lienzo.lista(NOTAS_IMPORTANTES)], "notes", '#92400E')
+
+    if parametros:
+        tabla = _Tabla(
+            lienzo, [list(fila) for fila in parametros], [0.38, 0.62],
+            fondos=[colors.white, colors.HexColor('#F5F5F5')], rejilla=colors.HexColor('#D9DEE7'),
+            negrita_columnas=(0,),
+        )
+        lienzo.bloque("Parámetros configurados", [tabla], "settings", '#1F4172')
+
+    if objetivo and objetivo_info:
+        filas = [
+            ["Objetivo", objetivo],
+            ["Carga", objetivo_info['carga']],
+            ["Repeticiones", objetivo_info['reps']],
+            ["Series", objetivo_info['series']],
+            ["Descanso", objetivo_info['descanso']],
+            ["RIR", objetivo_info['rir']],
+        ]
+        tabla = _Tabla(
+            lienzo, filas, [0.34, 0.66], fondos=[colors.white, colors.HexColor('#FFF1DB')],
+            rejilla=colors.HexColor('#F4C7A1'), negrita_columnas=(0,),
+        )
+        lienzo.bloque("Objetivo del entrenamiento", [tabla], "summit", '#B42318')
+
+    if objetivo:
+        filas = [
+            [nombre_obj, datos['porcentaje'], datos['reps'], datos['series'], datos['descanso'], datos['rir']]
+            for nombre_obj, datos in ((n, OBJETIVOS_ENTRENAMIENTO[n]) for n in OBJETIVOS_ORDEN)
+        ]
+        tabla = _Tabla(
+            lienzo, filas, [0.22, 0.14, 0.14, 0.14, 0.2, 0.16],
+            cabecera=["Objetivo", "%1RM", "Reps", "Series", "Descanso", "RIR"],
+            fondo_cabecera=colors.HexColor('#1E293B'), fondos=[colors.white, colors.HexColor('#EEF2FF')],
+            rejilla=colors.HexColor('#CBD5F5'), centrar_columnas=(1, 2, 3, 4, 5),
+        )
+        lienzo.bloque("Tabla guía de objetivos", [tabla], "settings", '#0F172A')
+
+    if plan_tabata:
+        tabla = _Tabla(
+            lienzo, [list(fila) for fila in plan_tabata], [0.68, 0.32],
+            cabecera=["Ejercicio", 'Bloques (20" trabajo / 10" descanso)'],
+            fondo_cabecera=colors.HexColor('#FF6B6B'), fondos=[colors.white, colors.HexColor('#FFF2F2')],
+            rejilla=colors.HexColor('#F9DCDC'), centrar_columnas=(1,),
+        )
+        contenido = [
+            tabla,
+            _Espacio(lienzo, 0.08 * inch),
+            _Parrafo(lienzo, f"Escanea el código QR o usa este enlace: {TABATA_VIDEO_URL}", enlace=TABATA_VIDEO_URL),
+            _Espacio(lienzo, 0.06 * inch),
+            _CodigoQR(lienzo, TABATA_VIDEO_URL),
+        ]
+        lienzo.bloque("Plan Tabata", contenido, "timer", '#A02334')
+
+    filas = []
+    for idx, ej in enumerate(spec.ejercicios, 1):
+        filas.append([idx, ej.nombre, ej.categoria, ", ".join(ej.musculos), ej.reps_texto])
+    tabla = _Tabla(
+        lienzo, **_tabla_ejercicios(filas, spec.ejercicios),
+        fondo_cabecera=colors.HexColor('#4ECDC4'), fondos=[colors.white, colors.HexColor('#F2FFFC')],
+        rejilla=colors.HexColor('#B7E4DC'),
+    )
+    lienzo.bloque("Ejercicios del WOD", [tabla], "dumbbell", '#0F766E')
+
+    tabla = _Tabla(
+        lienzo, [[nivel['nivel'], nivel['descripcion']] for nivel in BORG_ESCALA], [0.34, 0.66],
+        cabecera=["Sensación", "Descripción"], fondo_cabecera=colors.HexColor('#E0E7FF'),
+        texto_cabecera=colors.HexColor('#1E1B4B'),
+        fondos_fila=[colors.HexColor(nivel['color']) for nivel in BORG_ESCALA],
+        rejilla=colors.HexColor('#E5E7EB'),
+    )
+    lienzo.bloque("Percepción subjetiva del esfuerzo (Escala de Borg)", [tabla], "notes", '#7C3AED')
+
+    beneficios_especificos = BENEFICIOS_WOD.get(
+        tipo_circuito,
+        BENEFICIOS_WOD.get(CIRCUITO_ENTRENAMIENTO_KEY, []),
+    )
+    if beneficios_especificos:
+        lienzo.bloque("Beneficios específicos del WOD", [lienzo.lista(beneficios_especificos)], "performance", '#2563EB')
+    lienzo.bloque("Otros beneficios", [lienzo.lista(BENEFICIOS_OTROS)], "wellbeing", '#4C1D95')
+
+    tabla = _Tabla(
+        lienzo,
+        [["Tiempo invertido / Rondas o repeticiones completadas"], [""], ["Observaciones"], [""]],
+        [1.0], fondos=[colors.HexColor('#F8FAFC')], rejilla=colors.HexColor('#E2E8F0'),
+        caja=colors.HexColor('#CBD5F5'), negrita_columnas=(0,),
+        altos_minimos=[None, 0.4 * inch, None, 1.1 * inch],
+    )
+    lienzo.bloque("Registro del entrenamiento", [tabla], "settings", '#0F172A')
+
+    lienzo.reservar(24)
+    c.setFillColor(COLOR_TEXTO)
+    c.setFont(negrita, 11)
+    c.drawCentredString(PAGINA_ANCHO / 2, lienzo.y - 11, "¡Disfruta de tu entrenamiento!")
+
+    _dibujar_logo_cc(c)
+
+    c.showPage()
+    c.save()
+    buffer.seek(0)
+    return buffer
+
+
+ALTO_REGISTRO_SESION = 0.62 * inch
+ALTO_PIE = 0.3 * inch
+
+
+class _LienzoPrograma(_Lienzo):
+    """Lienzo del programa: cada página termina con el pie compartido."""
+
+    margen_inferior = MARGEN_INF + ALTO_PIE
+
+    def nueva_pagina(self):
+        self.c.doForm("pie")
+        self.c.setFillColor(COLOR_TEXTO)
+        self.c.setFont(self.fuente, 8)
+        self.c.drawRightString(MARGEN_IZQ + ANCHO, MARGEN_INF + 2, f"Página {self.c.getPageNumber()}")
+        super().nueva_pagina()
+
+
+def _formularios_programa(lienzo: _Lienzo, titulo: str):
+    """Bloques fijos del programa como XObjects: se dibujan una vez y cada página o sesión los reutiliza."""
+    c = lienzo.c
+    c.beginForm("pie")
+    c.setStrokeColor(colors.HexColor('#CBD5F5'))
+    c.setLineWidth(0.5)
+    c.line(MARGEN_IZQ, MARGEN_INF + ALTO_PIE - 6, MARGEN_IZQ + ANCHO, MARGEN_INF + ALTO_PIE - 6)
+    c.setFillColor(colors.HexColor('#475569'))
+    c.setFont(lienzo.fuente, 8)
+    c.drawString(MARGEN_IZQ, MARGEN_INF + 2, f"{titulo} · {PROFESOR_NOMBRE}")
+    c.endForm()
+
+    c.beginForm("barra_sesion")
+    c.setFillColor(colors.HexColor('#0F766E'))
+    c.rect(MARGEN_IZQ, 0, ANCHO, ALTO_CABECERA_SECCION, stroke=0, fill=1)
+    lienzo.imagen("dumbbell", MARGEN_IZQ + 10, 5, 0.42 * inch, 0.42 * inch)
+    c.endForm()
+
+    c.beginForm("registro_sesion")
+    c.setFillColor(colors.HexColor('#F8FAFC'))
+    c.setStrokeColor(colors.HexColor('#CBD5F5'))
+    c.setLineWidth(0.5)
+    c.rect(MARGEN_IZQ, 0, ANCHO, ALTO_REGISTRO_SESION, stroke=1, fill=1)
+    c.setFillColor(COLOR_TEXTO)
+    c.setFont(lienzo.negrita, 9.5)
+    base = ALTO_REGISTRO_SESION - 15
+    for x, etiqueta in ((0, "Fecha:"), (0.3, "Rondas completadas:"), (0.66, "Esfuerzo (Borg):")):
+        c.drawString(MARGEN_IZQ + 6 + x * ANCHO, base, etiqueta)
+    c.drawString(MARGEN_IZQ + 6, base - 22, "Observaciones:")
+    c.endForm()
+
+
+class _TablaSesion:
+    """Tabla de ejercicios de las sesiones guardada como XObject; cada sesión solo escribe sus repeticiones."""
+
+    def __init__(self, lienzo: _Lienzo, nombre_formulario: str, ejercicios):
+        filas = [[idx, ej.nombre, ej.categoria, ", ".join(ej.musculos), ""] for idx, ej in enumerate(ejercicios, 1)]
+        self.lienzo = lienzo
+        self.nombre = nombre_formulario
+        self.tabla = _Tabla(
+            lienzo, **_tabla_ejercicios(filas, ejercicios),
+            fondo_cabecera=colors.HexColor('#4ECDC4'), fondos=[colors.white, colors.HexColor('#F2FFFC')],
+            rejilla=colors.HexColor('#B7E4DC'), tam=9, interlineado=11, relleno_v=3,
+        )
+        self.alto = self.alto_primera_fila = self.tabla.alto
+        self.repeticiones = ()
+        y_actual = lienzo.y
+        lienzo.y = self.alto
+        lienzo.c.beginForm(nombre_formulario)
+        self.tabla.dibujar(partir=False)
+        lienzo.c.endForm()
+        lienzo.y = y_actual
+
+    def dibujar(self):
+        c = self.lienzo.c
+        y = self.lienzo.y - self.alto
+        c.saveState()
+        c.translate(0, y)
+        c.doForm(self.nombre)
+        c.restoreState()
+        centro = MARGEN_IZQ + sum(self.tabla.anchos[:-1]) + self.tabla.anchos[-1] / 2
+        c.setFillColor(COLOR_TEXTO)
+        c.setFont(self.lienzo.fuente, 9)
+        arriba = self.lienzo.y - self.tabla.cabecera[1]
+        for texto, (_, alto) in zip(self.repeticiones, self.tabla.filas):
+            c.drawCentredString(centro, arriba - self.tabla.relleno_v - 9, texto)
+            arriba -= alto
+        self.lienzo.y = y
+
+
+def _dibujar_sesion(lienzo: _Lienzo, semana, sesion: int, sesiones: int, tabla: _TablaSesion):
+    c = lienzo.c
+    titulo = f"Semana {semana.semana} · Sesión {sesion}/{sesiones} — {semana.objetivo}"
+    if semana.descarga:
+        titulo += " (descarga)"
+    detalle = (
+        f"{semana.series} rondas · {semana.reps} repeticiones · {semana.carga}% del 1RM · "
+        f"Descanso {semana.descanso} · RIR {semana.rir}"
+    )
+    tabla.repeticiones = [ej.reps_texto for ej in semana.spec.ejercicios]
+    contenido = [_Parrafo(lienzo, detalle), _Espacio(lienzo, 0.06 * inch), tabla, _Espacio(lienzo, 0.06 * inch)]
+    lienzo.reservar(
+        ALTO_CABECERA_SECCION + ESPACIO_TRAS_CABECERA + sum(item.alto for item in contenido) + ALTO_REGISTRO_SESION
+    )
+    y = lienzo.y - ALTO_CABECERA_SECCION
+    c.saveState()
+    c.translate(0, y)
+    c.doForm("barra_sesion")
+    c.restoreState()
+    c.setFillColor(colors.whitesmoke)
+    c.setFont(lienzo.negrita, 13)
+    c.drawString(MARGEN_IZQ + 10 + 0.5 * inch, y + ALTO_CABECERA_SECCION / 2 - 4, titulo.upper())
+    lienzo.y = y - ESPACIO_TRAS_CABECERA
+    for item in contenido:
+        item.dibujar()
+    c.saveState()
+    c.translate(0, lienzo.y - ALTO_REGISTRO_SESION)
+    c.doForm("registro_sesion")
+    c.restoreState()
+    lienzo.y -= ALTO_REGISTRO_SESION + ESPACIO_TRAS_BLOQUE
+
+
+def generar_pdf_programa(spec: WorkoutSpec, programa: Sequence, sesiones: int):
+    """Programa de varias semanas en un único documento, dibujado en una sola pasada.
+
+    ``programa`` es la lista de :class:`crossfit.programa.SemanaPrograma`; cada
+    semana se repite ``sesiones`` veces con su propia hoja de registro.
+    """
+    buffer = io.BytesIO()
+    c = canvas.Canvas(buffer, pagesize=A4)
+    contexto = contexto_render()
+    fuente, negrita = contexto.fuente, contexto.fuente_negrita
+    lienzo = _LienzoPrograma(c, fuente, negrita)
+    titulo = f"Programa de {len(programa)} semanas · {spec.nombre} · {spec.grupo}"
+    c.setTitle(titulo)
+    _formularios_programa(lienzo, titulo)
+
+    # El QR abre el circuito base
+    _dibujar_cabecera(lienzo, enlace_spec(spec))
+    _dibujar_datos_alumno(lienzo, spec.nombre, spec.grupo)
+
+    filas = [
+        [semana.semana, semana.objetivo + (" (descarga)" if semana.descarga else ""), semana.series,
+         semana.reps, f"{semana.carga}%", semana.descanso, semana.rir]
+        for semana in programa
+    ]
+    tabla = _Tabla(
+        lienzo, filas, [0.1, 0.3, 0.1, 0.1, 0.12, 0.16, 0.12],
+        cabecera=["Semana", "Objetivo", "Rondas", "Reps", "%1RM", "Descanso", "RIR"],
+        fondo_cabecera=colors.HexColor('#1E293B'),
+        fondos_fila=[colors.HexColor('#FEF3C7') if semana.descarga else colors.white for semana in programa],
+        rejilla=colors.HexColor('#CBD5F5'), centrar_columnas=(0, 2, 3, 4, 5, 6), tam=9.5, interlineado=12,
+    )
+    explicacion = _Parrafo(
+        lienzo,
+        f"Haz {sesiones} sesión(es) por semana. Las repeticiones se aplican a los ejercicios por repeticiones; "
+        "los ejercicios por tiempo o distancia mantienen las del circuito. Las semanas de descarga (en amarillo) "
+        "bajan el volumen y la carga para recuperar.",
+        tam=9.5, interlineado=12,
+    )
+    lienzo.bloque(titulo, [tabla, _Espacio(lienzo, 0.08 * inch), explicacion], "summit", '#B42318')
+    lienzo.bloque("Notas importantes", [lienzo.lista(NOTAS_IMPORTANTES)], "notes", '#92400E')
+
+    # Todas las semanas tienen los mismos ejercicios; solo cambian las repeticiones.
+    tablas = {}
+    for semana in programa:
+        clave = tuple((ej.categoria, ej.nombre) for ej in semana.spec.ejercicios)
+        if clave not in tablas:
+            tablas[clave] = _TablaSesion(lienzo, f"ejercicios_{len(tablas)}", semana.spec.ejercicios)
+        for sesion in range(1, sesiones + 1):
+            _dibujar_sesion(lienzo, semana, sesion, sesiones, tablas[clave])
+
+    tabla = _Tabla(
+        lienzo, [[nivel['nivel'], nivel['descripcion']] for nivel in BORG_ESCALA], [0.34, 0.66],
+        cabecera=["Sensación", "Descripción"], fondo_cabecera=colors.HexColor('#E0E7FF'),
+        texto_cabecera=colors.HexColor('#1E1B4B'),
+        fondos_fila=[colors.HexColor(nivel['color']) for nivel in BORG_ESCALA],
+        rejilla=colors.HexColor('#E5E7EB'),
+    )
+    lienzo.bloque("Percepción subjetiva del esfuerzo (Escala de Borg)", [tabla], "notes", '#7C3AED')
+
+    # Encima del pie, para no tapar el número de página
+    lienzo.reservar(0.6 * inch)
+    _dibujar_logo_cc(c, lienzo.margen_inferior)
+    lienzo.nueva_pagina()
+    c.save()
+    buffer.seek(0)
+    return buffer
@@ -0,0 +1,136 @@
+"""Perfilado del coste de cada rerun del script de Streamlit.
+
+Se activa con la variable de entorno ``CROSSFIT_PERFIL=1`` o añadiendo ``?perfil=1`` a la URL.
+Para cada rerun registra el tiempo total, y por sección del script el tiempo, los
+elementos creados y los bytes de delta enviados al navegador. Si se define
+``CROSSFIT_PERFIL_ARCHIVO`` los registros se añaden a ese archivo en formato JSON Lines.
+"""
+
+import json
+import os
+import threading
+import time
+from collections import deque
+
+import streamlit as st
+from streamlit.runtime.scriptrunner import get_script_run_ctx
+
+VARIABLE_ACTIVACION = "CROSSFIT_PERFIL"
+VARIABLE_ARCHIVO = "CROSSFIT_PERFIL_ARCHIVO"
+PARAMETRO_URL = "perfil"
+CLAVE_SESION = "_perfil_reruns"
+RERUNS_POR_SESION = 20
+
+# Últimos reruns de todas las sesiones del proceso.
+historial_proceso = deque(maxlen=500)
+_bloqueo_archivo = threading.Lock()
+
+
+def perfil_activado() -> bool:
+    if os.environ.get(VARIABLE_ACTIVACION, "").lower() in ("1", "true", "si", "sí"):
+        return True
+    return st.query_params.get(PARAMETRO_URL, "") in ("1", "true")
+
+
+class PerfiladorInactivo:
+    activo = False
+
+    def seccion(self, nombre: str):
+        pass
+
+    def finalizar(self):
+        return None
+
+
+class PerfiladorRerun:
+    """Intercepta los mensajes que el rerun envía al navegador y los reparte por secciones."""
+
+    activo = True
+
+    def __init__(self, ctx):
+        self._ctx = ctx
+        anterior = getattr(ctx._enqueue, "__self__", None)
+        # Si un rerun anterior se interrumpió, su envoltorio sigue instalado.
+        self._enqueue_original = anterior._enqueue_original if isinstance(anterior, PerfiladorRerun) else ctx._enqueue
+        self._inicio = time.perf_counter()
+        self._secciones = {}
+        self._actual = None
+        self._inicio_seccion = self._inicio
+        ctx._enqueue = self._registrar
+        self.seccion("inicio")
+
+    def _registrar(self, msg):
+        if msg.HasField("delta"):
+            datos = self._actual
+            if msg.delta.HasField("new_element"):
+                datos["elementos"] += 1
+            elif msg.delta.HasField("add_block"):
+                datos["bloques"] += 1
+            datos["bytes"] += msg.ByteSize()
+        self._enqueue_original(msg)
+
+    def _cerrar_seccion(self, ahora: float):
+        if self._actual is not None:
+            self._actual["segundos"] += ahora - self._inicio_seccion
+        self._inicio_seccion = ahora
+
+    def seccion(self, nombre: str):
+        """Marca el comienzo de una sección; dura hasta la siguiente marca."""
+        self._cerrar_seccion(time.perf_counter())
+        self._actual = self._secciones.setdefault(
+            nombre, {"seccion": nombre, "segundos": 0.0, "elementos": 0, "bloques": 0, "bytes": 0}
+        )
+
+    def finalizar(self) -> dict:
+        ahora = time.perf_counter()
+        self._cerrar_seccion(ahora)
+        self._ctx._enqueue = self._enqueue_original
+        secciones = list(self._secciones.values())
+        registro = {
+            "instante": time.time(),
+            "sesion": self._ctx.session_id,
+            "segundos": ahora - self._inicio,
+            "elementos": sum(s["elementos"] for s in secciones),
+            "bloques": sum(s["bloques"] for s in secciones),
+            "bytes": sum(s["bytes"] for s in secciones),
+            "secciones": secciones,
+        }
+        historial_proceso.append(registro)
+        historial_sesion = st.session_state.setdefault(CLAVE_SESION, [])
+        historial_sesion.append(registro)
+        del historial_sesion[:-RERUNS_POR_SESION]
+        archivo = os.environ.get(VARIABLE_ARCHIVO)
+        if archivo:
+            linea = json.dumps(registro, ensure_ascii=False)
+            with _bloqueo_archivo, open(archivo, "a", encoding="utf-8") as fh:
+                fh.write(linea + "\n")
+        return registro
+
+
+def iniciar_perfil():
+    ctx = get_script_run_ctx()
+    if ctx is None or not perfil_activado():
+        return PerfiladorInactivo()
+    return PerfiladorRerun(ctx)
+
+
+def mostrar_informe(registro: dict):
+    """Muestra en la barra lateral el coste del rerun actual y la media de la sesión."""
+    historial = st.session_state.get(CLAVE_SESION, [])
+    with st.sidebar.expander("⏱️ Perfil del rerun", expanded=True):
+        st.caption(
+            f"Rerun: {1000 * registro['segundos']:.1f} ms · {registro['elementos']} elementos · "
+            f"{registro['bytes'] / 1024:.1f} KiB de delta"
+        )
+        st.table([
+            {
+                "Sección": s["seccion"],
+                "ms": round(1000 * s["segundos"], 1),
+                "Elementos": s["elementos"] + s["bloques"],
+                "KiB": round(s["bytes"] / 1024, 1),
+            }
+            for s in sorted(registro["secciones"], key=lambda s: s["segundos"], reverse=True)
+        ])
+        if len(historial) > 1:
+            media = sum(r["segundos"] for r in historial) / len(historial)
+            st.caption(f"Media de los últimos {len(historial)} reruns de la sesión: {1000 * media:.1f} ms")
@@ -0,0 +1,102 @@
+"""Programas de varias semanas a partir de un circuito de entrenamiento.
+
+Cada semana fija series, repeticiones, carga (%1RM) y RIR dentro de los rangos
+del objetivo (los de :data:`crossfit.datos.OBJETIVOS_ENTRENAMIENTO`): las
+repeticiones y el RIR bajan del máximo al mínimo mientras la carga y las series
+suben. Cada ``DESCARGA_CADA`` semanas hay una semana de descarga con el volumen
+y la carga mínimos. Con periodización lineal las semanas se reparten entre
+Fuerza-Resistencia, Hipertrofia y Fuerza Máxima, en ese orden.
+"""
+
+from functools import lru_cache
+from typing import List, NamedTuple, Optional, Sequence
+
+from crossfit.cache import memorizar
+from crossfit.catalogo import catalogo_actual
+from crossfit.datos import OBJETIVOS_ENTRENAMIENTO, extraer_rango_numerico, valor_intermedio
+from crossfit.pdf_rapido import generar_pdf_programa
+from crossfit.spec import EjercicioSpec, WorkoutSpec
+
+MAX_SEMANAS = 16
+MAX_SESIONES_SEMANA = 5
+DESCARGA_CADA = 4
+FASES_LINEALES = ("Fuerza-Resistencia", "Hipertrofia", "Fuerza Máxima")
+# Se repiten con sus repeticiones del formulario (tiempo o distancia)
+REPS_FIJAS = {"Shuttle Run"}
+
+
+class SemanaPrograma(NamedTuple):
+    semana: int
+    objetivo: str
+    descarga: bool
+    series: int
+    reps: int
+    carga: int
+    rir: int
+    descanso: str
+    spec: WorkoutSpec
+
+
+def _interpolar(inicio: int, fin: int, avance: float) -> int:
+    return int(round(inicio + (fin - inicio) * avance))
+
+
+def _repartir(semanas: int, fases: Sequence[str]) -> List[str]:
+    """Objetivo de cada semana; las primeras fases se quedan con las semanas sobrantes."""
+    base, resto = divmod(semanas, len(fases))
+    objetivos = []
+    for indice, fase in enumerate(fases):
+        objetivos += [fase] * (base + (indice < resto))
+    return objetivos
+
+
+def _ejercicios(spec: WorkoutSpec, reps: int):
+    return tuple(
+        ejercicio if not isinstance(ejercicio.repeticiones, int) or ejercicio.nombre in REPS_FIJAS
+        else EjercicioSpec(ejercicio.categoria, ejercicio.nombre, reps)
+        for ejercicio in spec.ejercicios
+    )
+
+
+def generar_programa(spec: WorkoutSpec, semanas: int, fases: Optional[Sequence[str]] = None) -> List[SemanaPrograma]:
+    """Progresión semanal del circuito ``spec``.
+
+    Sin ``fases`` todo el programa progresa dentro del objetivo del propio spec.
+    """
+    semanas = max(1, min(MAX_SEMANAS, int(semanas)))
+    fases = list(fases or [spec.objetivo or FASES_LINEALES[1]])
+    objetivos = _repartir(semanas, fases[:semanas])
+    programa = []
+    for fase in dict.fromkeys(objetivos):
+        info = OBJETIVOS_ENTRENAMIENTO[fase]
+        reps_min, reps_max = extraer_rango_numerico(info["reps"], 8, 15)
+        series_min, series_max = extraer_rango_numerico(info["series"], 3, 5)
+        carga_min, carga_max = extraer_rango_numerico(info["porcentaje"], 50, 70)
+        rir_min, rir_max = extraer_rango_numerico(info["rir"], 1, 3)
+        numeros = [indice + 1 for indice, objetivo in enumerate(objetivos) if objetivo == fase]
+        cargadas = [numero for numero in numeros if numero % DESCARGA_CADA]
+        for numero in numeros:
+            descarga = numero not in cargadas
+            if descarga:
+                series, reps, carga, rir = series_min, valor_intermedio(reps_min, reps_max), carga_min, rir_max
+            else:
+                avance = cargadas.index(numero) / (len(cargadas) - 1) if len(cargadas) > 1 else 0.0
+                series = _interpolar(series_min, series_max, avance)
+                reps = _interpolar(reps_max, reps_min, avance)
+                carga = _interpolar(carga_min, carga_max, avance)
+                rir = _interpolar(rir_max, rir_min, avance)
+            programa.append(SemanaPrograma(
+                numero, fase, descarga, series, reps, carga, rir, info["descanso"],
+                spec.reemplazar(ejercicios=_ejercicios(spec, reps), rondas=series, objetivo=fase),
+            ))
+    return programa
+
+
+@lru_cache(maxsize=16)
+def pdf_programa(spec: WorkoutSpec, semanas: int, sesiones: int, lineal: bool, dia: str) -> bytes:
+    """PDF del programa cacheado entre reruns y réplicas (``dia`` invalida la fecha impresa)."""
+    def generar() -> bytes:
+        programa = generar_programa(spec, semanas, FASES_LINEALES if lineal else None)
+        return generar_pdf_programa(spec, programa, sesiones).getvalue()
+
+    return memorizar("programa", (spec.huella(), catalogo_actual().huella, semanas, sesiones, lineal, dia), generar)
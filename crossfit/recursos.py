@@ -0,0 +1,479 @@
+"""Recursos gráficos y tipográficos compartidos por la interfaz y los PDFs."""
+
+import base64
+import hashlib
+import io
+from functools import lru_cache
+from itertools import groupby
+from pathlib import Path
+from typing import NamedTuple, Tuple
+
+try:
+    from PIL import Image, ImageDraw, ImageOps
+except ImportError:  # pragma: no cover - entorno sin Pillow
+    Image = ImageDraw = ImageOps = None
+
+from reportlab.graphics.barcode import qr
+from reportlab.lib import colors
+from reportlab.lib.units import inch
+from reportlab.pdfbase import pdfmetrics
+from reportlab.pdfbase.ttfonts import TTFont
+from reportlab.platypus import Flowable
+
+from crossfit.cache import memorizar
+
+BASE_DIR = Path(__file__).resolve().parent.parent
+ICONO_PROFESOR = BASE_DIR / "iconoentrena.jpg"
+ENCABEZADO_IMG = BASE_DIR / "encabezado.jpeg"
+CC_LOGO_PATH = BASE_DIR / "cc.png"
+EMOJI_FONT_PATH = Path("C:/Windows/Fonts/seguiemj.ttf")
+EMOJI_FONT_REGULAR_NAME = "SegoeUIEmoji"
+EMOJI_FONT_BOLD_NAME = "SegoeUIEmoji-Bold"
+DEFAULT_FONT_REGULAR = "Helvetica"
+DEFAULT_FONT_BOLD = "Helvetica-Bold"
+PROFESOR_NOMBRE = "Profesor Víctor Manuel Marcos Muñoz"
+PROFESOR_EMAIL = "victorm.marmun@educa.jcyl.es"
+# El QR del WOD va junto a los datos del profesor, del mismo lado que su foto
+LADO_QR_WOD = 0.9 * inch
+ICONOS_DECORATIVOS = (
+    "target", "strength", "notes", "settings", "timer", "movement",
+    "performance", "wellbeing", "dumbbell", "lifter", "summit", "creative_commons",
+)
+# Margen en blanco alrededor del QR, en módulos (el de QrCodeWidget)
+MARGEN_QR = 4
+
+
+@lru_cache(maxsize=1)
+def registrar_fuente_emoji() -> bool:
+    if not EMOJI_FONT_PATH.exists():
+        return False
+    try:
+        pdfmetrics.registerFont(TTFont(EMOJI_FONT_REGULAR_NAME, str(EMOJI_FONT_PATH)))
+        pdfmetrics.registerFont(TTFont(EMOJI_FONT_BOLD_NAME, str(EMOJI_FONT_PATH)))
+        return True
+    except Exception:
+        return False
+
+
+def obtener_fuentes_para_pdf():
+    if registrar_fuente_emoji():
+        return EMOJI_FONT_REGULAR_NAME, EMOJI_FONT_BOLD_NAME
+    return DEFAULT_FONT_REGULAR, DEFAULT_FONT_BOLD
+
+
+@lru_cache(maxsize=1)
+def obtener_icono_data_uri():
+    if not ICONO_PROFESOR.exists():
+        return None
+    mime = "image/png" if ICONO_PROFESOR.suffix.lower() == ".png" else "image/jpeg"
+    encoded = base64.b64encode(ICONO_PROFESOR.read_bytes()).decode()
+    return f"data:{mime};base64,{encoded}"
+
+
+@lru_cache(maxsize=1)
+def obtener_icono_profesor_pdf_bytes():
+    if not ICONO_PROFESOR.exists() or Image is None or ImageDraw is None or ImageOps is None:
+        return None
+    original = ICONO_PROFESOR.read_bytes()
+    return memorizar("imagen", ("profesor", hashlib.sha256(original).hexdigest()), lambda: _icono_profesor(original))
+
+
+def _icono_profesor(original: bytes):
+    try:
+        with Image.open(io.BytesIO(original)) as img:
+            side = 480
+            square = ImageOps.fit(img.convert("RGBA"), (side, side))
+            mask = Image.new("L", (side, side), 0)
+            ImageDraw.Draw(mask).ellipse((0, 0, side, side), fill=255)
+            circular = Image.new("RGBA", (side, side), (255, 255, 255, 0))
+            circular.paste(square, (0, 0), mask=mask)
+
+            border_size = side + 48
+            output_image = Image.new("RGBA", (border_size, border_size), (255, 255, 255, 0))
+            ImageDraw.Draw(output_image).ellipse((0, 0, border_size, border_size), fill=(255, 255, 255, 255))
+            output_image.paste(circular, (24, 24), mask=circular)
+            ImageDraw.Draw(output_image).ellipse(
+                (6, 6, border_size - 6, border_size - 6),
+                outline=(255, 107, 107, 255),
+                width=10,
+            )
+
+            buffer = io.BytesIO()
+            output_image.save(buffer, format="PNG")
+            return buffer.getvalue()
+    except Exception:
+        return None
+
+
+@lru_cache(maxsize=8)
+def generar_icono_decorativo(tipo: str):
+    return memorizar("icono", (tipo,), lambda: _dibujar_icono_decorativo(tipo))
+
+
+def _dibujar_icono_decorativo(tipo: str):
+    if Image is None or ImageDraw is None:
+        return None
+
+    size = 512
+    img = Image.new("RGBA", (size, size), (255, 255, 255, 0))
+    draw = ImageDraw.Draw(img)
+    center = size / 2
+
+    def rounded_rect(coords, radius, fill, outline=None, width=1):
+        rounded = getattr(draw, "rounded_rectangle", None)
+        if callable(rounded):
+            rounded(coords, radius=radius, fill=fill, outline=outline, width=width)
+        else:
+            draw.rectangle(coords, fill=fill, outline=outline, width=width)
+
+    def draw_target():
+        palette = [
+            ((255, 107, 107, 255), 0.48),
+            ((255, 255, 255, 255), 0.32),
+            ((78, 205, 196, 255), 0.19),
+        ]
+        for color, ratio in palette:
+            radius = size * ratio
+            draw.ellipse(
+                (center - radius, center - radius, center + radius, center + radius),
+                fill=color,
+            )
+        draw.ellipse(
+            (center - size * 0.06, center - size * 0.06, center + size * 0.06, center + size * 0.06),
+            fill=(26, 83, 92, 255),
+        )
+
+    def draw_strength():
+        base_color = (244, 162, 97, 255)
+        shade = (231, 111, 81, 255)
+        highlight = (255, 224, 210, 255)
+        draw.ellipse((0, 0, size, size), fill=(255, 255, 255, 60))
+        draw.pieslice(
+            (size * 0.02, size * 0.2, size * 0.98, size * 1.05),
+            210,
+            330,
+            fill=base_color,
+            outline=shade,
+            width=10,
+        )
+        draw.ellipse(
+            (size * 0.45, size * 0.05, size * 0.85, size * 0.42),
+            fill=base_color,
+            outline=shade,
+            width=8,
+        )
+        draw.rectangle(
+            (size * 0.58, size * 0.58, size * 0.92, size * 0.82),
+            fill=shade,
+        )
+        draw.ellipse(
+            (size * 0.82, size * 0.62, size * 1.02, size * 0.92),
+            fill=shade,
+        )
+        draw.arc(
+            (size * 0.18, size * 0.25, size * 0.88, size * 0.95),
+            220,
+            330,
+            fill=highlight,
+            width=6,
+        )
+
+    def draw_notes():
+        bg_color = (255, 248, 224, 255)
+        border_color = (244, 162, 97, 255)
+        clip_color = (255, 107, 107, 255)
+        rounded_rect(
+            (size * 0.15, size * 0.15, size * 0.85, size * 0.9),
+            radius=60,
+            fill=bg_color,
+            outline=border_color,
+            width=8,
+        )
+        draw.rectangle(
+            (size * 0.35, size * 0.05, size * 0.65, size * 0.2),
+            fill=clip_color,
+        )
+        for idx, y in enumerate([0.3, 0.45, 0.6, 0.75]):
+            draw.line(
+                (size * 0.22, size * y, size * 0.78, size * y),
+                fill=(80, 82, 92, 255),
+                width=10,
+            )
+            draw.ellipse(
+                (size * 0.22, size * y - 12, size * 0.24, size * y + 12),
+                fill=(255, 214, 10, 255),
+            )
+
+    def draw_settings():
+        track_color = (224, 232, 255, 255)
+        knob_color = (78, 205, 196, 255)
+        draw.ellipse((0, 0, size, size), fill=(247, 249, 255, 255))
+        for idx, y in enumerate([0.35, 0.52, 0.69]):
+            draw.line(
+                (size * 0.2, size * y, size * 0.8, size * y),
+                fill=track_color,
+                width=28,
+            )
+            knob_x = 0.3 + idx * 0.2
+            draw.ellipse(
+                (size * knob_x, size * y - 40, size * (knob_x + 0.12), size * y + 40),
+                fill=knob_color if idx % 2 == 0 else (255, 107, 107, 255),
+                outline=(255, 255, 255, 255),
+                width=6,
+            )
+
+    def draw_timer():
+        body_color = (255, 238, 221, 255)
+        ring = (255, 107, 107, 255)
+        hand = (29, 53, 87, 255)
+        draw.ellipse((size * 0.08, size * 0.12, size * 0.92, size * 0.96), fill=body_color, outline=ring, width=14)
+        draw.rectangle((size * 0.38, 0, size * 0.62, size * 0.18), fill=ring)
+        draw.rectangle((size * 0.25, size * 0.05, size * 0.38, size * 0.18), fill=(29, 53, 87, 255))
+        draw.rectangle((size * 0.62, size * 0.05, size * 0.75, size * 0.18), fill=(29, 53, 87, 255))
+        draw.ellipse((size * 0.32, size * 0.36, size * 0.68, size * 0.72), outline=ring, width=10)
+        draw.line((center, size * 0.38, center, size * 0.62), fill=hand, width=16)
+        draw.line((center, size * 0.38, size * 0.65, size * 0.3), fill=hand, width=16)
+
+    def draw_movement():
+        bg_color = (236, 253, 245, 255)
+        accent = (16, 185, 129, 255)
+        secondary = (5, 150, 105, 255)
+        draw.ellipse((0, 0, size, size), fill=bg_color)
+        draw.arc((size * 0.2, size * 0.2, size * 0.9, size * 0.9), 200, 320, fill=accent, width=18)
+        draw.ellipse((size * 0.52, size * 0.18, size * 0.7, size * 0.36), fill=secondary)
+        draw.line((size * 0.6, size * 0.34, size * 0.48, size * 0.55), fill=secondary, width=30)
+        draw.line((size * 0.48, size * 0.55, size * 0.66, size * 0.72), fill=accent, width=28)
+        draw.line((size * 0.52, size * 0.45, size * 0.66, size * 0.52), fill=accent, width=26)
+        draw.line((size * 0.52, size * 0.45, size * 0.4, size * 0.3), fill=accent, width=20)
+
+    def draw_performance():
+        base = (255, 251, 235, 255)
+        ribbon = (249, 115, 22, 255)
+        medal = (247, 224, 138, 255)
+        star = (251, 191, 36, 255)
+        draw.ellipse((0, 0, size, size), fill=base)
+        draw.polygon(
+            [
+                (size * 0.4, size * 0.05),
+                (size * 0.5, size * 0.28),
+                (size * 0.6, size * 0.05),
+                (size * 0.74, size * 0.05),
+                (size * 0.55, size * 0.45),
+                (size * 0.45, size * 0.45),
+                (size * 0.26, size * 0.05),
+            ],
+            fill=ribbon,
+        )
+        draw.ellipse((size * 0.25, size * 0.32, size * 0.75, size * 0.82), fill=medal, outline=ribbon, width=12)
+        draw.polygon(
+            [
+                (center, size * 0.38),
+                (size * 0.43, size * 0.58),
+                (size * 0.28, size * 0.6),
+                (size * 0.4, size * 0.72),
+                (size * 0.36, size * 0.88),
+                (center, size * 0.8),
+                (size * 0.64, size * 0.88),
+                (size * 0.6, size * 0.72),
+                (size * 0.72, size * 0.6),
+                (size * 0.57, size * 0.58),
+            ],
+            fill=star,
+        )
+
+    def draw_wellbeing():
+        base = (237, 233, 254, 255)
+        heart = (244, 114, 182, 255)
+        brain = (99, 102, 241, 255)
+        draw.ellipse((0, 0, size, size), fill=base)
+        draw.ellipse((size * 0.22, size * 0.3, size * 0.48, size * 0.62), fill=brain)
+        draw.ellipse((size * 0.38, size * 0.32, size * 0.64, size * 0.64), fill=brain)
+        draw.rectangle((size * 0.38, size * 0.45, size * 0.64, size * 0.65), fill=brain)
+        draw.arc((size * 0.2, size * 0.5, size * 0.8, size * 0.9), 200, 340, fill=(165, 180, 252, 255), width=18)
+        heart_points = [
+            (size * 0.5, size * 0.8),
+            (size * 0.32, size * 0.62),
+            (size * 0.32, size * 0.48),
+            (size * 0.42, size * 0.4),
+            (size * 0.5, size * 0.48),
+            (size * 0.58, size * 0.4),
+            (size * 0.68, size * 0.48),
+            (size * 0.68, size * 0.62),
+        ]
+        draw.polygon(heart_points, fill=heart)
+
+    def draw_dumbbell():
+        bg = (249, 250, 255, 255)
+        plate = (31, 41, 55, 255)
+        plate_inner = (75, 85, 99, 255)
+        handle = (209, 213, 219, 255)
+        grip = (156, 163, 175, 255)
+        accent = (249, 115, 22, 255)
+        draw.ellipse((0, 0, size, size), fill=bg)
+        # left plates
+        rounded_rect((size * 0.12, size * 0.3, size * 0.24, size * 0.7), radius=60, fill=plate)
+        rounded_rect((size * 0.16, size * 0.34, size * 0.28, size * 0.66), radius=50, fill=plate_inner)
+        rounded_rect((size * 0.2, size * 0.38, size * 0.3, size * 0.62), radius=40, fill=accent)
+        # right plates
+        rounded_rect((size * 0.76, size * 0.3, size * 0.88, size * 0.7), radius=60, fill=plate)
+        rounded_rect((size * 0.72, size * 0.34, size * 0.84, size * 0.66), radius=50, fill=plate_inner)
+        rounded_rect((size * 0.7, size * 0.38, size * 0.8, size * 0.62), radius=40, fill=accent)
+        # handle
+        draw.rectangle((size * 0.28, size * 0.45, size * 0.72, size * 0.55), fill=handle)
+        draw.rectangle((size * 0.33, size * 0.45, size * 0.67, size * 0.55), fill=grip)
+        for idx in range(5):
+            x = size * (0.34 + idx * 0.07)
+            draw.line((x, size * 0.45, x, size * 0.55), fill=handle, width=6)
+
+    def draw_lifter():
+        bg = (255, 247, 237, 255)
+        body = (251, 146, 60, 255)
+        bar = (31, 41, 55, 255)
+        plates = (59, 130, 246, 255)
+        draw.ellipse((0, 0, size, size), fill=bg)
+        draw.line((size * 0.2, size * 0.28, size * 0.8, size * 0.28), fill=bar, width=24)
+        draw.rectangle((size * 0.18, size * 0.16, size * 0.24, size * 0.4), fill=plates)
+        draw.rectangle((size * 0.76, size * 0.16, size * 0.82, size * 0.4), fill=plates)
+        draw.ellipse((center - size * 0.08, size * 0.32, center + size * 0.08, size * 0.48), fill=body)
+        draw.line((center, size * 0.48, size * 0.74, size * 0.68), fill=body, width=26)
+        draw.line((center, size * 0.48, size * 0.26, size * 0.68), fill=body, width=26)
+        draw.line((size * 0.62, size * 0.84, size * 0.5, size * 0.62), fill=body, width=24)
+        draw.line((size * 0.38, size * 0.84, size * 0.5, size * 0.62), fill=body, width=24)
+        draw.ellipse((center - size * 0.07, size * 0.18, center + size * 0.07, size * 0.32), fill=(254, 215, 170, 255))
+        draw.arc((center - size * 0.05, size * 0.24, center + size * 0.05, size * 0.34), 200, -20, fill=bar, width=6)
+
+    def draw_summit():
+        sky = (224, 242, 255, 255)
+        mountain = (71, 85, 105, 255)
+        snow = (226, 232, 240, 255)
+        flagpole = (30, 41, 59, 255)
+        flag = (250, 82, 82, 255)
+        sun = (252, 211, 77, 255)
+        draw.ellipse((0, 0, size, size), fill=sky)
+        draw.ellipse((size * 0.68, size * 0.08, size * 0.9, size * 0.3), fill=sun)
+        draw.polygon(
+            [
+                (size * 0.15, size * 0.9),
+                (size * 0.38, size * 0.52),
+                (size * 0.52, size * 0.66),
+                (size * 0.68, size * 0.4),
+                (size * 0.88, size * 0.9),
+            ],
+            fill=mountain,
+        )
+        draw.polygon(
+            [
+                (size * 0.56, size * 0.45),
+                (size * 0.64, size * 0.32),
+                (size * 0.72, size * 0.52),
+            ],
+            fill=snow,
+        )
+        draw.rectangle((size * 0.64, size * 0.25, size * 0.66, size * 0.58), fill=flagpole)
+        draw.polygon(
+            [
+                (size * 0.66, size * 0.26),
+                (size * 0.82, size * 0.32),
+                (size * 0.66, size * 0.38),
+            ],
+            fill=flag,
+        )
+
+    def draw_creative_commons():
+        bg = (244, 247, 252, 255)
+        ring = (31, 41, 55, 255)
+        text_color = (31, 41, 55, 255)
+        accent = (255, 255, 255, 255)
+        draw.ellipse((0, 0, size, size), fill=bg)
+        draw.ellipse((size * 0.08, size * 0.08, size * 0.92, size * 0.92), outline=ring, width=28)
+        draw.ellipse((size * 0.18, size * 0.18, size * 0.82, size * 0.82), fill=ring)
+        draw.ellipse((size * 0.23, size * 0.23, size * 0.77, size * 0.77), fill=accent)
+        draw.ellipse((size * 0.32, size * 0.36, size * 0.45, size * 0.64), outline=ring, width=14)
+        draw.ellipse((size * 0.55, size * 0.36, size * 0.68, size * 0.64), outline=ring, width=14)
+        draw.arc((size * 0.26, size * 0.36, size * 0.74, size * 0.78), 210, 330, fill=ring, width=16)
+        draw.text((size * 0.37, size * 0.18), "CC", fill=text_color)
+
+    draw_funcs = {
+        "target": draw_target,
+        "strength": draw_strength,
+        "notes": draw_notes,
+        "settings": draw_settings,
+        "timer": draw_timer,
+        "movement": draw_movement,
+        "performance": draw_performance,
+        "wellbeing": draw_wellbeing,
+        "dumbbell": draw_dumbbell,
+        "lifter": draw_lifter,
+        "summit": draw_summit,
+        "creative_commons": draw_creative_commons,
+    }
+
+    painter = draw_funcs.get(tipo)
+    if painter is None:
+        return None
+
+    painter()
+    buffer = io.BytesIO()
+    img.save(buffer, format="PNG")
+    return buffer.getvalue()
+
+
+@lru_cache(maxsize=1)
+def obtener_logo_creative_commons():
+    if CC_LOGO_PATH.exists():
+        try:
+            return CC_LOGO_PATH.read_bytes()
+        except Exception:
+            pass
+    return generar_icono_decorativo('creative_commons')
+
+
+class ModulosQR(NamedTuple):
+    """Módulos oscuros de un código QR, agrupados en tramos horizontales ``(fila, columna, longitud)``."""
+    lado: int
+    tramos: Tuple[Tuple[int, int, int], ...]
+
+
+@lru_cache(maxsize=256)
+def modulos_qr(valor: str) -> ModulosQR:
+    """Se cachea por contenido; es inmutable, así que lo comparten los PDFs que se generan a la vez."""
+    codigo = qr.QrCodeWidget(valor, barLevel="L").qr
+    codigo.make()
+    tramos = []
+    for fila, modulos in enumerate(codigo.modules):
+        columna = 0
+        for oscuro, grupo in groupby(bool(modulo) for modulo in modulos):
+            longitud = len(list(grupo))
+            if oscuro:
+                tramos.append((fila, columna, longitud))
+            columna += longitud
+    return ModulosQR(codigo.getModuleCount(), tuple(tramos))
+
+
+def dibujar_qr(lienzo, valor: str, x: float, y: float, lado: float):
+    """Dibuja el QR de ``valor`` (con su margen de ``MARGEN_QR`` módulos) en un cuadrado de ``lado`` puntos."""
+    codigo = modulos_qr(valor)
+    caja = lado / (codigo.lado + 2 * MARGEN_QR)
+    lienzo.saveState()
+    lienzo.setFillColor(colors.black)
+    for fila, columna, longitud in codigo.tramos:
+        lienzo.rect(
+            x + (columna + MARGEN_QR) * caja, y + lado - (fila + MARGEN_QR + 1) * caja, longitud * caja, caja,
+            stroke=0, fill=1,
+        )
+    lienzo.restoreState()
+
+
+class CodigoQR(Flowable):
+    """QR de ``valor`` para platypus; cada PDF crea el suyo, los módulos se comparten."""
+
+    def __init__(self, valor: str, lado: float):
+        super().__init__()
+        self.valor = valor
+        self.width = self.height = lado
+
+    def wrap(self, ancho_disponible, alto_disponible):
+        return self.width, self.height
+
+    def draw(self):
+        dibujar_qr(self.canv, self.valor, 0, 0, self.width)
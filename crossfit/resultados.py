@@ -0,0 +1,295 @@
+"""Resultados de los alumnos y clasificaciones por grupo y WOD.
+
+Los resultados se guardan en la misma base de datos que el historial. Cada uno
+se reduce a una puntuación en la que más es mejor (rondas y repeticiones en
+AMRAP, tiempo cambiado de signo en AFAP…), así que todas las clasificaciones
+se ordenan igual. Cada clasificación (grupo + contenido del WOD) se mantiene en
+memoria como un montículo de los ``TOP_K`` mejores resultados, uno por alumno:
+añadir un resultado cuesta O(log k) (O(k) si un alumno mejora su marca) y
+mostrarla O(k log k), sin volver a ordenar todos los resultados en cada rerun. Si otro proceso escribe en la base
+de datos, solo se leen las filas nuevas (``id`` mayor que el último visto).
+
+Los resultados importados sin enlace no tienen contenido conocido: se guardan
+con :func:`contenido_de_tipo` y forman una clasificación por tipo de WOD, para
+no comparar puntuaciones de WODs distintos.
+"""
+
+import heapq
+import sqlite3
+import threading
+from collections import OrderedDict
+from datetime import datetime
+from typing import Dict, List, NamedTuple, Optional, Tuple
+
+import streamlit as st
+
+from crossfit.historial import Historial, clave_texto, historial
+from crossfit.spec import WorkoutSpec
+
+TOP_K = 10
+MAX_CLASIFICACIONES = 256
+# Las rondas de AMRAP pesan más que cualquier número de repeticiones sueltas
+BASE_RONDAS = 1000
+
+# Qué se anota en cada WOD
+MEDIDAS = {
+    "AMRAP": "rondas_reps",
+    "EMOM": "rondas",
+    "Tabata": "reps",
+    "Ladder": "tiempo",
+    "AFAP": "tiempo",
+    "Circuito de Entrenamiento": "tiempo",
+}
+
+_ESQUEMA = """
+CREATE TABLE IF NOT EXISTS resultados (
+    id INTEGER PRIMARY KEY,
+    creado TEXT NOT NULL,
+    nombre TEXT NOT NULL,
+    alumno TEXT NOT NULL,
+    grupo TEXT NOT NULL,
+    grupo_clave TEXT NOT NULL,
+    tipo TEXT NOT NULL,
+    contenido TEXT NOT NULL,
+    puntuacion REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS ix_resultados_clasificacion ON resultados (grupo_clave, contenido, id);
+CREATE INDEX IF NOT EXISTS ix_resultados_alumno ON resultados (alumno, grupo_clave, id);
+CREATE UNIQUE INDEX IF NOT EXISTS ux_resultados ON resultados (alumno, grupo_clave, contenido, tipo, creado, puntuacion);
+"""
+
+_COLUMNAS = "id, creado, nombre, alumno, tipo, puntuacion"
+
+
+def contenido_de_tipo(tipo: str) -> str:
+    """Contenido de los resultados de ``tipo`` cuyo WOD exacto no se conoce (no es una huella de contenido)."""
+    return f"tipo:{tipo}"
+
+
+class Resultado(NamedTuple):
+    id: int
+    creado: str
+    nombre: str
+    alumno: str
+    tipo: str
+    puntuacion: float
+
+    @property
+    def texto(self) -> str:
+        return texto_resultado(self.tipo, self.puntuacion)
+
+
+def puntuacion(tipo: str, rondas: int = 0, reps: int = 0, segundos: int = 0) -> float:
+    """Puntuación comparable (más es mejor) del resultado de un WOD."""
+    medida = MEDIDAS[tipo]
+    if medida == "rondas_reps":
+        return float(rondas * BASE_RONDAS + reps)
+    if medida == "rondas":
+        return float(rondas)
+    if medida == "reps":
+        return float(reps)
+    return -float(segundos)
+
+
+def texto_resultado(tipo: str, valor: float) -> str:
+    medida = MEDIDAS.get(tipo)
+    if medida == "rondas_reps":
+        rondas, reps = divmod(int(valor), BASE_RONDAS)
+        return f"{rondas} rondas + {reps} reps" if reps else f"{rondas} rondas"
+    if medida == "rondas":
+        return f"{int(valor)} rondas"
+    if medida == "reps":
+        return f"{int(valor)} reps"
+    minutos, segundos = divmod(int(-valor), 60)
+    return f"{minutos}:{segundos:02d}"
+
+
+class _Clasificacion:
+    """Los ``k`` mejores resultados de una clasificación, el mejor de cada alumno."""
+
+    def __init__(self, k: int):
+        self.k = k
+        # Montículo de mínimos: (puntuación, -id, resultado); el empate lo gana el resultado más antiguo.
+        self.monticulo: List[Tuple[float, int, Resultado]] = []
+        self.por_alumno: Dict[str, Tuple[float, int, Resultado]] = {}
+        self.ultimo_id = 0
+
+    def agregar(self, resultado: Resultado):
+        self.ultimo_id = max(self.ultimo_id, resultado.id)
+        entrada = (resultado.puntuacion, -resultado.id, resultado)
+        anterior = self.por_alumno.get(resultado.alumno)
+        if anterior is not None:
+            if entrada[:2] <= anterior[:2]:
+                return
+            # El alumno mejora su marca: se sustituye su entrada sin cambiar el tamaño.
+            self.monticulo[self.monticulo.index(anterior)] = entrada
+            heapq.heapify(self.monticulo)
+        elif len(self.monticulo) < self.k:
+            heapq.heappush(self.monticulo, entrada)
+        elif entrada[:2] > self.monticulo[0][:2]:
+            # El mínimo del montículo solo sube, así que un alumno expulsado
+            # nunca tenía una marca mejor que la que ahora lo haría volver.
+            expulsado = heapq.heapreplace(self.monticulo, entrada)
+            del self.por_alumno[expulsado[2].alumno]
+        else:
+            return
+        self.por_alumno[resultado.alumno] = entrada
+
+    def ordenada(self) -> List[Resultado]:
+        return [resultado for _, _, resultado in sorted(self.monticulo, key=lambda entrada: entrada[:2], reverse=True)]
+
+
+class Resultados:
+    def __init__(self, almacen: Historial, k: int = TOP_K):
+        self.almacen = almacen
+        self.k = k
+        self._bloqueo = threading.Lock()
+        self._preparada = False
+        self._clasificaciones: "OrderedDict[Tuple[str, str], _Clasificacion]" = OrderedDict()
+
+    @property
+    def activo(self) -> bool:
+        return self.almacen.activo
+
+    def _conexion(self) -> sqlite3.Connection:
+        conexion = self.almacen.conexion()
+        if not self._preparada:
+            with self._bloqueo:
+                if not self._preparada:
+                    conexion.executescript(_ESQUEMA)
+                    self._migrar(conexion)
+                    self._preparada = True
+        return conexion
+
+    @staticmethod
+    def _migrar(conexion: sqlite3.Connection):
+        """Pasa a su clasificación por tipo los resultados sin enlace que se importaron con contenido vacío."""
+        with conexion:
+            conexion.execute("UPDATE OR IGNORE resultados SET contenido = 'tipo:' || tipo WHERE contenido = ''")
+
+    def registrar(self, spec: WorkoutSpec, valor: float) -> Optional[int]:
+        """Guarda el resultado del alumno de ``spec``; la clasificación se actualiza en la próxima consulta."""
+        if not self.activo:
+            return None
+        conexion = self._conexion()
+        with conexion:
+            cursor = conexion.execute(
+                "INSERT INTO resultados (creado, nombre, alumno, grupo, grupo_clave, tipo, contenido, puntuacion)"
+                " VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                (
+                    datetime.now().strftime("%Y-%m-%d %H:%M:%S"), spec.nombre, clave_texto(spec.nombre),
+                    spec.grupo, clave_texto(spec.grupo), spec.tipo, spec.huella_contenido(), valor,
+                ),
+            )
+        return cursor.lastrowid
+
+    def registrar_lote(self, filas: List[tuple]) -> int:
+        """Inserta en una transacción filas ``(creado, nombre, alumno, grupo, grupo_clave, tipo, contenido,
+        puntuacion)``; las repetidas se ignoran. Devuelve cuántas se han insertado."""
+        if not self.activo or not filas:
+            return 0
+        conexion = self._conexion()
+        antes = conexion.total_changes
+        with conexion:
+            conexion.executemany(
+                "INSERT OR IGNORE INTO resultados"
+                " (creado, nombre, alumno, grupo, grupo_clave, tipo, contenido, puntuacion)"
+                " VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                filas,
+            )
+        return conexion.total_changes - antes
+
+    def clasificacion(self, grupo: str, contenido: str) -> List[Resultado]:
+        """Los mejores resultados del grupo en el WOD con esa huella de contenido, del primero al último."""
+        if not self.activo:
+            return []
+        clave = (clave_texto(grupo), contenido)
+        conexion = self._conexion()
+        with self._bloqueo:
+            tabla = self._clasificaciones.get(clave)
+            if tabla is None:
+                tabla = _Clasificacion(self.k)
+                self._clasificaciones[clave] = tabla
+                if len(self._clasificaciones) > MAX_CLASIFICACIONES:
+                    self._clasificaciones.popitem(last=False)
+            else:
+                self._clasificaciones.move_to_end(clave)
+            # La primera vez se leen todas las filas; después, solo las nuevas.
+            for fila in conexion.execute(
+                f"SELECT {_COLUMNAS} FROM resultados WHERE grupo_clave = ? AND contenido = ? AND id > ? ORDER BY id",
+                clave + (tabla.ultimo_id,),
+            ):
+                tabla.agregar(Resultado(*fila))
+            return tabla.ordenada()
+
+    def de_alumno(self, nombre: str, grupo: str, limite: int = 10) -> List[Resultado]:
+        """Últimos resultados del alumno, del más reciente al más antiguo."""
+        if not self.activo:
+            return []
+        filas = self._conexion().execute(
+            f"SELECT {_COLUMNAS} FROM resultados WHERE alumno = ? AND grupo_clave = ? ORDER BY id DESC LIMIT ?",
+            (clave_texto(nombre), clave_texto(grupo), limite),
+        ).fetchall()
+        return [Resultado(*fila) for fila in filas]
+
+
+resultados = Resultados(historial)
+
+
+def pedir_resultado(spec: WorkoutSpec) -> Optional[float]:
+    """Campos para anotar el resultado según el WOD; devuelve la puntuación al pulsar «Guardar»."""
+    medida = MEDIDAS.get(spec.tipo)
+    if medida is None:
+        return None
+    rondas = reps = segundos = 0
+    if medida == "rondas_reps":
+        col_rondas, col_reps = st.columns(2)
+        rondas = col_rondas.number_input("Rondas completas:", min_value=0, max_value=200, value=0)
+        reps = col_reps.number_input("Repeticiones extra:", min_value=0, max_value=BASE_RONDAS - 1, value=0)
+    elif medida == "rondas":
+        rondas = st.number_input("Minutos completados:", min_value=0, max_value=60, value=0)
+    elif medida == "reps":
+        reps = st.number_input("Repeticiones totales:", min_value=0, max_value=2000, value=0)
+    else:
+        col_minutos, col_segundos = st.columns(2)
+        minutos = col_minutos.number_input("Minutos:", min_value=0, max_value=180, value=0)
+        segundos = 60 * minutos + col_segundos.number_input("Segundos:", min_value=0, max_value=59, value=0)
+    if not st.button("Guardar resultado"):
+        return None
+    if rondas == reps == segundos == 0:
+        st.warning("Anota tu resultado antes de guardarlo.")
+        return None
+    return puntuacion(spec.tipo, rondas, reps, segundos)
+
+
+def mostrar_clasificacion(spec: WorkoutSpec):
+    """Formulario de resultado y clasificación del grupo en este WOD."""
+    try:
+        valor = pedir_resultado(spec)
+        if valor is not None:
+            resultados.registrar(spec, valor)
+            st.success(f"Resultado guardado: {texto_resultado(spec.tipo, valor)}")
+        clasificacion = resultados.clasificacion(spec.grupo, spec.huella_contenido())
+        propios = resultados.de_alumno(spec.nombre, spec.grupo, limite=5)
+    except sqlite3.Error as exc:
+        st.error(f"No se ha podido guardar o leer la clasificación: {exc}")
+        return
+    if propios:
+        st.caption("Tus últimos resultados: " + " · ".join(f"{r.creado[:10]} {r.tipo}: {r.texto}" for r in propios))
+    if not clasificacion:
+        st.caption("Nadie de tu grupo ha registrado todavía un resultado en este WOD. ¡Sé el primero!")
+        return
+    alumno = clave_texto(spec.nombre)
+    st.dataframe(
+        [
+            {
+                "Puesto": puesto,
+                "Alumno": ("⭐ " if resultado.alumno == alumno else "") + resultado.nombre,
+                "Resultado": resultado.texto,
+                "Fecha": resultado.creado[:10],
+            }
+            for puesto, resultado in enumerate(clasificacion, 1)
+        ],
+        hide_index=True,
+        use_container_width=True,
+    )
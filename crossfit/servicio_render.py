@@ -0,0 +1,341 @@
+"""Servicio local de renderizado de PDFs que pueden compartir varias réplicas de la interfaz.
+
+Uso:
+    python -m crossfit.servicio_render --puerto 8765 --procesos 4
+    python -m crossfit.servicio_render --socket /run/crossfit/render.sock
+
+``POST /pdf?motor=completo`` con la spec serializada (:meth:`WorkoutSpec.serializar`)
+en el cuerpo devuelve el PDF; ``GET /estado`` devuelve las estadísticas en JSON.
+Los PDFs se generan en un grupo de procesos propio, así que la capacidad de
+renderizado se escala aparte de la de la interfaz. Las peticiones idénticas
+que llegan mientras su PDF se está generando esperan a ese mismo resultado, y
+los PDFs terminados se guardan en la caché de artefactos (:mod:`crossfit.cache`).
+
+Las réplicas lo usan definiendo ``CROSSFIT_RENDER_URL`` (``http://host:puerto``
+o ``unix:///ruta/al/socket``); si el servicio no responde, generan el PDF ellas
+mismas.
+
+El catálogo de ejercicios se recarga en caliente en cada proceso. Cada petición
+lleva en ``?catalogo=`` la huella del catálogo de la réplica; el servicio y el
+proceso que genera el PDF fijan el suyo al empezar y, si no coincide, vuelven a
+leer el archivo. Si aun así no coincide (la réplica lee otro archivo o ya ha
+visto un cambio que aquí no ha llegado), se responde 409 y la réplica genera el
+PDF ella misma.
+"""
+
+import argparse
+import http.client
+import io
+import json
+import logging
+import multiprocessing
+import os
+import socket
+import socketserver
+import sys
+import threading
+import time
+from collections import Counter
+from concurrent.futures import Future, ProcessPoolExecutor, TimeoutError as FuturoTimeout
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Callable, Dict, List, Optional
+from urllib.parse import parse_qs, quote, urlparse
+
+from crossfit.cache import almacen
+from crossfit.catalogo import Catalogo, catalogo_actual, fijar_catalogo
+from crossfit.eventos import EVENTO_AGRUPADO, EVENTO_GENERADO, EVENTO_REUTILIZADO, campos_spec, eventos
+from crossfit.pdf import MOTORES_PDF, clave_pdf
+from crossfit.spec import SpecInvalida, WorkoutSpec
+
+VARIABLE_URL = "CROSSFIT_RENDER_URL"
+MOTOR_POR_DEFECTO = "completo"
+# Una spec serializada ocupa unos cientos de bytes
+MAX_CUERPO = 64 * 1024
+TIMEOUT_CLIENTE = 20.0
+
+logger = logging.getLogger(__name__)
+
+
+class CatalogoDistinto(Exception):
+    """El servicio no tiene el mismo catálogo de ejercicios que la réplica que pide el PDF."""
+
+
+def fijar_catalogo_de(huella: str) -> Catalogo:
+    """Fija en este hilo el catálogo vigente, releyendo el archivo si no es el de ``huella``."""
+    catalogo = fijar_catalogo()
+    if huella and catalogo.huella != huella:
+        catalogo = fijar_catalogo(forzar=True)
+        if catalogo.huella != huella:
+            raise CatalogoDistinto(f"catálogo {catalogo.huella}, se pidió {huella}")
+    return catalogo
+
+
+def _renderizar(motor: str, texto_spec: str, huella: str) -> bytes:
+    """Se ejecuta en los procesos del grupo, con el mismo catálogo que la petición."""
+    fijar_catalogo_de(huella)
+    return MOTORES_PDF[motor](WorkoutSpec.deserializar(texto_spec)).getvalue()
+
+
+def _calentar() -> int:
+    return os.getpid()
+
+
+class ServicioSaturado(Exception):
+    pass
+
+
+class Renderizador:
+    """Grupo de procesos con agrupación de peticiones idénticas en curso y caché de resultados."""
+
+    def __init__(self, procesos: int, max_en_curso: int = 64):
+        self.procesos = procesos
+        self.max_en_curso = max_en_curso
+        # spawn: los hilos del servidor no se heredan a medias en los procesos
+        self._grupo = ProcessPoolExecutor(procesos, mp_context=multiprocessing.get_context("spawn"))
+        self._en_curso: Dict[str, Future] = {}
+        self._bloqueo = threading.Lock()
+        self._contadores = Counter()
+
+    def calentar(self):
+        """Arranca los procesos (y sus importaciones) antes de la primera petición."""
+        for futuro in [self._grupo.submit(_calentar) for _ in range(self.procesos)]:
+            futuro.result()
+
+    def pdf(self, spec: WorkoutSpec, motor: str, timeout: float) -> bytes:
+        """PDF de ``spec`` con el catálogo fijado en este hilo (la clave y el proceso usan el mismo)."""
+        huella = catalogo_actual().huella
+        clave_artefacto = clave_pdf(spec, motor)
+        datos_evento = dict(motor=motor, origen="servicio", **campos_spec(spec))
+        datos = almacen.obtener(clave_artefacto)
+        if datos is not None:
+            self._contar("cache")
+            eventos.registrar(EVENTO_REUTILIZADO, bytes=len(datos), **datos_evento)
+            return datos
+        with self._bloqueo:
+            futuro = self._en_curso.get(clave_artefacto)
+            agrupada = futuro is not None
+            if agrupada:
+                self._contadores["agrupadas"] += 1
+            elif len(self._en_curso) >= self.max_en_curso:
+                self._contadores["rechazadas"] += 1
+                raise ServicioSaturado()
+            else:
+                self._contadores["renderizadas"] += 1
+                inicio = time.perf_counter()
+                futuro = self._en_curso[clave_artefacto] = self._grupo.submit(
+                    _renderizar, motor, spec.serializar(), huella
+                )
+                futuro.add_done_callback(lambda hecho: self._terminado(clave_artefacto, hecho, inicio, datos_evento))
+        if agrupada:
+            eventos.registrar(EVENTO_AGRUPADO, **datos_evento)
+        return futuro.result(timeout)
+
+    def _terminado(self, clave_artefacto: str, futuro: Future, inicio: float, datos_evento: dict):
+        try:
+            if not futuro.cancelled() and futuro.exception() is None:
+                pdf = futuro.result()
+                # Primero a la caché y después fuera de curso: quien llegue entretanto lo encuentra en uno de los dos.
+                almacen.guardar(clave_artefacto, pdf)
+                eventos.registrar(
+                    EVENTO_GENERADO, ms=round(1000 * (time.perf_counter() - inicio), 1), bytes=len(pdf), **datos_evento
+                )
+        finally:
+            with self._bloqueo:
+                self._en_curso.pop(clave_artefacto, None)
+
+    def _contar(self, evento: str):
+        with self._bloqueo:
+            self._contadores[evento] += 1
+
+    def estadisticas(self) -> dict:
+        with self._bloqueo:
+            return {
+                "procesos": self.procesos,
+                "en_curso": len(self._en_curso),
+                "renderizadas": self._contadores["renderizadas"],
+                "agrupadas": self._contadores["agrupadas"],
+                "cache": self._contadores["cache"],
+                "rechazadas": self._contadores["rechazadas"],
+                "almacen": almacen.estadisticas(),
+            }
+
+    def cerrar(self):
+        self._grupo.shutdown(cancel_futures=True)
+
+
+class _Manejador(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    server_version = "CrossFitRender/1"
+
+    def _responder(self, estado: int, cuerpo: bytes, tipo: str = "text/plain; charset=utf-8"):
+        self.send_response(estado)
+        self.send_header("Content-Type", tipo)
+        self.send_header("Content-Length", str(len(cuerpo)))
+        self.end_headers()
+        self.wfile.write(cuerpo)
+
+    def do_GET(self):
+        if urlparse(self.path).path != "/estado":
+            self._responder(404, b"No encontrado")
+            return
+        estado = self.server.renderizador.estadisticas()
+        self._responder(200, json.dumps(estado).encode("utf-8"), "application/json")
+
+    def do_POST(self):
+        partes = urlparse(self.path)
+        if partes.path != "/pdf":
+            self._responder(404, b"No encontrado")
+            return
+        parametros = parse_qs(partes.query)
+        motor = parametros.get("motor", [MOTOR_POR_DEFECTO])[0]
+        try:
+            longitud = int(self.headers.get("Content-Length", ""))
+        except ValueError:
+            self._responder(411, b"Falta Content-Length")
+            return
+        if longitud > MAX_CUERPO:
+            self.close_connection = True
+            self._responder(413, b"Spec demasiado grande")
+            return
+        texto = self.rfile.read(longitud).decode("utf-8", "replace")
+        if motor not in MOTORES_PDF:
+            self._responder(400, f"Motor desconocido: {motor}".encode("utf-8"))
+            return
+        try:
+            # La spec se valida con el catálogo de la réplica, no con uno anterior
+            fijar_catalogo_de(parametros.get("catalogo", [""])[0])
+            spec = WorkoutSpec.deserializar(texto)
+        except CatalogoDistinto as exc:
+            self._responder(409, f"Catalogo distinto: {exc}".encode("utf-8"))
+            return
+        except SpecInvalida as exc:
+            self._responder(400, str(exc).encode("utf-8"))
+            return
+        try:
+            pdf = self.server.renderizador.pdf(spec, motor, self.server.timeout_render)
+        except CatalogoDistinto as exc:
+            self._responder(409, f"Catalogo distinto: {exc}".encode("utf-8"))
+        except ServicioSaturado:
+            self._responder(503, b"Demasiados PDFs en curso")
+        except FuturoTimeout:
+            self._responder(504, b"La generacion ha tardado demasiado")
+        except Exception:
+            logger.exception("Error al generar el PDF de %s", spec)
+            self._responder(500, b"Error al generar el PDF")
+        else:
+            self._responder(200, pdf, "application/pdf")
+
+    def address_string(self):
+        # En un socket Unix no hay dirección del cliente
+        return self.client_address[0] if self.client_address else "unix"
+
+    def log_message(self, formato, *args):
+        logger.debug("%s %s", self.address_string(), formato % args)
+
+
+class _ServidorTCP(ThreadingHTTPServer):
+    daemon_threads = True
+
+
+class _ServidorUnix(socketserver.ThreadingMixIn, socketserver.UnixStreamServer):
+    daemon_threads = True
+
+
+def crear_servidor(renderizador: Renderizador, host: str = "127.0.0.1", puerto: int = 8765,
+                   ruta_socket: Optional[str] = None, timeout_render: float = 30.0):
+    if ruta_socket:
+        if os.path.exists(ruta_socket):
+            os.unlink(ruta_socket)
+        servidor = _ServidorUnix(ruta_socket, _Manejador)
+    else:
+        servidor = _ServidorTCP((host, puerto), _Manejador)
+    servidor.renderizador = renderizador
+    servidor.timeout_render = timeout_render
+    return servidor
+
+
+class ErrorRender(Exception):
+    pass
+
+
+class _ConexionUnix(http.client.HTTPConnection):
+    def __init__(self, ruta: str, timeout: float):
+        super().__init__("localhost", timeout=timeout)
+        self.ruta = ruta
+
+    def connect(self):
+        self.sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        self.sock.settimeout(self.timeout)
+        self.sock.connect(self.ruta)
+
+
+def renderizar_remoto(spec: WorkoutSpec, motor: str, url: str, timeout: float = TIMEOUT_CLIENTE) -> bytes:
+    """PDF generado por el servicio en ``url`` con el catálogo de este hilo; lanza :class:`ErrorRender` si no lo consigue."""
+    partes = urlparse(url)
+    if partes.scheme == "unix":
+        conexion = _ConexionUnix(partes.path, timeout)
+    else:
+        conexion = http.client.HTTPConnection(partes.hostname or "127.0.0.1", partes.port or 8765, timeout=timeout)
+    try:
+        ruta = f"/pdf?motor={quote(motor)}&catalogo={quote(catalogo_actual().huella)}"
+        conexion.request(
+            "POST", ruta, body=spec.serializar().encode("utf-8"), headers={"Content-Type": "application/json"},
+        )
+        respuesta = conexion.getresponse()
+        cuerpo = respuesta.read()
+    except (OSError, http.client.HTTPException) as exc:
+        raise ErrorRender(f"Servicio de renderizado no disponible: {exc}") from None
+    finally:
+        conexion.close()
+    if respuesta.status != 200:
+        raise ErrorRender(f"El servicio de renderizado respondió {respuesta.status}: {cuerpo[:200].decode('utf-8', 'replace')}")
+    return cuerpo
+
+
+def generador_pdf(motor: str, timeout: float = TIMEOUT_CLIENTE) -> Callable[[WorkoutSpec], io.BytesIO]:
+    """Función que genera el PDF con ``motor``: en el servicio si ``CROSSFIT_RENDER_URL`` está definida, si no en el proceso."""
+    local = MOTORES_PDF[motor]
+    url = os.environ.get(VARIABLE_URL, "").strip()
+    if not url:
+        return local
+
+    def remoto(spec: WorkoutSpec) -> io.BytesIO:
+        try:
+            return io.BytesIO(renderizar_remoto(spec, motor, url, timeout))
+        except ErrorRender as exc:
+            logger.warning("%s; se genera en este proceso", exc)
+            return local(spec)
+
+    return remoto
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--puerto", type=int, default=8765)
+    parser.add_argument("--socket", help="escucha en este socket Unix en lugar de TCP")
+    parser.add_argument("--procesos", type=int, default=os.cpu_count() or 2)
+    parser.add_argument("--max-en-curso", type=int, default=64, help="PDFs distintos generándose o en cola")
+    parser.add_argument("--timeout", type=float, default=30.0, help="segundos máximos por PDF")
+    args = parser.parse_args(argv)
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s %(levelname)s %(message)s")
+
+    renderizador = Renderizador(max(1, args.procesos), max(1, args.max_en_curso))
+    renderizador.calentar()
+    servidor = crear_servidor(renderizador, args.host, args.puerto, args.socket, args.timeout)
+    donde = args.socket or f"http://{args.host}:{servidor.server_address[1]}"
+    logger.info("Servicio de renderizado en %s con %d procesos", donde, renderizador.procesos)
+    try:
+        servidor.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        servidor.server_close()
+        renderizador.cerrar()
+        if args.socket and os.path.exists(args.socket):
+            os.unlink(args.socket)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
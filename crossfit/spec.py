@@ -0,0 +1,331 @@
+"""Modelo compacto e inmutable de un entrenamiento.
+
+``WorkoutSpec`` reúne todo lo que define un WOD (alumno, tipo, ejercicios y
+parámetros) en un objeto con ``__slots__`` que no se puede modificar. Tiene una
+serialización JSON canónica y compacta (para hashear, cachear, encolar y
+guardar) y los datos derivados (parámetros del PDF, plan Tabata, desglose
+Ladder) se calculan una sola vez por spec.
+"""
+
+import hashlib
+import json
+from functools import lru_cache
+from typing import Iterable, List, Optional, Tuple, Union
+
+import numpy as np
+
+from crossfit.cronograma import compilar
+from crossfit.datos import (
+    CIRCUITO_ENTRENAMIENTO_KEY,
+    EMOM_RECUPERACION_TEXTO,
+    MAX_EJERCICIOS_CIRCUITO,
+    MIN_EJERCICIOS_CIRCUITO,
+    OBJETIVOS_ENTRENAMIENTO,
+    TIPOS_CIRCUITO,
+    obtener_categorias_por_tipo,
+    obtener_musculos,
+)
+
+VERSION_SPEC = 1
+MAX_NOMBRE = 60
+MAX_GRUPO = 20
+TABATA_EJERCICIOS_VALIDOS = (1, 2, 4, 8)
+DIRECCIONES_LADDER = ("Creciente", "Decreciente")
+WODS_CON_DURACION = ("AMRAP", "EMOM")
+
+Repeticiones = Union[int, str, None]
+
+
+class SpecInvalida(ValueError):
+    def __init__(self, errores: List[str]):
+        self.errores = errores
+        super().__init__("; ".join(errores))
+
+
+class _Inmutable:
+    __slots__ = ()
+
+    def __setattr__(self, nombre, valor):
+        raise AttributeError(f"{type(self).__name__} es inmutable")
+
+    def __delattr__(self, nombre):
+        raise AttributeError(f"{type(self).__name__} es inmutable")
+
+    def _campos(self) -> tuple:
+        raise NotImplementedError
+
+    def __eq__(self, otro):
+        if type(otro) is not type(self):
+            return NotImplemented
+        return self._campos() == otro._campos()
+
+    def __hash__(self):
+        return hash(self._campos())
+
+    def __reduce__(self):
+        return (type(self), self._campos())
+
+
+class EjercicioSpec(_Inmutable):
+    __slots__ = ("categoria", "nombre", "repeticiones")
+
+    def __init__(self, categoria: str, nombre: str, repeticiones: Repeticiones = None):
+        if isinstance(repeticiones, float) and repeticiones.is_integer():
+            repeticiones = int(repeticiones)
+        object.__setattr__(self, "categoria", categoria)
+        object.__setattr__(self, "nombre", nombre)
+        object.__setattr__(self, "repeticiones", None if repeticiones == "" else repeticiones)
+
+    def _campos(self) -> tuple:
+        return (self.categoria, self.nombre, self.repeticiones)
+
+    def __repr__(self):
+        return f"EjercicioSpec({self.categoria!r}, {self.nombre!r}, {self.repeticiones!r})"
+
+    @property
+    def musculos(self) -> Tuple[str, ...]:
+        return obtener_musculos(self.nombre, self.categoria)
+
+    @property
+    def reps_texto(self) -> str:
+        return "-" if self.repeticiones is None else str(self.repeticiones)
+
+
+class WorkoutSpec(_Inmutable):
+    """Entrenamiento completo. Los parámetros que no aplican al tipo de WOD se descartan."""
+
+    __slots__ = (
+        "nombre", "grupo", "tipo", "ejercicios", "duracion", "rondas",
+        "incremento", "reps_inicio", "direccion", "objetivo", "_huella",
+    )
+
+    def __init__(
+        self,
+        nombre: str,
+        grupo: str,
+        tipo: str,
+        ejercicios: Iterable[EjercicioSpec],
+        duracion: Optional[int] = None,
+        rondas: Optional[int] = None,
+        incremento: Optional[int] = None,
+        reps_inicio: Optional[int] = None,
+        direccion: Optional[str] = None,
+        objetivo: Optional[str] = None,
+    ):
+        es_ladder = tipo == "Ladder"
+        usa_rondas = tipo not in WODS_CON_DURACION and tipo != "Tabata"
+        valores = {
+            "nombre": (nombre or "").strip(),
+            "grupo": (grupo or "").strip(),
+            "tipo": tipo,
+            "ejercicios": tuple(ejercicios),
+            "duracion": _entero(duracion) if tipo in WODS_CON_DURACION else None,
+            "rondas": _entero(rondas) if usa_rondas else None,
+            "incremento": _entero(incremento) if es_ladder else None,
+            "reps_inicio": _entero(reps_inicio) if es_ladder else None,
+            "direccion": (direccion or DIRECCIONES_LADDER[0]) if es_ladder else None,
+            "objetivo": objetivo if tipo == CIRCUITO_ENTRENAMIENTO_KEY else None,
+            "_huella": None,
+        }
+        for campo, valor in valores.items():
+            object.__setattr__(self, campo, valor)
+
+    def _campos(self) -> tuple:
+        return (
+            self.nombre, self.grupo, self.tipo, self.ejercicios, self.duracion, self.rondas,
+            self.incremento, self.reps_inicio, self.direccion, self.objetivo,
+        )
+
+    def __repr__(self):
+        return f"WorkoutSpec({self.serializar()})"
+
+    @property
+    def objetivo_info(self) -> dict:
+        return OBJETIVOS_ENTRENAMIENTO.get(self.objetivo, {}) if self.objetivo else {}
+
+    def reemplazar(self, **cambios) -> "WorkoutSpec":
+        campos = dict(zip(
+            ("nombre", "grupo", "tipo", "ejercicios", "duracion", "rondas",
+             "incremento", "reps_inicio", "direccion", "objetivo"),
+            self._campos(),
+        ))
+        campos.update(cambios)
+        return WorkoutSpec(**campos)
+
+    # Serialización canónica: claves cortas, sin valores vacíos y sin espacios.
+    def como_dict(self) -> dict:
+        datos = {
+            "v": VERSION_SPEC,
+            "n": self.nombre,
+            "g": self.grupo,
+            "t": self.tipo,
+            "e": [
+                [ej.categoria, ej.nombre] if ej.repeticiones is None else [ej.categoria, ej.nombre, ej.repeticiones]
+                for ej in self.ejercicios
+            ],
+            "d": self.duracion,
+            "r": self.rondas,
+            "i": self.incremento,
+            "ri": self.reps_inicio,
+            "dir": self.direccion,
+            "o": self.objetivo,
+        }
+        return {clave: valor for clave, valor in datos.items() if valor is not None}
+
+    def serializar(self) -> str:
+        return json.dumps(self.como_dict(), ensure_ascii=False, separators=(",", ":"), sort_keys=True)
+
+    def huella(self) -> str:
+        """Hash estable de la serialización canónica (clave de caché y almacenamiento)."""
+        if self._huella is None:
+            digest = hashlib.blake2b(self.serializar().encode("utf-8"), digest_size=16).hexdigest()
+            object.__setattr__(self, "_huella", digest)
+        return self._huella
+
+    def huella_contenido(self) -> str:
+        """Huella del WOD sin nombre ni grupo: igual para todos los alumnos que hacen el mismo."""
+        return self.reemplazar(nombre="", grupo="").huella()
+
+    @classmethod
+    def desde_dict(cls, datos: dict, validar: bool = True) -> "WorkoutSpec":
+        if not isinstance(datos, dict) or datos.get("v") != VERSION_SPEC:
+            raise SpecInvalida(["Versión de spec no reconocida"])
+        try:
+            ejercicios = [EjercicioSpec(*ej) for ej in datos.get("e", [])]
+        except TypeError:
+            raise SpecInvalida(["Lista de ejercicios mal formada"]) from None
+        spec = cls(
+            datos.get("n", ""), datos.get("g", ""), datos.get("t", ""), ejercicios,
+            duracion=datos.get("d"), rondas=datos.get("r"), incremento=datos.get("i"),
+            reps_inicio=datos.get("ri"), direccion=datos.get("dir"), objetivo=datos.get("o"),
+        )
+        if validar:
+            spec.validar()
+        return spec
+
+    @classmethod
+    def deserializar(cls, texto: str, validar: bool = True) -> "WorkoutSpec":
+        try:
+            datos = json.loads(texto)
+        except (TypeError, ValueError):
+            raise SpecInvalida(["JSON no válido"]) from None
+        return cls.desde_dict(datos, validar=validar)
+
+    def errores(self, requiere_alumno: bool = True) -> List[str]:
+        """Comprobaciones baratas de coherencia; lista vacía si la spec es válida."""
+        errores = []
+        if self.tipo not in TIPOS_CIRCUITO:
+            return [f"Tipo de WOD desconocido: {self.tipo!r}"]
+        if requiere_alumno and not self.nombre:
+            errores.append("Falta el nombre del alumno")
+        if requiere_alumno and not self.grupo:
+            errores.append("Falta el grupo")
+        if len(self.nombre) > MAX_NOMBRE or len(self.grupo) > MAX_GRUPO:
+            errores.append("Nombre o grupo demasiado largos")
+        if not self.ejercicios:
+            errores.append("No hay ejercicios seleccionados")
+
+        permitidos = dict(obtener_categorias_por_tipo(self.tipo))
+        for ej in self.ejercicios:
+            if not isinstance(ej, EjercicioSpec) or ej.nombre not in permitidos.get(ej.categoria, ()):
+                errores.append(f"Ejercicio no disponible para {self.tipo}: {getattr(ej, 'nombre', ej)!r}")
+            elif not _reps_valida(ej.repeticiones):
+                errores.append(f"Repeticiones no válidas para {ej.nombre}")
+
+        if self.tipo in WODS_CON_DURACION and not _en_rango(self.duracion, 5, 60):
+            errores.append("La duración debe estar entre 5 y 60 minutos")
+        if self.tipo == "Tabata" and len(self.ejercicios) not in TABATA_EJERCICIOS_VALIDOS:
+            errores.append("Un Tabata necesita 1, 2, 4 u 8 ejercicios")
+        if self.tipo not in WODS_CON_DURACION and self.tipo != "Tabata" and not _en_rango(self.rondas, 1, 10):
+            errores.append("El número de rondas debe estar entre 1 y 10")
+        if self.tipo == "Ladder":
+            if not _en_rango(self.incremento, 1, 10) or not _en_rango(self.reps_inicio, 1, 50):
+                errores.append("Parámetros de Ladder fuera de rango")
+            if self.direccion not in DIRECCIONES_LADDER:
+                errores.append("Dirección de Ladder no válida")
+        if self.tipo == CIRCUITO_ENTRENAMIENTO_KEY:
+            if self.objetivo not in OBJETIVOS_ENTRENAMIENTO:
+                errores.append("Objetivo del circuito no válido")
+            if not MIN_EJERCICIOS_CIRCUITO <= len(self.ejercicios) <= MAX_EJERCICIOS_CIRCUITO:
+                errores.append(
+                    f"El circuito necesita entre {MIN_EJERCICIOS_CIRCUITO} y {MAX_EJERCICIOS_CIRCUITO} ejercicios"
+                )
+        return errores
+
+    def validar(self, requiere_alumno: bool = True) -> "WorkoutSpec":
+        errores = self.errores(requiere_alumno)
+        if errores:
+            raise SpecInvalida(errores)
+        return self
+
+
+def _entero(valor) -> Optional[int]:
+    if valor is None or isinstance(valor, bool):
+        return None
+    try:
+        return int(valor)
+    except (TypeError, ValueError):
+        return None
+
+
+def _en_rango(valor: Optional[int], minimo: int, maximo: int) -> bool:
+    return valor is not None and minimo <= valor <= maximo
+
+
+def _reps_valida(repeticiones: Repeticiones) -> bool:
+    if repeticiones is None:
+        return True
+    if isinstance(repeticiones, int) and not isinstance(repeticiones, bool):
+        return 1 <= repeticiones <= 500
+    # Ejercicios por tiempo: "30 s", con los mismos límites que el formulario
+    if not isinstance(repeticiones, str) or not repeticiones.endswith(" s"):
+        return False
+    segundos = repeticiones[:-2]
+    return segundos.isascii() and segundos.isdigit() and 10 <= int(segundos) <= 300
+
+
+@lru_cache(maxsize=512)
+def construir_tabata_plan(spec: WorkoutSpec) -> Tuple[Tuple[str, int], ...]:
+    """Bloques Tabata de cada ejercicio según el cronograma: ``((nombre, bloques), ...)``."""
+    if spec.tipo != "Tabata" or not spec.ejercicios:
+        return ()
+    cronograma = compilar(spec)
+    bloques = np.bincount(cronograma["ejercicio"][cronograma["ejercicio"] >= 0], minlength=len(spec.ejercicios))
+    return tuple((ejercicio.nombre, int(total)) for ejercicio, total in zip(spec.ejercicios, bloques))
+
+
+@lru_cache(maxsize=512)
+def desglose_ladder(spec: WorkoutSpec) -> Tuple[int, ...]:
+    """Repeticiones de cada ronda de un Ladder según el cronograma."""
+    if spec.tipo != "Ladder" or not spec.ejercicios:
+        return ()
+    cronograma = compilar(spec)
+    return tuple(int(reps) for reps in cronograma["reps"][cronograma["ejercicio"] == 0])
+
+
+@lru_cache(maxsize=512)
+def parametros_pdf(spec: WorkoutSpec) -> Tuple[Tuple[str, str], ...]:
+    """Parámetros en el orden y con las etiquetas que muestra el PDF."""
+    parametros = []
+    if spec.objetivo:
+        parametros.append(("Objetivo", spec.objetivo))
+    if spec.tipo in WODS_CON_DURACION:
+        parametros.append(("Duración", f"{spec.duracion} minutos"))
+        if spec.tipo == "EMOM":
+            parametros.append(("Recuperación", EMOM_RECUPERACION_TEXTO))
+    elif spec.tipo == "Tabata":
+        parametros.append(("Número de ejercicios", str(len(spec.ejercicios))))
+        parametros.append(("Bloques Tabata", "8 bloques (20\" trabajo + 10\" descanso)"))
+    else:
+        parametros.append(("Número de rondas", str(spec.rondas)))
+
+    if spec.tipo == "Ladder":
+        parametros.append(("Incremento", str(spec.incremento)))
+        parametros.append(("Repeticiones iniciales", str(spec.reps_inicio)))
+        parametros.append(("Dirección", spec.direccion))
+        desglose = desglose_ladder(spec)
+        if desglose:
+            parametros.append(("Desglose", "-".join(str(valor) for valor in desglose)))
+    elif spec.tipo != "Tabata":
+        parametros.append(("Repeticiones", "Personalizadas por ejercicio"))
+    return tuple(parametros)
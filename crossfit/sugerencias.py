@@ -0,0 +1,184 @@
+"""Sugerencia automática de circuitos equilibrados.
+
+Cada ejercicio del catálogo se representa con una máscara de bits de los
+músculos que trabaja (bit ``i`` = ``catalogo.musculos[i]``; como los músculos
+nuevos se añaden al final, las máscaras no cambian al recargar el catálogo), así
+que la cobertura de un circuito es el OR de sus máscaras y el solapamiento la
+diferencia entre la suma de bits y los bits cubiertos. Una construcción voraz
+con desempates aleatorios (la semilla permite pedir otra sugerencia) y una
+búsqueda local por intercambios resuelven un circuito en pocos milisegundos.
+"""
+
+import os
+import random
+from functools import lru_cache
+from typing import Iterable, List, NamedTuple, Optional, Sequence, Tuple
+
+from crossfit.catalogo import Catalogo, catalogo_actual
+from crossfit.datos import (
+    CIRCUITO_ENTRENAMIENTO_KEY,
+    MAX_EJERCICIOS_CIRCUITO,
+    MIN_EJERCICIOS_CIRCUITO,
+    OBJETIVOS_ENTRENAMIENTO,
+    extraer_rango_numerico,
+    obtener_categorias_por_tipo,
+    obtener_musculos,
+    valor_intermedio,
+)
+from crossfit.spec import EjercicioSpec
+
+# Categorías de material que el profesor deja usar, separadas por comas (todas si no se define).
+VARIABLE_MATERIAL = "CROSSFIT_MATERIAL_DISPONIBLE"
+MAX_PASADAS = 20
+
+
+class Candidato(NamedTuple):
+    categoria: str
+    nombre: str
+    mascara: int
+
+
+class Sugerencia(NamedTuple):
+    ejercicios: Tuple[EjercicioSpec, ...]
+    cubiertos: List[str]
+    sin_cubrir: List[str]
+
+
+def _bits(valor: int) -> int:
+    return bin(valor).count("1")
+
+
+def _bits_musculo(catalogo: Catalogo):
+    return {musculo: 1 << indice for indice, musculo in enumerate(catalogo.musculos)}
+
+
+def mascara_musculos(musculos: Iterable[str], catalogo: Optional[Catalogo] = None) -> int:
+    bits = (catalogo or catalogo_actual()).derivado("bits_musculo", _bits_musculo)
+    mascara = 0
+    for musculo in musculos:
+        mascara |= bits.get(musculo, 0)
+    return mascara
+
+
+def musculos_de(mascara: int, catalogo: Optional[Catalogo] = None) -> List[str]:
+    bits = (catalogo or catalogo_actual()).derivado("bits_musculo", _bits_musculo)
+    return sorted(musculo for musculo, bit in bits.items() if mascara & bit)
+
+
+def _candidatos(catalogo: Catalogo) -> List[Candidato]:
+    return [
+        Candidato(categoria, nombre, mascara_musculos(obtener_musculos(nombre, categoria, catalogo), catalogo))
+        for categoria, nombres in obtener_categorias_por_tipo(CIRCUITO_ENTRENAMIENTO_KEY, catalogo)
+        for nombre in nombres
+    ]
+
+
+def candidatos(catalogo: Optional[Catalogo] = None) -> List[Candidato]:
+    """Ejercicios que pueden entrar en un circuito, con su máscara de músculos."""
+    return (catalogo or catalogo_actual()).derivado("candidatos", _candidatos)
+
+
+def material_disponible() -> List[str]:
+    """Categorías de material habilitadas por el profesor."""
+    valor = os.environ.get(VARIABLE_MATERIAL, "")
+    elegidas = {categoria.strip() for categoria in valor.split(",") if categoria.strip()}
+    categorias = dict.fromkeys(candidato.categoria for candidato in candidatos())
+    return [categoria for categoria in categorias if not elegidas or categoria in elegidas]
+
+
+def repeticiones_objetivo(nombre: str, objetivo: Optional[str]):
+    """Repeticiones que el formulario propone por defecto para el ejercicio y objetivo."""
+    if nombre == "Plank Hold":
+        return "30 s"
+    reps_min, reps_max = extraer_rango_numerico(OBJETIVOS_ENTRENAMIENTO.get(objetivo, {}).get("reps"), 8, 15)
+    reps = valor_intermedio(reps_min, reps_max)
+    if nombre == "Shuttle Run":
+        opciones = [opcion for opcion in (4, 6, 10, 12, 14, 16, 20) if reps_min <= opcion <= reps_max]
+        return min(opciones or sorted({reps_min, reps_max}), key=lambda opcion: abs(opcion - reps))
+    return reps
+
+
+def _puntuacion(
+    mascaras: Sequence[int], categorias: Sequence[str], requeridos: int, peso_requerido: int
+) -> Tuple[int, int, int]:
+    cobertura = 0
+    suma = 0
+    for mascara in mascaras:
+        cobertura |= mascara
+        suma += _bits(mascara)
+    ponderada = peso_requerido * _bits(cobertura & requeridos) + _bits(cobertura)
+    return ponderada, -(suma - _bits(cobertura)), len(set(categorias))
+
+
+def sugerir_circuito(
+    objetivo: Optional[str],
+    categorias: Iterable[str],
+    cantidad: int = 8,
+    musculos_requeridos: Iterable[str] = (),
+    semilla: int = 0,
+) -> Optional[Sugerencia]:
+    """Circuito de ``cantidad`` ejercicios que maximiza los músculos trabajados.
+
+    Solo usa las ``categorias`` indicadas; los ``musculos_requeridos`` se
+    cubren antes que los demás si el material lo permite. Devuelve None si no hay
+    suficientes ejercicios con ese material.
+    """
+    cantidad = max(MIN_EJERCICIOS_CIRCUITO, min(MAX_EJERCICIOS_CIRCUITO, cantidad))
+    catalogo = catalogo_actual()
+    indices = _resolver(
+        catalogo, frozenset(categorias), cantidad, mascara_musculos(musculos_requeridos, catalogo), semilla
+    )
+    if indices is None:
+        return None
+    elegidos = [candidatos(catalogo)[indice] for indice in indices]
+    cobertura = 0
+    for candidato in elegidos:
+        cobertura |= candidato.mascara
+    return Sugerencia(
+        tuple(EjercicioSpec(c.categoria, c.nombre, repeticiones_objetivo(c.nombre, objetivo)) for c in elegidos),
+        musculos_de(cobertura, catalogo),
+        musculos_de(mascara_musculos(catalogo.musculos, catalogo) & ~cobertura, catalogo),
+    )
+
+
+@lru_cache(maxsize=256)
+def _resolver(
+    catalogo: Catalogo, categorias: frozenset, cantidad: int, requeridos: int, semilla: int
+) -> Optional[Tuple[int, ...]]:
+    lista = candidatos(catalogo)
+    posibles = [indice for indice, candidato in enumerate(lista) if candidato.categoria in categorias]
+    if len(posibles) < cantidad:
+        return None
+    random.Random(semilla).shuffle(posibles)
+    mascaras = [candidato.mascara for candidato in lista]
+    nombres_categoria = [candidato.categoria for candidato in lista]
+    # Un músculo obligatorio pesa más que todos los demás juntos.
+    peso_requerido = len(catalogo.musculos) + 1
+
+    def puntuar(seleccion):
+        return _puntuacion(
+            [mascaras[i] for i in seleccion], [nombres_categoria[i] for i in seleccion], requeridos, peso_requerido
+        )
+
+    # Voraz: en cada paso, el ejercicio que más mejora la puntuación (desempate por el orden barajado).
+    seleccion: List[int] = []
+    libres = list(posibles)
+    for _ in range(cantidad):
+        mejor = max(libres, key=lambda indice: puntuar(seleccion + [indice]))
+        seleccion.append(mejor)
+        libres.remove(mejor)
+
+    # Búsqueda local: intercambia un ejercicio elegido por uno libre mientras mejore.
+    actual = puntuar(seleccion)
+    for _ in range(MAX_PASADAS):
+        mejora = False
+        for posicion in range(cantidad):
+            for libre_posicion, indice in enumerate(libres):
+                prueba = seleccion[:posicion] + [indice] + seleccion[posicion + 1:]
+                puntuacion = puntuar(prueba)
+                if puntuacion > actual:
+                    libres[libre_posicion] = seleccion[posicion]
+                    seleccion, actual, mejora = prueba, puntuacion, True
+        if not mejora:
+            break
+    return tuple(seleccion)
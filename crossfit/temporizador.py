@@ -0,0 +1,152 @@
+"""Temporizador de intervalos que se ejecuta por completo en el navegador.
+
+El cronograma compilado de la spec se envía una sola vez dentro de un componente
+HTML; a partir de ahí la cuenta, los cambios de intervalo y los avisos sonoros
+corren en el móvil del alumno sin reruns ni mensajes al servidor.
+"""
+
+import json
+from functools import lru_cache
+
+import streamlit.components.v1 as components
+
+from crossfit.cronograma import compilar
+from crossfit.spec import WorkoutSpec
+
+ALTO_COMPONENTE = 250
+
+# Tabata y EMOM avanzan solos por los intervalos; AMRAP es una cuenta atrás con
+# contador de rondas; el resto es un cronómetro con la lista de rondas.
+MODOS = {"Tabata": "intervalos", "EMOM": "intervalos", "AMRAP": "cuenta_atras"}
+
+_PLANTILLA = """
+<div id="tmp" style="font-family: sans-serif; text-align: center; color: #1F2933;">
+  <div id="fase" style="font-size: 15px; font-weight: 600; letter-spacing: .04em;">PREPARADO</div>
+  <div id="reloj" style="font-size: 64px; font-weight: 700; line-height: 1.1;">00:00</div>
+  <div id="actual" style="font-size: 20px; font-weight: 600; min-height: 26px;"></div>
+  <div id="siguiente" style="font-size: 13px; color: #64748B; min-height: 18px;"></div>
+  <div style="height: 8px; background: #E2E8F0; border-radius: 4px; margin: 10px 0;">
+    <div id="barra" style="height: 8px; width: 0; background: #FF6B6B; border-radius: 4px;"></div>
+  </div>
+  <button id="iniciar">Iniciar</button>
+  <button id="reiniciar">Reiniciar</button>
+  <button id="ronda" style="display: none;">+1 ronda</button>
+  <button id="avanzar" style="display: none;">Siguiente</button>
+</div>
+<style>
+  button { font-size: 16px; padding: 8px 16px; margin: 2px; border-radius: 8px;
+           border: 1px solid #CBD5F5; background: #F8FAFC; cursor: pointer; }
+</style>
+<script>
+const D = __DATOS__;
+const $ = (id) => document.getElementById(id);
+let inicio = null, acumulado = 0, rondas = 0, paso = 0, ultimo = -1, audio = null;
+
+function mmss(s) {
+  s = Math.max(0, Math.ceil(s));
+  return String(Math.floor(s / 60)).padStart(2, "0") + ":" + String(s % 60).padStart(2, "0");
+}
+function pitido(frecuencia) {
+  try {
+    audio = audio || new (window.AudioContext || window.webkitAudioContext)();
+    const osc = audio.createOscillator(), gan = audio.createGain();
+    osc.frequency.value = frecuencia; osc.connect(gan); gan.connect(audio.destination);
+    gan.gain.setValueAtTime(0.2, audio.currentTime);
+    osc.start(); osc.stop(audio.currentTime + 0.15);
+  } catch (e) {}
+}
+function etiqueta(iv) {
+  if (!iv) return "";
+  if (iv[2] < 0) return "Descanso";
+  return D.ejercicios[iv[2]] + (iv[3] > 0 ? " · " + iv[3] + " reps" : "");
+}
+function transcurrido() {
+  return acumulado + (inicio === null ? 0 : (performance.now() - inicio) / 1000);
+}
+function buscar(t) {
+  let i = D.intervalos.findIndex((iv) => t < iv[1]);
+  return i < 0 ? D.intervalos.length : i;
+}
+function pintar() {
+  const t = transcurrido();
+  let i;
+  if (D.modo === "intervalos") {
+    i = buscar(t);
+    if (i !== ultimo && inicio !== null) { pitido(i < D.intervalos.length && D.intervalos[i][2] < 0 ? 440 : 880); }
+    ultimo = i;
+    const iv = D.intervalos[i];
+    $("reloj").textContent = iv ? mmss(iv[1] - t) : "00:00";
+    $("fase").textContent = iv ? (iv[2] < 0 ? "DESCANSO" : "TRABAJO · RONDA " + (iv[4] + 1)) : "¡TERMINADO!";
+    $("fase").style.color = iv && iv[2] < 0 ? "#0F766E" : "#B42318";
+    $("actual").textContent = etiqueta(iv);
+    $("siguiente").textContent = D.intervalos[i + 1] ? "Después: " + etiqueta(D.intervalos[i + 1]) : "";
+    if (!iv) parar();
+  } else if (D.modo === "cuenta_atras") {
+    const resta = D.total - t;
+    $("reloj").textContent = mmss(resta);
+    $("fase").textContent = resta > 0 ? "AMRAP" : "¡TIEMPO!";
+    $("actual").textContent = "Rondas completadas: " + rondas;
+    $("siguiente").textContent = D.ejercicios.join(" → ");
+    if (resta <= 0) { pitido(660); parar(); }
+  } else {
+    const iv = D.intervalos[paso];
+    $("reloj").textContent = mmss(t);
+    $("fase").textContent = iv ? "RONDA " + (iv[4] + 1) : "¡TERMINADO!";
+    $("actual").textContent = etiqueta(iv);
+    $("siguiente").textContent = D.intervalos[paso + 1] ? "Después: " + etiqueta(D.intervalos[paso + 1]) : "";
+  }
+  const avance = D.modo === "cronometro" ? paso / Math.max(1, D.intervalos.length) : t / Math.max(1, D.total);
+  $("barra").style.width = Math.min(100, 100 * avance) + "%";
+  if (inicio !== null) requestAnimationFrame(pintar);
+}
+function parar() {
+  if (inicio !== null) { acumulado = transcurrido(); inicio = null; }
+  $("iniciar").textContent = "Continuar";
+}
+$("iniciar").onclick = () => {
+  if (inicio === null) {
+    inicio = performance.now(); $("iniciar").textContent = "Pausa"; pitido(880);
+    if (navigator.wakeLock) navigator.wakeLock.request("screen").catch(() => {});
+    requestAnimationFrame(pintar);
+  } else { parar(); }
+};
+$("reiniciar").onclick = () => {
+  inicio = null; acumulado = 0; rondas = 0; paso = 0; ultimo = -1;
+  $("iniciar").textContent = "Iniciar"; pintar();
+};
+$("ronda").onclick = () => { rondas += 1; pintar(); };
+$("avanzar").onclick = () => { paso = Math.min(D.intervalos.length, paso + 1); pitido(880); pintar(); };
+$("ronda").style.display = D.modo === "cuenta_atras" ? "inline-block" : "none";
+$("avanzar").style.display = D.modo === "cronometro" ? "inline-block" : "none";
+pintar();
+</script>
+"""
+
+
+@lru_cache(maxsize=256)
+def datos_temporizador(spec: WorkoutSpec) -> dict:
+    """Cronograma en formato compacto para el navegador."""
+    cronograma = compilar(spec)
+    modo = MODOS.get(spec.tipo, "cronometro")
+    total = 60 * spec.duracion if modo == "cuenta_atras" else float(cronograma["fin"].max(initial=0))
+    return {
+        "modo": modo,
+        "total": total,
+        "ejercicios": [ejercicio.nombre for ejercicio in spec.ejercicios],
+        "intervalos": [
+            [round(float(fila["inicio"]), 1), round(float(fila["fin"]), 1),
+             int(fila["ejercicio"]), int(fila["reps"]), int(fila["ronda"])]
+            for fila in cronograma
+        ],
+    }
+
+
+@lru_cache(maxsize=256)
+def html_temporizador(spec: WorkoutSpec) -> str:
+    datos = json.dumps(datos_temporizador(spec), ensure_ascii=False, separators=(",", ":"))
+    return _PLANTILLA.replace("__DATOS__", datos.replace("</", "<\\/"))
+
+
+def mostrar_temporizador(spec: WorkoutSpec):
+    """Inserta el temporizador; el HTML es idéntico entre reruns, así que no se reinicia."""
+    components.html(html_temporizador(spec), height=ALTO_COMPONENTE)
@@ -0,0 +1 @@
+"""Herramientas de diagnóstico y rendimiento para el generador de entrenamientos."""
@@ -0,0 +1,153 @@
+"""Resume un día del registro de eventos de generación (``CROSSFIT_EVENTOS``).
+
+Solo decodifica las líneas del día pedido: el resto se descarta comparando el
+comienzo de la línea, así que un día de registros se resume en segundos.
+
+Uso:
+    python -m herramientas.analizar_eventos
+    python -m herramientas.analizar_eventos --dia 2026-10-18 datos/eventos.jsonl datos/eventos.jsonl.1
+"""
+
+import argparse
+import json
+import sys
+from collections import Counter, defaultdict
+from datetime import date
+from pathlib import Path
+from typing import Dict, Iterator, List, Optional
+
+from crossfit.eventos import (
+    ARCHIVOS_ROTADOS,
+    EVENTO_DESCARGA,
+    EVENTO_GENERADO,
+    EVENTO_RECHAZADO,
+    EVENTO_REUTILIZADO,
+    RegistroEventos,
+)
+from herramientas.prueba_carga import percentil
+
+
+def archivos_por_defecto() -> List[Path]:
+    """El archivo de eventos configurado y sus rotaciones, del más antiguo al más reciente."""
+    ruta = RegistroEventos.desde_entorno().ruta
+    if ruta is None:
+        return []
+    candidatos = [ruta.with_name(f"{ruta.name}.{numero}") for numero in range(ARCHIVOS_ROTADOS, 0, -1)] + [ruta]
+    return [candidato for candidato in candidatos if candidato.exists()]
+
+
+def leer_dia(rutas: List[Path], dia: str, errores: Counter) -> Iterator[dict]:
+    prefijo = f'{{"ts":"{dia}'.encode("ascii")
+    for ruta in rutas:
+        with open(ruta, "rb") as archivo:
+            for linea in archivo:
+                if not linea.startswith(prefijo):
+                    continue
+                try:
+                    yield json.loads(linea)
+                except ValueError:
+                    # Línea cortada (p. ej. el proceso murió a mitad de escritura)
+                    errores["lineas"] += 1
+
+
+def resumir(eventos: Iterator[dict]) -> dict:
+    por_evento = Counter()
+    por_tipo: Dict[str, Counter] = defaultdict(Counter)
+    por_hora = Counter()
+    tiempos: Dict[str, List[float]] = defaultdict(list)
+    bytes_motor: Dict[str, List[int]] = defaultdict(list)
+    origenes = Counter()
+    motivos = Counter()
+    huellas = set()
+    for evento in eventos:
+        nombre = evento.get("evento", "")
+        por_evento[nombre] += 1
+        por_tipo[evento.get("tipo", "")][nombre] += 1
+        if "huella" in evento:
+            huellas.add(evento["huella"])
+        if nombre == EVENTO_GENERADO:
+            motor = evento.get("motor", "")
+            tiempos[motor].append(evento.get("ms", 0.0))
+            bytes_motor[motor].append(evento.get("bytes", 0))
+            por_hora[evento["ts"][11:13]] += 1
+        elif nombre == EVENTO_REUTILIZADO:
+            origenes[evento.get("origen", "")] += 1
+            por_hora[evento["ts"][11:13]] += 1
+        elif nombre == EVENTO_RECHAZADO:
+            motivos[evento.get("motivo", "")] += 1
+
+    generados, reutilizados = por_evento[EVENTO_GENERADO], por_evento[EVENTO_REUTILIZADO]
+    motores = {}
+    for motor, valores in tiempos.items():
+        valores.sort()
+        motores[motor] = {
+            "generados": len(valores),
+            "mediana_ms": percentil(valores, 50),
+            "p95_ms": percentil(valores, 95),
+            "max_ms": valores[-1],
+            "kib_medio": sum(bytes_motor[motor]) / len(bytes_motor[motor]) / 1024,
+        }
+    return {
+        "eventos": dict(por_evento),
+        "wods_distintos": len(huellas),
+        "reutilizacion": reutilizados / (generados + reutilizados) if generados + reutilizados else 0.0,
+        "reutilizados_por_origen": dict(origenes),
+        "rechazados_por_motivo": dict(motivos),
+        "motores": motores,
+        "por_tipo": {tipo: dict(cuentas) for tipo, cuentas in sorted(por_tipo.items())},
+        "por_hora": dict(sorted(por_hora.items())),
+    }
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("archivos", nargs="*", type=Path, help="por defecto, el de CROSSFIT_EVENTOS y sus rotaciones")
+    parser.add_argument("--dia", default=date.today().isoformat(), help="AAAA-MM-DD (por defecto, hoy)")
+    parser.add_argument("--json", action="store_true", help="imprime el resumen en JSON")
+    args = parser.parse_args(argv)
+
+    rutas = args.archivos or archivos_por_defecto()
+    if not rutas:
+        print("No hay archivos de eventos.", file=sys.stderr)
+        return 1
+    errores = Counter()
+    resumen = resumir(leer_dia(rutas, args.dia, errores))
+    resumen["lineas_erroneas"] = errores["lineas"]
+    if args.json:
+        print(json.dumps(resumen, ensure_ascii=False, indent=2))
+        return 0
+    if not resumen["eventos"]:
+        print(f"No hay eventos del {args.dia}.")
+        return 0
+
+    eventos = resumen["eventos"]
+    print(
+        f"{args.dia}: {eventos.get(EVENTO_GENERADO, 0)} PDFs generados · {eventos.get(EVENTO_REUTILIZADO, 0)} reutilizados "
+        f"({100 * resumen['reutilizacion']:.0f} %) · {eventos.get(EVENTO_DESCARGA, 0)} descargas · "
+        f"{eventos.get(EVENTO_RECHAZADO, 0)} rechazados · {resumen['wods_distintos']} WODs distintos"
+    )
+    if resumen["reutilizados_por_origen"]:
+        print("Reutilizados: " + ", ".join(f"{origen} {n}" for origen, n in resumen["reutilizados_por_origen"].items()))
+    if resumen["rechazados_por_motivo"]:
+        print("Rechazados: " + ", ".join(f"{motivo} {n}" for motivo, n in resumen["rechazados_por_motivo"].items()))
+    if resumen["lineas_erroneas"]:
+        print(f"Líneas que no se han podido leer: {resumen['lineas_erroneas']}")
+
+    print(f"\n  {'motor':<12}{'generados':>10}{'mediana ms':>12}{'p95 ms':>10}{'máx ms':>10}{'KiB':>8}")
+    for motor, datos in resumen["motores"].items():
+        print(
+            f"  {motor:<12}{datos['generados']:>10}{datos['mediana_ms']:>12.1f}{datos['p95_ms']:>10.1f}"
+            f"{datos['max_ms']:>10.1f}{datos['kib_medio']:>8.0f}"
+        )
+    print(f"\n  {'WOD':<26}{'generados':>10}{'reutilizados':>14}{'descargas':>11}{'rechazados':>12}")
+    for tipo, cuentas in resumen["por_tipo"].items():
+        print(
+            f"  {tipo or '—':<26}{cuentas.get(EVENTO_GENERADO, 0):>10}{cuentas.get(EVENTO_REUTILIZADO, 0):>14}"
+            f"{cuentas.get(EVENTO_DESCARGA, 0):>11}{cuentas.get(EVENTO_RECHAZADO, 0):>12}"
+        )
+    print("\nPDFs servidos por hora: " + " · ".join(f"{hora} h {n}" for hora, n in resumen["por_hora"].items()))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,69 @@
+"""Mide la analítica de cargas musculares sobre un historial sintético.
+
+Genera ``--wods`` entrenamientos distintos repartidos entre ``--registros``
+descargas de ``--alumnos`` alumnos en ``--grupos`` grupos, y cronometra el
+cálculo del volumen por músculo de los WOD distintos y la agregación por alumno
+y grupo de todos los registros (lo que hace el panel del profesor).
+
+Uso:
+    python -m herramientas.benchmark_analitica --registros 20000
+"""
+
+import argparse
+import random
+import sys
+import time
+from typing import List, Optional
+
+from crossfit.analitica import informe_cargas, volumen_por_musculo
+from crossfit.catalogo import catalogo_actual
+from crossfit.datos import OBJETIVOS_ORDEN
+from crossfit.spec import EjercicioSpec, WorkoutSpec
+
+
+def wods_aleatorios(cantidad: int, semilla: int = 1) -> List[WorkoutSpec]:
+    azar = random.Random(semilla)
+    catalogo = [(categoria, nombre) for categoria, nombres in catalogo_actual().ejercicios.items() for nombre in nombres]
+    wods = []
+    for _ in range(cantidad):
+        ejercicios = [EjercicioSpec(categoria, nombre, azar.randint(5, 15)) for categoria, nombre in azar.sample(catalogo, 6)]
+        tipo = azar.choice(["AMRAP", "EMOM", "Ladder", "Circuito de Entrenamiento"])
+        wods.append(WorkoutSpec(
+            "", "", tipo, ejercicios, duracion=azar.randint(8, 20), rondas=azar.randint(3, 6),
+            incremento=2, reps_inicio=4, direccion="Creciente", objetivo=azar.choice(OBJETIVOS_ORDEN),
+        ))
+    return wods
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--registros", type=int, default=20000)
+    parser.add_argument("--wods", type=int, default=1000)
+    parser.add_argument("--alumnos", type=int, default=900)
+    parser.add_argument("--grupos", type=int, default=30)
+    args = parser.parse_args(argv)
+
+    wods = wods_aleatorios(args.wods)
+    azar = random.Random(2)
+    asignados = [azar.randrange(len(wods)) for _ in range(args.registros)]
+    alumnos = [f"Alumno {i % args.alumnos}" for i in range(args.registros)]
+    grupos = [f"G{i % args.grupos}" for i in range(args.registros)]
+
+    inicio = time.perf_counter()
+    por_wod = volumen_por_musculo(wods)
+    calculo = time.perf_counter() - inicio
+    inicio = time.perf_counter()
+    informe = informe_cargas(alumnos, grupos, por_wod[asignados])
+    agregacion = time.perf_counter() - inicio
+
+    print(f"Matriz ejercicio × músculo: {len(catalogo_actual().musculos)} músculos")
+    print(f"Volumen de {len(wods)} WOD distintos: {1000 * calculo:.1f} ms")
+    print(
+        f"Agregación de {informe['entrenamientos']} registros en {len(informe['alumnos'][0])} alumnos "
+        f"y {len(informe['grupos'][0])} grupos: {1000 * agregacion:.1f} ms"
+    )
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
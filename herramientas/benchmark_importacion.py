@@ -0,0 +1,64 @@
+"""Mide la importación masiva de resultados desde CSV.
+
+Genera en memoria un CSV de ``--filas`` resultados de ``--alumnos`` alumnos en
+``--grupos`` grupos (con todos los WOD y algunas filas erróneas) y lo importa en
+una base de datos temporal, primero vacía y después otra vez (todas las filas
+son duplicadas).
+
+Uso:
+    python -m herramientas.benchmark_importacion --filas 100000
+"""
+
+import argparse
+import io
+import random
+import sys
+import tempfile
+import time
+from pathlib import Path
+from typing import List, Optional
+
+from crossfit.historial import Historial
+from crossfit.importacion import importar_csv
+from crossfit.resultados import Resultados
+
+WODS = ["AMRAP", "AFAP", "Tabata", "EMOM", "Ladder (Escalera)", "Circuito de Entrenamiento"]
+
+
+def csv_sintetico(filas: int, alumnos: int, grupos: int, semilla: int = 1) -> bytes:
+    azar = random.Random(semilla)
+    lineas = ["fecha;alumno;grupo;wod;rondas;reps;tiempo"]
+    for indice in range(filas):
+        wod = azar.choice(WODS) if indice % 50 else "Desconocido"
+        bloques = "-".join(str(azar.randint(5, 15)) for _ in range(8))
+        lineas.append(
+            f"2025-{azar.randint(1, 12):02d}-{azar.randint(1, 28):02d};Alumno {indice % alumnos};"
+            f"G{indice % grupos};{wod};{azar.randint(1, 15)};{bloques if wod == 'Tabata' else azar.randint(0, 30)};"
+            f"{azar.randint(3, 25)}:{azar.randint(0, 59):02d}"
+        )
+    return "\n".join(lineas).encode("utf-8")
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--filas", type=int, default=100000)
+    parser.add_argument("--alumnos", type=int, default=900)
+    parser.add_argument("--grupos", type=int, default=30)
+    args = parser.parse_args(argv)
+
+    datos = csv_sintetico(args.filas, args.alumnos, args.grupos)
+    with tempfile.TemporaryDirectory() as directorio:
+        almacen = Resultados(Historial(Path(directorio) / "benchmark.sqlite3"))
+        for etiqueta in ("Base de datos vacía", "Reimportación"):
+            inicio = time.perf_counter()
+            informe = importar_csv(io.BytesIO(datos), almacen)
+            segundos = time.perf_counter() - inicio
+            print(
+                f"{etiqueta}: {informe.filas} filas en {segundos:.2f} s ({informe.filas / segundos:,.0f} filas/s) · "
+                f"{informe.importadas} importadas, {informe.duplicadas} duplicadas, {informe.total_errores} con errores"
+            )
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
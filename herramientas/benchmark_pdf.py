@@ -0,0 +1,191 @@
+"""Compara los motores de PDF (``completo`` y ``rapido``): paridad de contenido y coste.
+
+Para cada WOD construye un caso representativo, genera el PDF con cada motor y
+comprueba que los textos que el alumno necesita (nombre, grupo, ejercicios,
+repeticiones, parámetros, plan Tabata…) aparecen en ambos. Después mide la
+latencia (mediana y p95), el pico de memoria de Python y el tamaño del PDF, y
+el coste de un programa de ``--semanas`` semanas del circuito frente a una sola
+sesión.
+
+Uso:
+    python -m herramientas.benchmark_pdf                # paridad + benchmark
+    python -m herramientas.benchmark_pdf --solo-paridad # sale con 1 si hay diferencias
+"""
+
+import argparse
+import base64
+import json
+import re
+import sys
+import time
+import tracemalloc
+import zlib
+from typing import Dict, List, Optional
+
+from crossfit.catalogo import catalogo_actual
+from crossfit.datos import NOTAS_IMPORTANTES, TEXTO_QR_WOD
+from crossfit.enlaces import enlace_spec
+from crossfit.pdf import MOTORES_PDF
+from crossfit.pdf_rapido import generar_pdf_programa
+from crossfit.programa import FASES_LINEALES, generar_programa
+from crossfit.spec import EjercicioSpec, WorkoutSpec, construir_tabata_plan, parametros_pdf
+from herramientas.prueba_carga import percentil
+
+_FLUJO = re.compile(rb"/Filter \[ /ASCII85Decode /FlateDecode \][^>]*>>\s*stream\r?\n(.*?)~>\s*endstream", re.S)
+_TEXTO = re.compile(rb"\((.*?)(?<!\\)\)\s*Tj")
+_ESCAPE = re.compile(rb"\\([0-7]{1,3}|.)", re.S)
+
+
+def construir_casos() -> List[dict]:
+    """Un caso por WOD, con contenido parecido al que genera la aplicación."""
+    ejercicios = catalogo_actual().ejercicios
+    autocarga = ejercicios["Autocarga"]
+    kettlebell = ejercicios["Kettlebell"]
+    circuito = [EjercicioSpec("Kettlebell", nombre, 8) for nombre in kettlebell[:4]]
+    circuito += [EjercicioSpec("Autocarga", nombre, 10) for nombre in autocarga[:4]]
+    specs = [
+        WorkoutSpec(
+            "Sofía González", "3°A", "AMRAP",
+            [EjercicioSpec("Autocarga", nombre, 12) for nombre in autocarga[:3]]
+            + [EjercicioSpec("Carrera", "Shuttle Run", 10)],
+            duracion=15,
+        ),
+        WorkoutSpec(
+            "Mateo Ruiz", "2°B", "EMOM",
+            [EjercicioSpec("Autocarga", "Plank Hold", "30 s")]
+            + [EjercicioSpec("Autocarga", nombre, 8) for nombre in autocarga[:2]],
+            duracion=12,
+        ),
+        WorkoutSpec("Lucía Pérez", "1°C", "Tabata", [EjercicioSpec("Autocarga", nombre) for nombre in autocarga[:4]]),
+        WorkoutSpec(
+            "Diego Martín", "4°A", "Ladder", [EjercicioSpec("Kettlebell", nombre) for nombre in kettlebell[:3]],
+            rondas=5, incremento=2, reps_inicio=5, direccion="Creciente",
+        ),
+        WorkoutSpec("Valentina López", "3°B", "Circuito de Entrenamiento", circuito, rondas=4, objetivo="Hipertrofia"),
+    ]
+    return [{"nombre": spec.tipo, "spec": spec.validar()} for spec in specs]
+
+
+def _desescapar(coincidencia) -> bytes:
+    valor = coincidencia.group(1)
+    if valor[:1].isdigit():
+        return bytes([int(valor, 8) & 0xFF])
+    return {b"n": b"\n", b"r": b"\r", b"t": b"\t", b"b": b"\b", b"f": b"\f"}.get(valor, valor)
+
+
+def extraer_texto(pdf: bytes) -> str:
+    """Texto de los operadores ``Tj`` de todas las páginas, en orden de dibujo."""
+    fragmentos = []
+    for flujo in _FLUJO.finditer(pdf):
+        try:
+            contenido = zlib.decompress(base64.a85decode(re.sub(rb"\s", b"", flujo.group(1))))
+        except (ValueError, zlib.error):
+            continue
+        if b"BT" not in contenido:
+            continue
+        for texto in _TEXTO.finditer(contenido):
+            fragmentos.append(_ESCAPE.sub(_desescapar, texto.group(1)).decode("cp1252", errors="replace"))
+    return " ".join(fragmentos)
+
+
+def palabras(texto: str) -> set:
+    return set(re.findall(r"\w+", texto.lower()))
+
+
+def textos_requeridos(spec: WorkoutSpec) -> List[str]:
+    requeridos = [spec.nombre, spec.grupo, spec.tipo]
+    for ejercicio in spec.ejercicios:
+        requeridos += [ejercicio.nombre, ejercicio.categoria, *ejercicio.musculos]
+        if ejercicio.repeticiones is not None:
+            requeridos.append(str(ejercicio.repeticiones))
+    for clave, valor in parametros_pdf(spec):
+        requeridos += [clave, valor]
+    for nombre, bloques in construir_tabata_plan(spec):
+        requeridos += [nombre, str(bloques)]
+    if spec.objetivo_info:
+        requeridos += [spec.objetivo_info[campo] for campo in ("carga", "reps", "series", "descanso", "rir")]
+    requeridos += NOTAS_IMPORTANTES
+    requeridos += [TEXTO_QR_WOD, enlace_spec(spec)]
+    return requeridos
+
+
+def comprobar_paridad(casos: List[dict]) -> List[str]:
+    """Devuelve las diferencias encontradas (lista vacía si los motores coinciden)."""
+    diferencias = []
+    for caso in casos:
+        requeridos = textos_requeridos(caso["spec"])
+        for motor, generar in MOTORES_PDF.items():
+            encontradas = palabras(extraer_texto(generar(caso["spec"]).getvalue()))
+            if not encontradas:
+                diferencias.append(f"{caso['nombre']} [{motor}]: no se ha podido extraer texto")
+                continue
+            faltan = sorted({p for texto in requeridos for p in palabras(texto)} - encontradas)
+            if faltan:
+                diferencias.append(f"{caso['nombre']} [{motor}]: faltan {', '.join(faltan[:12])}")
+    return diferencias
+
+
+def medir(generar, spec: WorkoutSpec, iteraciones: int) -> dict:
+    generar(spec)  # calienta cachés de imágenes y fuentes
+    tiempos = []
+    for _ in range(iteraciones):
+        inicio = time.perf_counter()
+        pdf = generar(spec).getvalue()
+        tiempos.append(time.perf_counter() - inicio)
+    tracemalloc.start()
+    generar(spec)
+    _, pico = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    tiempos.sort()
+    return {
+        "mediana_ms": 1000 * percentil(tiempos, 50),
+        "p95_ms": 1000 * percentil(tiempos, 95),
+        "pico_mib": pico / 2 ** 20,
+        "kib": len(pdf) / 1024,
+        "paginas": len(re.findall(rb"/Type /Page\b", pdf)),
+    }
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--iteraciones", type=int, default=20)
+    parser.add_argument("--solo-paridad", action="store_true")
+    parser.add_argument("--semanas", type=int, default=12, help="semanas del programa (3 sesiones por semana)")
+    parser.add_argument("--json", action="store_true", help="imprime los resultados en JSON")
+    args = parser.parse_args(argv)
+
+    casos = construir_casos()
+    diferencias = comprobar_paridad(casos)
+    if not args.json:
+        print("Paridad: OK" if not diferencias else "Paridad: DIFERENCIAS")
+        for diferencia in diferencias:
+            print(f"  - {diferencia}")
+    if args.solo_paridad:
+        return 1 if diferencias else 0
+
+    resultados: Dict[str, Dict[str, dict]] = {}
+    for caso in casos:
+        resultados[caso["nombre"]] = {
+            motor: medir(generar, caso["spec"], args.iteraciones) for motor, generar in MOTORES_PDF.items()
+        }
+    circuito = casos[-1]["spec"]
+    resultados[f"Programa {args.semanas} semanas"] = {"rapido": medir(
+        lambda spec: generar_pdf_programa(spec, generar_programa(spec, args.semanas, FASES_LINEALES), 3),
+        circuito, args.iteraciones,
+    )}
+
+    if args.json:
+        print(json.dumps({"diferencias": diferencias, "resultados": resultados}, ensure_ascii=False, indent=2))
+    else:
+        print(f"\n  {'WOD':<27}{'motor':<10}{'mediana ms':>11}{'p95 ms':>9}{'pico MiB':>10}{'KiB':>8}{'págs':>6}")
+        for caso, por_motor in resultados.items():
+            for motor, r in por_motor.items():
+                print(
+                    f"  {caso:<27}{motor:<10}{r['mediana_ms']:>11.1f}{r['p95_ms']:>9.1f}"
+                    f"{r['pico_mib']:>10.1f}{r['kib']:>8.0f}{r['paginas']:>6}"
+                )
+    return 1 if diferencias else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
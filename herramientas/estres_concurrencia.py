@@ -0,0 +1,154 @@
+"""Prueba de estrés: genera PDFs en varios hilos a la vez y comprueba que salen bien.
+
+Primero genera uno a uno los PDFs de referencia de ``--specs`` specs distintas
+con cada motor. Con ``rl_config.invariant`` los PDFs no llevan fecha de
+creación ni identificadores aleatorios, así que un PDF correcto coincide byte a
+byte con su referencia. Después:
+
+1. Arranque en frío: vacía el contexto de renderizado y las cachés, y lanza
+   todos los PDFs a la vez con ``--hilos`` hilos, que compiten por resolver
+   fuentes, estilos e imágenes.
+2. Escalado: repite la tanda con 1, 2, 4 … ``--hilos`` hilos, como sesiones de
+   Streamlit simultáneas. Informa de PDFs por segundo, de la aceleración frente
+   a un hilo y del tiempo que los hilos esperan en los candados del contexto y
+   de la caché de artefactos.
+
+Sale con 1 si algún PDF difiere de su referencia o falla.
+
+Uso:
+    python -m herramientas.estres_concurrencia
+    python -m herramientas.estres_concurrencia --hilos 16 --specs 30 --motor completo
+"""
+
+import argparse
+import sys
+import time
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+from typing import List, Optional
+
+from reportlab import rl_config
+
+from crossfit import contexto
+from crossfit.cache import almacen
+from crossfit.pdf import MOTORES_PDF
+from herramientas.fugas_memoria import caches_acotadas, specs_variadas
+
+
+class _CandadoMedido:
+    """Envuelve un candado y acumula cuántas veces se adquiere y cuánto se espera."""
+
+    def __init__(self, candado):
+        self.candado = candado
+        self.adquisiciones = 0
+        self.espera = 0.0
+
+    def acquire(self, *args, **kwargs):
+        inicio = time.perf_counter()
+        adquirido = self.candado.acquire(*args, **kwargs)
+        self.espera += time.perf_counter() - inicio
+        self.adquisiciones += 1
+        return adquirido
+
+    def release(self):
+        self.candado.release()
+
+    __enter__ = acquire
+
+    def __exit__(self, *excepcion):
+        self.release()
+
+
+def vaciar_todo():
+    """Deja el proceso como recién arrancado: sin contexto de renderizado ni cachés."""
+    contexto._contexto = None
+    for _, funcion in caches_acotadas():
+        funcion.cache_clear()
+
+
+def tanda(tareas, hilos: int, errores: Counter) -> float:
+    """Genera todas las ``tareas`` con ``hilos`` hilos; devuelve los segundos empleados."""
+    def generar(tarea):
+        motor, spec, referencia = tarea
+        try:
+            pdf = MOTORES_PDF[motor](spec).getvalue()
+        except Exception as exc:
+            return f"{motor}: {type(exc).__name__}: {exc}"
+        return None if pdf == referencia else f"{motor}: el PDF de {spec.tipo} no coincide con la referencia"
+
+    inicio = time.perf_counter()
+    with ThreadPoolExecutor(hilos, thread_name_prefix="estres") as grupo:
+        for error in grupo.map(generar, tareas):
+            if error:
+                errores[error] += 1
+    return time.perf_counter() - inicio
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--hilos", type=int, default=8, help="máximo de hilos simultáneos")
+    parser.add_argument("--specs", type=int, default=12, help="specs distintas por motor")
+    parser.add_argument("--repeticiones", type=int, default=2, help="veces que se genera cada PDF en cada tanda")
+    parser.add_argument("--motor", choices=["todos", *MOTORES_PDF], default="todos")
+    parser.add_argument("--semilla", type=int, default=1)
+    args = parser.parse_args(argv)
+
+    rl_config.invariant = 1
+    motores = list(MOTORES_PDF) if args.motor == "todos" else [args.motor]
+    specs = specs_variadas(args.semilla)
+    tareas = []
+    for _ in range(max(1, args.specs)):
+        spec = next(specs)
+        for motor in motores:
+            tareas.append((motor, spec, MOTORES_PDF[motor](spec).getvalue()))
+    # Dos generaciones seguidas deben coincidir; si no, la comparación no sirve
+    motor, spec, referencia = tareas[0]
+    if MOTORES_PDF[motor](spec).getvalue() != referencia:
+        print("Los PDFs no son reproducibles: no se pueden comparar con la referencia.", file=sys.stderr)
+        return 1
+    tareas *= max(1, args.repeticiones)
+
+    candados = {"contexto": _CandadoMedido(contexto._bloqueo)}
+    contexto._bloqueo = candados["contexto"]
+    if hasattr(almacen, "_bloqueo"):
+        candados["caché"] = _CandadoMedido(almacen._bloqueo)
+        almacen._bloqueo = candados["caché"]
+
+    errores = Counter()
+    maximo = max(1, args.hilos)
+    vaciar_todo()
+    segundos = tanda(tareas, maximo, errores)
+    print(f"Arranque en frío con {maximo} hilos: {len(tareas)} PDFs en {segundos:.1f} s, "
+          f"{sum(errores.values())} erróneos, {candados['contexto'].adquisiciones} adquisiciones del candado del contexto")
+
+    print(f"\n{'hilos':>6}{'PDFs/s':>10}{'acelera':>10}{'erróneos':>10}" + "".join(
+        f"{'espera ' + nombre:>18}" for nombre in candados
+    ))
+    hilos, referencia_por_segundo = 1, None
+    while True:
+        for candado in candados.values():
+            candado.adquisiciones, candado.espera = 0, 0.0
+        previos = sum(errores.values())
+        por_segundo = len(tareas) / tanda(tareas, hilos, errores)
+        referencia_por_segundo = referencia_por_segundo or por_segundo
+        print(
+            f"{hilos:>6}{por_segundo:>10.1f}{por_segundo / referencia_por_segundo:>9.2f}x"
+            f"{sum(errores.values()) - previos:>10}" + "".join(
+                f"{f'{1000 * candado.espera:.1f} ms / {candado.adquisiciones}':>18}" for candado in candados.values()
+            )
+        )
+        if hilos >= maximo:
+            break
+        hilos = min(hilos * 2, maximo)
+
+    if errores:
+        print(f"\n{sum(errores.values())} PDFs erróneos:", file=sys.stderr)
+        for error, veces in errores.most_common(10):
+            print(f"  {veces} × {error}", file=sys.stderr)
+        return 1
+    print("\nTodos los PDFs coinciden con su referencia.")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,197 @@
+"""Busca fugas de memoria generando miles de PDFs con specs distintas.
+
+Genera ``--generaciones`` PDFs alternando motores y WODs, con nombres,
+ejercicios y repeticiones distintos en cada uno. Cada ``--intervalo``
+generaciones vacía las cachés acotadas (``lru_cache`` de ``crossfit``; las de
+un solo valor, como las fuentes, se conservan) para que lo que quede retenido
+sea una fuga y no una caché llenándose, y anota los bloques que tiene
+reservados Python y la memoria residente.
+
+``tracemalloc`` multiplica por ocho el tiempo de cada PDF, así que solo se
+activa en las últimas ``--trazadas`` generaciones, y la referencia se toma a
+mitad de esa ventana: las cachés internas de Python y de las librerías que
+sustituyen entradas viejas por nuevas ya solo tienen entradas trazadas y no
+parecen crecer. La segunda mitad basta para medir lo que retiene cada PDF y ver
+qué líneas y archivos han crecido. También se muestran los tipos de objeto que
+más han aumentado en toda la ejecución.
+
+Sale con 1 si la memoria retenida por PDF supera ``--umbral-kib``.
+
+Uso:
+    python -m herramientas.fugas_memoria
+    python -m herramientas.fugas_memoria --generaciones 5000 --motor completo --umbral-kib 0.5
+"""
+
+import argparse
+import gc
+import random
+import sys
+import time
+import tracemalloc
+from collections import Counter
+from typing import List, Optional, Tuple
+
+from crossfit.catalogo import catalogo_actual
+from crossfit.metricas import memoria_residente
+from crossfit.pdf import MOTORES_PDF
+from crossfit.spec import EjercicioSpec, SpecInvalida
+from herramientas.benchmark_pdf import construir_casos
+
+NOMBRES = ("Sofía", "Mateo", "Lucía", "Diego", "Valentina", "Martín", "Emma", "Hugo", "Julia", "Leo")
+APELLIDOS = ("González", "Ruiz", "Pérez", "Martín", "López", "Sánchez", "Díaz", "Romero")
+# Ruido de la propia medición
+_FILTROS = (
+    tracemalloc.Filter(False, tracemalloc.__file__),
+    tracemalloc.Filter(False, "<frozen importlib._bootstrap>"),
+    tracemalloc.Filter(False, "<frozen importlib._bootstrap_external>"),
+    tracemalloc.Filter(False, "<unknown>"),
+)
+
+
+def specs_variadas(semilla: int):
+    """Genera specs válidas sin fin, cada una distinta de la anterior."""
+    aleatorio = random.Random(semilla)
+    bases = [caso["spec"] for caso in construir_casos()]
+    ejercicios = [
+        (categoria, nombre) for categoria, nombres in catalogo_actual().ejercicios.items() for nombre in nombres
+    ]
+    numero = 0
+    while True:
+        base = aleatorio.choice(bases)
+        elegidos = aleatorio.sample(ejercicios, len(base.ejercicios))
+        nuevos = [
+            EjercicioSpec(categoria, nombre, None if original.repeticiones is None else aleatorio.randint(5, 20))
+            for (categoria, nombre), original in zip(elegidos, base.ejercicios)
+        ]
+        numero += 1
+        try:
+            yield base.reemplazar(
+                nombre=f"{aleatorio.choice(NOMBRES)} {aleatorio.choice(APELLIDOS)} {numero}",
+                grupo=f"{aleatorio.randint(1, 4)}°{aleatorio.choice('ABC')}",
+                ejercicios=nuevos,
+            ).validar()
+        except SpecInvalida:
+            # Alguna combinación que el WOD no admite: se usa la base tal cual
+            yield base
+
+
+def caches_acotadas() -> List[Tuple[str, object]]:
+    """Funciones con ``lru_cache`` de los módulos de ``crossfit`` ya importados."""
+    encontradas = []
+    for nombre_modulo, modulo in list(sys.modules.items()):
+        if not nombre_modulo.startswith("crossfit") or modulo is None:
+            continue
+        for nombre, valor in vars(modulo).items():
+            if hasattr(valor, "cache_info") and getattr(valor, "__module__", None) == nombre_modulo:
+                encontradas.append((f"{nombre_modulo}.{nombre}", valor))
+    return sorted(encontradas, key=lambda par: par[0])
+
+
+def vaciar_caches(caches) -> dict:
+    """Vacía las cachés de más de un valor; devuelve cuántas entradas tenía cada una."""
+    llenado = {}
+    for nombre, funcion in caches:
+        info = funcion.cache_info()
+        llenado[nombre] = (info.currsize, info.maxsize)
+        if info.maxsize is None or info.maxsize > 1:
+            funcion.cache_clear()
+    return llenado
+
+
+def contar_objetos() -> Counter:
+    return Counter(type(objeto).__qualname__ for objeto in gc.get_objects())
+
+
+def limpiar(caches) -> dict:
+    llenado = vaciar_caches(caches)
+    gc.collect()
+    return llenado
+
+
+def instantanea():
+    return tracemalloc.take_snapshot().filter_traces(_FILTROS)
+
+
+def trazada(captura) -> int:
+    return sum(estadistica.size for estadistica in captura.statistics("filename"))
+
+
+def _kib(valor: float) -> str:
+    return f"{valor / 1024:+,.1f} KiB"
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--generaciones", type=int, default=2000)
+    parser.add_argument("--intervalo", type=int, default=250, help="generaciones entre mediciones")
+    parser.add_argument("--trazadas", type=int, default=200, help="últimas generaciones con tracemalloc activo")
+    parser.add_argument("--calentamiento", type=int, default=50, help="generaciones antes de empezar a medir")
+    parser.add_argument("--motor", choices=["todos", *MOTORES_PDF], default="todos")
+    parser.add_argument("--umbral-kib", type=float, default=1.0, help="máximo de memoria retenida por PDF")
+    parser.add_argument("--top", type=int, default=15)
+    parser.add_argument("--marcos", type=int, default=1, help="marcos de pila que guarda tracemalloc")
+    parser.add_argument("--semilla", type=int, default=1)
+    args = parser.parse_args(argv)
+
+    motores = list(MOTORES_PDF.items()) if args.motor == "todos" else [(args.motor, MOTORES_PDF[args.motor])]
+    specs = specs_variadas(args.semilla)
+    for numero in range(max(1, args.calentamiento)):
+        motores[numero % len(motores)][1](next(specs)).getvalue()
+
+    caches = caches_acotadas()
+    limpiar(caches)
+    objetos_base = contar_objetos()
+    bloques_base, rss_base = sys.getallocatedblocks(), memoria_residente()
+    trazadas = min(max(2, args.trazadas), args.generaciones)
+    inicio_traza, inicio_medida = args.generaciones - trazadas, args.generaciones - trazadas // 2
+    medidas = args.generaciones - inicio_medida
+    base = ultima = None
+    if inicio_traza == 0:
+        tracemalloc.start(max(1, args.marcos))
+    print(f"{'generaciones':>12}{'bloques':>12}{'RSS':>16}{'trazada':>16}{'s':>8}")
+
+    inicio = time.perf_counter()
+    for numero in range(1, args.generaciones + 1):
+        # La referencia al PDF se suelta enseguida, como en la app tras servirlo
+        motores[numero % len(motores)][1](next(specs)).getvalue()
+        if numero % args.intervalo and numero not in (inicio_traza, inicio_medida, args.generaciones):
+            continue
+        llenado = limpiar(caches)
+        if numero == inicio_traza:
+            tracemalloc.start(max(1, args.marcos))
+        elif numero == inicio_medida:
+            base = instantanea()
+        elif base is not None:
+            ultima = instantanea()
+        print(
+            f"{numero:>12}{sys.getallocatedblocks() - bloques_base:>+12,}{_kib(memoria_residente() - rss_base):>16}"
+            f"{_kib(trazada(ultima) - trazada(base)) if ultima else '—':>16}{time.perf_counter() - inicio:>8.0f}"
+        )
+    tracemalloc.stop()
+    retenida = (trazada(ultima) - trazada(base)) / medidas
+
+    print("\nLíneas que más han crecido:")
+    for diferencia in ultima.compare_to(base, "lineno")[:args.top]:
+        marco = diferencia.traceback[0]
+        print(f"  {_kib(diferencia.size_diff):>14}  {diferencia.count_diff:+8d} bloques  {marco.filename}:{marco.lineno}")
+    print("\nArchivos que más han crecido:")
+    for diferencia in ultima.compare_to(base, "filename")[:args.top]:
+        print(f"  {_kib(diferencia.size_diff):>14}  {diferencia.traceback[0].filename}")
+    aumentos = (contar_objetos() - objetos_base).most_common(args.top)
+    if aumentos:
+        print("\nObjetos vivos que han aumentado: " + ", ".join(f"{tipo} +{n}" for tipo, n in aumentos))
+    print("\nCachés acotadas (entradas antes de vaciarlas por última vez):")
+    for nombre, (entradas, maximo) in llenado.items():
+        if entradas:
+            print(f"  {nombre}: {entradas}/{maximo}")
+
+    resumen = f"Memoria retenida por PDF: {retenida:,.1f} B (en los últimos {medidas} PDFs, umbral {args.umbral_kib} KiB)"
+    if retenida > args.umbral_kib * 1024:
+        print(f"\nFUGA DE MEMORIA. {resumen}", file=sys.stderr)
+        return 1
+    print(f"\n{resumen}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
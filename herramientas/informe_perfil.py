@@ -0,0 +1,81 @@
+"""Resume los registros de perfilado de reruns (``CROSSFIT_PERFIL_ARCHIVO``).
+
+Agrupa por sección del script el tiempo, los elementos creados y los bytes de
+delta para ver qué partes de ``crossfit_trainer.py`` dominan la latencia.
+
+Uso:
+    python -m herramientas.informe_perfil perfil.jsonl
+"""
+
+import argparse
+import json
+import sys
+from pathlib import Path
+from typing import List, Optional
+
+from herramientas.prueba_carga import percentil
+
+
+def leer_registros(rutas: List[Path]) -> List[dict]:
+    registros = []
+    for ruta in rutas:
+        with open(ruta, encoding="utf-8") as fh:
+            for linea in fh:
+                linea = linea.strip()
+                if linea:
+                    registros.append(json.loads(linea))
+    return registros
+
+
+def resumir(registros: List[dict]) -> List[dict]:
+    por_seccion = {}
+    for registro in registros:
+        for seccion in registro["secciones"]:
+            datos = por_seccion.setdefault(seccion["seccion"], {"segundos": [], "elementos": 0, "bytes": 0})
+            datos["segundos"].append(seccion["segundos"])
+            datos["elementos"] += seccion["elementos"] + seccion.get("bloques", 0)
+            datos["bytes"] += seccion["bytes"]
+    total = sum(r["segundos"] for r in registros) or 1.0
+    filas = []
+    for nombre, datos in por_seccion.items():
+        tiempos = sorted(datos["segundos"])
+        n = len(tiempos)
+        filas.append({
+            "seccion": nombre,
+            "reruns": n,
+            "media_ms": 1000 * sum(tiempos) / n,
+            "p95_ms": 1000 * percentil(tiempos, 95),
+            "porcentaje": 100 * sum(tiempos) / total,
+            "elementos": datos["elementos"] / n,
+            "kib": datos["bytes"] / n / 1024,
+        })
+    return sorted(filas, key=lambda fila: fila["media_ms"], reverse=True)
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("archivos", nargs="+", type=Path)
+    args = parser.parse_args(argv)
+
+    registros = leer_registros(args.archivos)
+    if not registros:
+        print("No hay registros de perfilado.", file=sys.stderr)
+        return 1
+    tiempos = sorted(r["segundos"] for r in registros)
+    print(
+        f"{len(registros)} reruns · media {1000 * sum(tiempos) / len(tiempos):.1f} ms · "
+        f"p95 {1000 * percentil(tiempos, 95):.1f} ms · "
+        f"{sum(r['elementos'] for r in registros) / len(registros):.0f} elementos · "
+        f"{sum(r['bytes'] for r in registros) / len(registros) / 1024:.1f} KiB por rerun"
+    )
+    print(f"\n  {'sección':<18}{'media ms':>10}{'p95 ms':>10}{'% tiempo':>10}{'elementos':>11}{'KiB':>9}")
+    for fila in resumir(registros):
+        print(
+            f"  {fila['seccion']:<18}{fila['media_ms']:>10.2f}{fila['p95_ms']:>10.2f}"
+            f"{fila['porcentaje']:>10.1f}{fila['elementos']:>11.1f}{fila['kib']:>9.1f}"
+        )
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,428 @@
+"""Prueba de carga: simula una clase completa usando la aplicación a la vez.
+
+Arranca (o reutiliza) un servidor ``streamlit run crossfit_trainer.py`` y conecta
+N usuarios virtuales por websocket, igual que lo haría el navegador. Cada usuario
+rellena sus datos, elige el WOD del escenario, marca ejercicios, cambia las
+repeticiones y descarga el PDF. Al terminar se informa del rendimiento (interacciones
+por segundo), de los percentiles de latencia por tipo de interacción y de la
+evolución de CPU y memoria (RSS) del servidor.
+
+Uso:
+    python -m herramientas.prueba_carga --usuarios 30
+    python -m herramientas.prueba_carga --usuarios 10 --escenario Tabata --escenario EMOM
+    python -m herramientas.prueba_carga --url http://localhost:8501 --pid 1234
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import socket
+import subprocess
+import sys
+import threading
+import time
+from pathlib import Path
+from typing import Dict, List, Optional
+
+from streamlit.proto.BackMsg_pb2 import BackMsg
+from streamlit.proto.ForwardMsg_pb2 import ForwardMsg
+from streamlit.proto.WidgetStates_pb2 import WidgetState
+from tornado.httpclient import AsyncHTTPClient, HTTPClientError
+from tornado.websocket import websocket_connect
+
+SCRIPT_APP = Path(__file__).resolve().parent.parent / "crossfit_trainer.py"
+ETIQUETA_NOMBRE = "Nombre completo:"
+ETIQUETA_GRUPO = "Grupo:"
+ETIQUETA_WOD = "Selecciona el WOD:"
+PREFIJO_EJERCICIO = "Incluir "
+PREFIJOS_REPETICIONES = ("Repeticiones para", "Tiempo (segundos)")
+# Ejercicios que exige cada WOD para habilitar la descarga (con los valores por defecto).
+EJERCICIOS_POR_WOD = {"Tabata": 4, "Circuito de Entrenamiento": 6}
+EJERCICIOS_POR_DEFECTO = 3
+TIPOS_INTERACCION = ["carga", "datos", "wod", "ejercicio", "reps", "descarga"]
+PERCENTILES = (50, 90, 95, 99)
+
+
+class ErrorSesion(Exception):
+    pass
+
+
+def percentil(valores: List[float], p: float) -> float:
+    """Percentil por rango más cercano sobre una lista ya ordenada."""
+    if not valores:
+        return 0.0
+    indice = max(0, min(len(valores) - 1, int(round(p / 100 * len(valores) + 0.5)) - 1))
+    return valores[indice]
+
+
+class MuestreadorProceso:
+    """Muestrea CPU (%) y RSS (MiB) de un proceso en un hilo aparte."""
+
+    def __init__(self, pid: int, intervalo: float = 0.5):
+        self.pid = pid
+        self.intervalo = intervalo
+        self.muestras = []
+        self._parar = threading.Event()
+        self._hilo = threading.Thread(target=self._bucle, daemon=True)
+        self._ticks = os.sysconf("SC_CLK_TCK") if hasattr(os, "sysconf") else 100
+        self._pagina = os.sysconf("SC_PAGE_SIZE") if hasattr(os, "sysconf") else 4096
+
+    def _leer(self):
+        try:
+            with open(f"/proc/{self.pid}/stat") as fh:
+                campos = fh.read().rsplit(")", 1)[1].split()
+            with open(f"/proc/{self.pid}/statm") as fh:
+                residentes = int(fh.read().split()[1])
+        except (OSError, IndexError, ValueError):
+            return None
+        cpu_segundos = (int(campos[11]) + int(campos[12])) / self._ticks
+        return cpu_segundos, residentes * self._pagina / (1024 * 1024)
+
+    def _bucle(self):
+        inicio = time.perf_counter()
+        anterior = self._leer()
+        instante_anterior = inicio
+        while not self._parar.wait(self.intervalo):
+            actual = self._leer()
+            ahora = time.perf_counter()
+            if actual is None or anterior is None:
+                anterior, instante_anterior = actual, ahora
+                continue
+            cpu = 100 * (actual[0] - anterior[0]) / max(ahora - instante_anterior, 1e-9)
+            self.muestras.append({"t": round(ahora - inicio, 2), "cpu": round(cpu, 1), "rss_mib": round(actual[1], 1)})
+            anterior, instante_anterior = actual, ahora
+
+    def iniciar(self):
+        self._hilo.start()
+
+    def detener(self):
+        self._parar.set()
+        self._hilo.join()
+
+
+class UsuarioVirtual:
+    """Una pestaña del navegador conectada al servidor de Streamlit."""
+
+    def __init__(self, url_base: str, numero: int, registro: List[dict], escenario: str):
+        self.url_base = url_base.rstrip("/")
+        self.numero = numero
+        self.registro = registro
+        self.escenario = escenario
+        self.elementos: Dict[str, list] = {}
+        self.estados: Dict[str, WidgetState] = {}
+        self._ws = None
+        self._page_script_hash = ""
+
+    async def conectar(self):
+        url_ws = self.url_base.replace("http", "ws", 1) + "/_stcore/stream"
+        self._ws = await websocket_connect(url_ws, max_message_size=64 * 1024 * 1024)
+
+    def cerrar(self):
+        if self._ws is not None:
+            self._ws.close()
+
+    async def _rerun(self):
+        mensaje = BackMsg()
+        mensaje.rerun_script.query_string = ""
+        mensaje.rerun_script.page_script_hash = self._page_script_hash
+        mensaje.rerun_script.widget_states.widgets.extend(self.estados.values())
+        await self._ws.write_message(mensaje.SerializeToString(), binary=True)
+        # Los disparadores (botones) sólo viajan en el rerun que provocan.
+        self.estados = {clave: estado for clave, estado in self.estados.items() if not estado.trigger_value}
+
+        self.elementos = {}
+        while True:
+            datos = await self._ws.read_message()
+            if datos is None:
+                raise ErrorSesion("El servidor cerró la conexión")
+            recibido = ForwardMsg()
+            recibido.ParseFromString(datos)
+            tipo = recibido.WhichOneof("type")
+            if tipo == "new_session":
+                self._page_script_hash = recibido.new_session.page_script_hash
+            elif tipo == "delta" and recibido.delta.WhichOneof("type") == "new_element":
+                elemento = recibido.delta.new_element
+                clase = elemento.WhichOneof("type")
+                if clase == "exception":
+                    raise ErrorSesion(f"Excepción en el script: {elemento.exception.message}")
+                self.elementos.setdefault(clase, []).append(getattr(elemento, clase))
+            elif tipo == "script_finished":
+                if recibido.script_finished == ForwardMsg.FINISHED_WITH_COMPILE_ERROR:
+                    raise ErrorSesion("Error de compilación del script")
+                if recibido.script_finished == ForwardMsg.FINISHED_SUCCESSFULLY:
+                    return
+
+    def _buscar(self, clase: str, etiqueta: str = "", prefijos=()):
+        for widget in self.elementos.get(clase, []):
+            if widget.label == etiqueta or (prefijos and widget.label.startswith(prefijos)):
+                return widget
+        return None
+
+    async def _interaccion(self, tipo: str, corrutina):
+        inicio = time.perf_counter()
+        error = None
+        try:
+            await corrutina
+        except (ErrorSesion, HTTPClientError, OSError) as exc:
+            error = str(exc)
+        self.registro.append({
+            "escenario": self.escenario,
+            "tipo": tipo,
+            "segundos": time.perf_counter() - inicio,
+            "error": error,
+        })
+        if error:
+            raise ErrorSesion(error)
+
+    async def _fijar_y_ejecutar(self, widget, **valor):
+        estado = WidgetState(id=widget.id, **valor)
+        self.estados[widget.id] = estado
+        await self._rerun()
+
+    async def _descargar(self, boton):
+        # El navegador descarga el archivo ya publicado y, a la vez, avisa al servidor del clic.
+        respuesta = await AsyncHTTPClient().fetch(self.url_base + boton.url)
+        if not respuesta.body.startswith(b"%PDF"):
+            raise ErrorSesion("La descarga no devolvió un PDF")
+        await self._fijar_y_ejecutar(boton, trigger_value=True)
+
+    async def recorrer(self, indice_wod: int, clave_wod: str):
+        await self.conectar()
+        try:
+            await self._interaccion("carga", self._rerun())
+            for etiqueta, valor in ((ETIQUETA_NOMBRE, f"Alumno {self.numero}"), (ETIQUETA_GRUPO, "3°A")):
+                campo = self._buscar("text_input", etiqueta)
+                if campo is None:
+                    raise ErrorSesion(f"No se encontró el campo '{etiqueta}'")
+                await self._interaccion("datos", self._fijar_y_ejecutar(campo, string_value=valor))
+
+            selector = self._buscar("selectbox", ETIQUETA_WOD)
+            if selector is None:
+                raise ErrorSesion("No se encontró el selector de WOD")
+            await self._interaccion("wod", self._fijar_y_ejecutar(selector, int_value=indice_wod))
+
+            necesarios = EJERCICIOS_POR_WOD.get(clave_wod, EJERCICIOS_POR_DEFECTO)
+            casillas = [c for c in self.elementos.get("checkbox", []) if c.label.startswith(PREFIJO_EJERCICIO)]
+            # Cada usuario empieza en un punto distinto del catálogo para variar los PDFs.
+            desplazamiento = self.numero % max(1, len(casillas) - necesarios + 1)
+            for casilla in casillas[desplazamiento:desplazamiento + necesarios]:
+                await self._interaccion("ejercicio", self._fijar_y_ejecutar(casilla, bool_value=True))
+
+            repeticiones = self._buscar("number_input", prefijos=PREFIJOS_REPETICIONES)
+            if repeticiones is not None:
+                nuevo = (repeticiones.default or 10) + (repeticiones.step or 1)
+                if repeticiones.has_max:
+                    nuevo = min(nuevo, repeticiones.max)
+                if repeticiones.data_type == repeticiones.INT:
+                    valor = {"int_value": int(nuevo)}
+                else:
+                    valor = {"double_value": float(nuevo)}
+                await self._interaccion("reps", self._fijar_y_ejecutar(repeticiones, **valor))
+
+            boton = (self.elementos.get("download_button") or [None])[0]
+            if boton is None:
+                raise ErrorSesion("No apareció el botón de descarga")
+            await self._interaccion("descarga", self._descargar(boton))
+        finally:
+            self.cerrar()
+
+
+async def _ejecutar_escenario(url_base, indice, clave, usuarios, iteraciones, rampa, registro):
+    async def usuario(numero):
+        await asyncio.sleep(rampa * numero / max(usuarios, 1))
+        for _ in range(iteraciones):
+            try:
+                await UsuarioVirtual(url_base, numero, registro, clave).recorrer(indice, clave)
+            except (ErrorSesion, OSError) as exc:
+                registro.append({"escenario": clave, "tipo": "sesion", "segundos": 0.0, "error": str(exc)})
+
+    inicio = time.perf_counter()
+    await asyncio.gather(*(usuario(n) for n in range(usuarios)))
+    return time.perf_counter() - inicio
+
+
+async def _descubrir_wods(url_base) -> List[str]:
+    explorador = UsuarioVirtual(url_base, 0, [], "")
+    await explorador.conectar()
+    try:
+        await explorador._rerun()
+    finally:
+        explorador.cerrar()
+    selector = explorador._buscar("selectbox", ETIQUETA_WOD)
+    if selector is None:
+        raise ErrorSesion("No se encontró el selector de WOD")
+    return list(selector.options)
+
+
+def _clave_wod(etiqueta: str) -> str:
+    # Las opciones llegan formateadas ("AMRAP (As Many ...)"); la clave precede al paréntesis.
+    return etiqueta.split(" (")[0]
+
+
+def _puerto_libre() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def _arrancar_servidor(puerto: int, archivo_perfil: Optional[Path] = None) -> subprocess.Popen:
+    entorno = dict(os.environ)
+    if archivo_perfil:
+        entorno["CROSSFIT_PERFIL"] = "1"
+        entorno["CROSSFIT_PERFIL_ARCHIVO"] = str(archivo_perfil.resolve())
+    comando = [
+        sys.executable, "-m", "streamlit", "run", str(SCRIPT_APP),
+        "--server.headless", "true",
+        "--server.port", str(puerto),
+        "--server.fileWatcherType", "none",
+        "--browser.gatherUsageStats", "false",
+    ]
+    return subprocess.Popen(comando, env=entorno, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+
+
+async def _esperar_servidor(url_base: str, limite: float = 60.0):
+    cliente = AsyncHTTPClient()
+    fin = time.monotonic() + limite
+    while time.monotonic() < fin:
+        try:
+            await cliente.fetch(url_base + "/_stcore/health")
+            return
+        except (HTTPClientError, OSError):
+            await asyncio.sleep(0.3)
+    raise ErrorSesion(f"El servidor no respondió en {limite:.0f} s")
+
+
+def resumir(registro: List[dict], duraciones: Dict[str, float], muestras: List[dict]) -> dict:
+    resumen = {"escenarios": {}, "interacciones": {}, "recursos": {}}
+    for escenario, duracion in duraciones.items():
+        propios = [r for r in registro if r["escenario"] == escenario]
+        correctos = [r for r in propios if not r["error"] and r["tipo"] != "sesion"]
+        resumen["escenarios"][escenario] = {
+            "interacciones": len(correctos),
+            "errores": sum(1 for r in propios if r["error"]),
+            "segundos": round(duracion, 2),
+            "interacciones_por_segundo": round(len(correctos) / duracion, 2) if duracion else 0.0,
+            "p95_ms": round(1000 * percentil(sorted(r["segundos"] for r in correctos), 95), 1),
+            "mensajes_error": sorted({r["error"] for r in propios if r["error"]})[:5],
+        }
+    for tipo in TIPOS_INTERACCION:
+        valores = sorted(r["segundos"] for r in registro if r["tipo"] == tipo and not r["error"])
+        if not valores:
+            continue
+        datos = {"n": len(valores), "media_ms": round(1000 * sum(valores) / len(valores), 1)}
+        for p in PERCENTILES:
+            datos[f"p{p}_ms"] = round(1000 * percentil(valores, p), 1)
+        datos["max_ms"] = round(1000 * valores[-1], 1)
+        resumen["interacciones"][tipo] = datos
+    if muestras:
+        cpu = [m["cpu"] for m in muestras]
+        rss = [m["rss_mib"] for m in muestras]
+        resumen["recursos"] = {
+            "cpu_media": round(sum(cpu) / len(cpu), 1),
+            "cpu_max": max(cpu),
+            "rss_inicial_mib": rss[0],
+            "rss_max_mib": max(rss),
+            "rss_final_mib": rss[-1],
+            "serie": muestras,
+        }
+    return resumen
+
+
+def imprimir_resumen(resumen: dict):
+    print("\nEscenarios")
+    print(f"  {'WOD':<28}{'inter.':>8}{'errores':>9}{'seg':>9}{'inter/s':>9}{'p95 ms':>9}")
+    for escenario, datos in resumen["escenarios"].items():
+        print(
+            f"  {escenario:<28}{datos['interacciones']:>8}{datos['errores']:>9}"
+            f"{datos['segundos']:>9.1f}{datos['interacciones_por_segundo']:>9.2f}{datos['p95_ms']:>9.1f}"
+        )
+        for mensaje in datos["mensajes_error"]:
+            print(f"    ! {mensaje}")
+    print("\nLatencia por interacción (ms)")
+    cabecera = "".join(f"{'p' + str(p):>9}" for p in PERCENTILES)
+    print(f"  {'tipo':<12}{'n':>7}{'media':>9}{cabecera}{'max':>9}")
+    for tipo, datos in resumen["interacciones"].items():
+        valores = "".join(f"{datos[f'p{p}_ms']:>9.1f}" for p in PERCENTILES)
+        print(f"  {tipo:<12}{datos['n']:>7}{datos['media_ms']:>9.1f}{valores}{datos['max_ms']:>9.1f}")
+    recursos = resumen["recursos"]
+    if recursos:
+        print("\nServidor")
+        print(f"  CPU media {recursos['cpu_media']:.1f}% · máxima {recursos['cpu_max']:.1f}%")
+        print(
+            f"  RSS inicial {recursos['rss_inicial_mib']:.1f} MiB · máxima {recursos['rss_max_mib']:.1f} MiB"
+            f" · final {recursos['rss_final_mib']:.1f} MiB"
+        )
+        paso = max(1, len(recursos["serie"]) // 20)
+        print("  t(s)     CPU%   RSS MiB")
+        for muestra in recursos["serie"][::paso]:
+            print(f"  {muestra['t']:<8.1f}{muestra['cpu']:>6.1f}{muestra['rss_mib']:>10.1f}")
+
+
+async def _principal(args) -> dict:
+    servidor = None
+    url_base = args.url
+    pid = args.pid
+    if not url_base:
+        puerto = _puerto_libre()
+        servidor = _arrancar_servidor(puerto, args.perfil)
+        url_base = f"http://127.0.0.1:{puerto}"
+        pid = servidor.pid
+    muestreador = MuestreadorProceso(pid, args.intervalo) if pid else None
+    try:
+        await _esperar_servidor(url_base)
+        opciones = await _descubrir_wods(url_base)
+        seleccion = [
+            (indice, _clave_wod(etiqueta)) for indice, etiqueta in enumerate(opciones)
+            if not args.escenario or any(etiqueta.startswith(nombre) for nombre in args.escenario)
+        ]
+        if not seleccion:
+            raise ErrorSesion(f"Ningún WOD coincide con {args.escenario}; disponibles: {opciones}")
+        if muestreador:
+            muestreador.iniciar()
+        registro: List[dict] = []
+        duraciones = {}
+        for indice, clave in seleccion:
+            print(f"Escenario {clave}: {args.usuarios} usuarios x {args.iteraciones} iteraciones…", flush=True)
+            duraciones[clave] = await _ejecutar_escenario(
+                url_base, indice, clave, args.usuarios, args.iteraciones, args.rampa, registro
+            )
+    finally:
+        if muestreador and muestreador._hilo.is_alive():
+            muestreador.detener()
+        if servidor is not None:
+            servidor.terminate()
+            servidor.wait(timeout=10)
+    return resumir(registro, duraciones, muestreador.muestras if muestreador else [])
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--usuarios", type=int, default=10, help="usuarios virtuales simultáneos")
+    parser.add_argument("--iteraciones", type=int, default=1, help="recorridos completos por usuario")
+    parser.add_argument("--rampa", type=float, default=2.0, help="segundos para conectar a todos los usuarios")
+    parser.add_argument("--escenario", action="append", help="WOD a probar (repetible); por defecto, todos")
+    parser.add_argument("--url", help="servidor ya arrancado, p. ej. http://localhost:8501")
+    parser.add_argument("--pid", type=int, help="PID del servidor indicado con --url para medir CPU y RSS")
+    parser.add_argument("--intervalo", type=float, default=0.5, help="segundos entre muestras de CPU/RSS")
+    parser.add_argument("--json", type=Path, help="guarda el resumen completo en este archivo")
+    parser.add_argument(
+        "--perfil", type=Path,
+        help="activa el perfilado de reruns en el servidor arrancado y lo guarda en este archivo "
+             "(resúmelo con herramientas.informe_perfil)",
+    )
+    args = parser.parse_args(argv)
+
+    try:
+        resumen = asyncio.run(_principal(args))
+    except ErrorSesion as exc:
+        print(f"Error: {exc}", file=sys.stderr)
+        return 1
+    imprimir_resumen(resumen)
+    if args.json:
+        args.json.write_text(json.dumps(resumen, ensure_ascii=False, indent=2), encoding="utf-8")
+    return 1 if any(datos["errores"] for datos in resumen["escenarios"].values()) else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,222 @@
+import csv
+import hmac
+import os
+import sqlite3
+import time
+from datetime import datetime
+
+import streamlit as st
+
+from crossfit.admision import RechazoAdmision, control_pdf, id_sesion_actual
+from crossfit.analitica import informe_historial, reparto
+from crossfit.catalogo import fijar_catalogo, vigilante
+from crossfit.datos import TIPOS_CIRCUITO
+from crossfit.estaciones import INVENTARIO_POR_DEFECTO, MINUTOS_POR_TURNO, categorias_material, plan_clase
+from crossfit.historial import historial, mostrar_historial
+from crossfit.importacion import importar_csv
+from crossfit.metricas import iniciar_metricas, reruns
+from crossfit.pdf_estaciones import pdf_rotacion_clase
+from crossfit.recursos import PROFESOR_NOMBRE
+
+# Si se define, el panel pide esta clave antes de mostrar datos de los alumnos
+VARIABLE_CLAVE = "CROSSFIT_CLAVE_PROFESOR"
+
+st.set_page_config(
+    page_title="Panel del profesor · CrossFit",
+    page_icon="CF",
+    layout="wide"
+)
+
+iniciar_metricas()
+reruns.incrementar("profesor")
+
+st.title("📋 Panel del profesor")
+st.caption(PROFESOR_NOMBRE)
+
+clave_panel = os.environ.get(VARIABLE_CLAVE)
+if clave_panel and not st.session_state.get("profesor_autenticado"):
+    intento = st.text_input("Clave del panel:", type="password")
+    if intento and hmac.compare_digest(intento.encode("utf-8"), clave_panel.encode("utf-8")):
+        st.session_state["profesor_autenticado"] = True
+        st.rerun()
+    elif intento:
+        st.error("Clave incorrecta.")
+    st.stop()
+
+catalogo = fijar_catalogo()
+if vigilante.ultimo_error:
+    st.warning(f"El catálogo de ejercicios tiene errores y se sigue usando la versión anterior: {vigilante.ultimo_error}")
+
+if not historial.activo:
+    st.info("El historial está desactivado (CROSSFIT_HISTORIAL_DB=off).")
+    st.stop()
+
+st.markdown("### 📚 Historial de entrenamientos")
+col_grupo, col_tipo, col_alumno, col_fechas = st.columns(4)
+with col_grupo:
+    grupo = st.selectbox("Grupo:", options=["Todos"] + historial.grupos())
+with col_tipo:
+    tipo = st.selectbox("Tipo de WOD:", options=["Todos"] + list(TIPOS_CIRCUITO))
+with col_alumno:
+    alumno = st.text_input("Alumno (comienzo del nombre):")
+with col_fechas:
+    fechas = st.date_input("Fechas:", value=())
+
+filtros = dict(
+    alumno=alumno.strip() or None,
+    grupo=None if grupo == "Todos" else grupo,
+    tipo=None if tipo == "Todos" else tipo,
+    desde=fechas[0] if len(fechas) > 0 else None,
+    hasta=fechas[1] if len(fechas) > 1 else None,
+    prefijo=True,
+)
+mostrar_historial("profesor", "No hay entrenamientos que cumplan los filtros.", **filtros)
+
+st.markdown("### 💪 Carga por grupo muscular")
+st.caption(
+    "Repeticiones de todos los entrenamientos filtrados (las rondas incluidas) que recaen en cada músculo; "
+    "los ejercicios por tiempo cuentan como repeticiones equivalentes."
+)
+informe = informe_historial(**filtros)
+
+
+def tabla_reparto(titulo: str, columna: str, agregado, principales, musculos):
+    claves, volumen, cuentas = agregado
+    porcentajes = 100 * reparto(volumen)
+    st.markdown(f"**{titulo}** (% del volumen de cada fila en los músculos más trabajados)")
+    st.dataframe(
+        [
+            {columna: clave, "WODs": int(cuenta),
+             **{musculo: round(float(fila[musculos.index(musculo)]), 1) for musculo in principales}}
+            for clave, fila, cuenta in zip(claves, porcentajes, cuentas)
+        ],
+        hide_index=True,
+        use_container_width=True,
+    )
+
+
+def mostrar_cargas(informe):
+    musculos = informe["musculos"]
+    reparto_total = reparto(informe["total"][None, :])[0]
+    orden = reparto_total.argsort()[::-1]
+    principales = [musculos[indice] for indice in orden[:8]]
+    sin_trabajar = [musculos[indice] for indice in orden if reparto_total[indice] == 0]
+
+    col_metrica, col_tabla = st.columns([1, 2])
+    with col_metrica:
+        st.metric("Entrenamientos analizados", informe["entrenamientos"])
+        st.markdown(f"**Más trabajados:** {', '.join(principales[:3])}")
+        if sin_trabajar:
+            st.markdown(f"**Sin trabajar:** {', '.join(sin_trabajar)}")
+    with col_tabla:
+        st.dataframe(
+            [
+                {"Músculo": musculos[indice], "Volumen": round(float(informe["total"][indice])),
+                 "Reparto": 100 * float(reparto_total[indice])}
+                for indice in orden if reparto_total[indice] > 0
+            ],
+            column_config={"Reparto": st.column_config.ProgressColumn("Reparto", format="%.1f%%", min_value=0, max_value=100)},
+            hide_index=True,
+            use_container_width=True,
+        )
+
+    if len(informe["grupos"][0]) > 1:
+        tabla_reparto("Por grupo", "Grupo", informe["grupos"], principales, musculos)
+    tabla_reparto("Por alumno", "Alumno", informe["alumnos"], principales, musculos)
+
+
+if informe["entrenamientos"]:
+    mostrar_cargas(informe)
+else:
+    st.caption("No hay entrenamientos que analizar.")
+
+st.markdown("### 🔄 Rotación de estaciones")
+st.caption(
+    "Reparte el material para que toda la clase haga a la vez su último entrenamiento (con los filtros de arriba): "
+    "cada alumno pasa por sus ejercicios en turnos sin que nadie tenga que compartir material."
+)
+if filtros["grupo"] is None:
+    st.info("Elige un grupo en los filtros para planificar su rotación.")
+else:
+    st.markdown("**Material disponible (unidades):**")
+    materiales = categorias_material(catalogo)
+    columnas_material = st.columns(len(materiales) + 1)
+    inventario = {}
+    for columna, categoria in zip(columnas_material, materiales):
+        inventario[categoria] = columna.number_input(
+            categoria, min_value=0, max_value=100, value=INVENTARIO_POR_DEFECTO.get(categoria, 0), key=f"inventario_{categoria}"
+        )
+    minutos_turno = columnas_material[-1].number_input("Min / turno", min_value=1, max_value=15, value=MINUTOS_POR_TURNO)
+
+    specs_clase = tuple(historial.ultimas_specs(**filtros))
+    if not specs_clase:
+        st.caption("No hay entrenamientos de este grupo.")
+    else:
+        inventario_ordenado = tuple(sorted(inventario.items()))
+        plan = plan_clase(specs_clase, inventario_ordenado)
+        col_turnos, col_duracion, col_minimo = st.columns(3)
+        col_turnos.metric("Turnos", len(plan.turnos))
+        col_duracion.metric("Duración de una vuelta", f"{len(plan.turnos) * minutos_turno} min")
+        col_minimo.metric("Mínimo posible", plan.cota_inferior)
+        cuello = plan.cuello_de_botella()
+        if cuello:
+            st.caption(f"El material que más alarga la sesión es **{cuello}**: añadir unidades reduciría los turnos.")
+        if plan.sin_material:
+            st.warning(
+                "Sin material para: "
+                + "; ".join(f"{alumno} – {ejercicio.nombre}" for alumno, ejercicio in plan.sin_material)
+            )
+        st.dataframe(
+            [
+                {"Alumno": alumno, **{
+                    f"T{turno + 1}": plan.turnos[turno][indice].nombre if plan.turnos[turno][indice] else "—"
+                    for turno in range(len(plan.turnos))
+                }}
+                for indice, alumno in enumerate(plan.alumnos)
+            ],
+            hide_index=True,
+            use_container_width=True,
+        )
+        if st.checkbox("Preparar el PDF de la rotación"):
+            hoy = datetime.now().strftime('%Y%m%d')
+            try:
+                # pdf_rotacion_clase está cacheado: los reruns con la misma rotación no gastan otra ficha
+                pdf_rotacion_bytes = control_pdf.ejecutar(
+                    id_sesion_actual(), pdf_rotacion_clase, specs_clase, inventario_ordenado, filtros["grupo"],
+                    minutos_turno, hoy,
+                    clave=("rotacion", tuple(spec.huella() for spec in specs_clase), inventario_ordenado,
+                           filtros["grupo"], minutos_turno, hoy),
+                )
+            except RechazoAdmision as rechazo:
+                st.warning(rechazo.mensaje)
+            else:
+                st.download_button(
+                    label="Descargar rotación (PDF)",
+                    data=pdf_rotacion_bytes,
+                    file_name=f"Rotacion_{filtros['grupo'].replace(' ', '_')}_{hoy}.pdf",
+                    mime="application/pdf",
+                )
+
+st.markdown("### 📥 Importar resultados (CSV)")
+st.caption(
+    "Sube los resultados anotados en papel («Registro del entrenamiento»): columnas fecha, alumno, grupo, wod y, "
+    "según el WOD, rondas, reps (en Tabata, también por bloques: 12-11-10…) o tiempo (mm:ss); enlace es opcional "
+    "y sirve para que el resultado cuente en la clasificación de ese WOD."
+)
+archivo_resultados = st.file_uploader("Archivo CSV:", type=["csv"])
+if archivo_resultados is not None and st.button("Importar resultados"):
+    inicio = time.perf_counter()
+    try:
+        informe_importacion = importar_csv(archivo_resultados)
+    except (ValueError, OverflowError, UnicodeDecodeError, csv.Error, sqlite3.Error) as exc:
+        st.error(f"No se ha podido importar el archivo: {exc}")
+    else:
+        st.success(
+            f"{informe_importacion.importadas} resultados importados de {informe_importacion.filas} filas "
+            f"en {time.perf_counter() - inicio:.1f} s ({informe_importacion.duplicadas} ya estaban importados)."
+        )
+        if informe_importacion.total_errores:
+            st.warning(
+                f"{informe_importacion.total_errores} filas con errores no se han importado:\n\n"
+                + "\n".join(f"- {error}" for error in informe_importacion.errores)
+            )
@@ -0,0 +1,17 @@
+"""Cronograma compilado de los WODs."""
+
+import unittest
+
+from crossfit.cronograma import compilar, compilar_lote
+from crossfit.spec import EjercicioSpec, WorkoutSpec
+
+
+class RondasAMRAP(unittest.TestCase):
+    def test_ronda_sin_duracion_no_multiplica_las_filas(self):
+        # Sin validar, como una spec guardada o construida a mano
+        spec = WorkoutSpec("", "", "AMRAP", [EjercicioSpec("Autocarga", "Plank Hold", "0 s")], duracion=15)
+        self.assertEqual(len(compilar(spec)), 1)
+
+    def test_rondas_acotadas_por_la_duracion(self):
+        spec = WorkoutSpec("", "", "AMRAP", [EjercicioSpec("Autocarga", "Plank Hold", "1 s")], duracion=15)
+        self.assertLessEqual(len(compilar_lote([spec])), 15 * 60)
@@ -0,0 +1,46 @@
+"""Paridad de los motores de PDF: ``completo`` y ``rapido`` deben imprimir lo mismo."""
+
+import re
+import unittest
+
+from crossfit.pdf import MOTORES_PDF
+from herramientas.benchmark_pdf import comprobar_paridad, construir_casos, extraer_texto, palabras
+
+_PAGINA = re.compile(rb"/Type /Page\b")
+
+
+class ParidadPDF(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        cls.casos = construir_casos()
+        cls.pdfs = {
+            (caso["nombre"], motor): generar(caso["spec"]).getvalue()
+            for caso in cls.casos
+            for motor, generar in MOTORES_PDF.items()
+        }
+
+    def test_textos_requeridos_en_ambos_motores(self):
+        self.assertEqual(comprobar_paridad(self.casos), [])
+
+    def test_mismas_palabras(self):
+        for caso in self.casos:
+            with self.subTest(wod=caso["nombre"]):
+                completo, rapido = (
+                    palabras(extraer_texto(self.pdfs[caso["nombre"], motor])) for motor in ("completo", "rapido")
+                )
+                self.assertTrue(completo)
+                self.assertEqual(completo - rapido, set(), "solo en el completo")
+                self.assertEqual(rapido - completo, set(), "solo en el rápido")
+
+    def test_mismas_paginas(self):
+        for caso in self.casos:
+            with self.subTest(wod=caso["nombre"]):
+                completo, rapido = (
+                    len(_PAGINA.findall(self.pdfs[caso["nombre"], motor])) for motor in ("completo", "rapido")
+                )
+                self.assertEqual(completo, rapido)
+                self.assertIn(completo, (2, 3))
+
+
+if __name__ == "__main__":
+    unittest.main()
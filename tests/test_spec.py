@@ -0,0 +1,28 @@
+"""Validación de las specs: lo que el formulario no permite tampoco entra por un enlace."""
+
+import unittest
+
+from crossfit.enlaces import decodificar
+from crossfit.spec import EjercicioSpec, SpecInvalida, WorkoutSpec
+
+
+def _amrap(repeticiones):
+    return WorkoutSpec("", "", "AMRAP", [EjercicioSpec("Autocarga", "Plank Hold", repeticiones)], duracion=15)
+
+
+class SegundosPorEjercicio(unittest.TestCase):
+    def test_dentro_del_rango_del_formulario(self):
+        for repeticiones in ("10 s", "30 s", "300 s"):
+            with self.subTest(repeticiones=repeticiones):
+                self.assertEqual(_amrap(repeticiones).errores(requiere_alumno=False), [])
+
+    def test_fuera_del_rango_del_formulario(self):
+        for repeticiones in ("0 s", "5 s", "301 s", "99999999 s", "²0 s", " s", "30"):
+            with self.subTest(repeticiones=repeticiones):
+                self.assertEqual(
+                    _amrap(repeticiones).errores(requiere_alumno=False), ["Repeticiones no válidas para Plank Hold"]
+                )
+
+    def test_enlace_con_cero_segundos(self):
+        with self.assertRaises(SpecInvalida):
+            decodificar("AQAQAAAAAAABDAI")